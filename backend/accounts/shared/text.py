@@ -0,0 +1,7 @@
+def fold(value: str) -> str:
+    '''
+    Key for matching Russian and English words, the same as search_fold() from
+    V0018: ё -> е, lowercase, trimmed, single-spaced. Search terms, dictionary
+    keys (global_words.normalized) and the translation cache all use it.
+    '''
+    return ' '.join(value.replace('ё', 'е').replace('Ё', 'Е').lower().split())
@@ -0,0 +1,128 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+DEFAULT_TTL = 7 * 24 * 3600
+CACHE_SIZE = 4096
+
+
+def _secrets() -> List[bytes]:
+    '''SESSION_SECRET, comma-separated for rotation: the first signs, any verifies'''
+    return [s.strip().encode() for s in os.environ.get('SESSION_SECRET', '').split(',') if s.strip()]
+
+
+def enabled() -> bool:
+    return bool(_secrets())
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(secret: bytes, payload: str) -> str:
+    return _b64encode(hmac.new(secret, payload.encode('ascii'), hashlib.sha256).digest())
+
+
+def issue(user_id: int, is_admin: bool, ttl: Optional[int] = None) -> Optional[Tuple[str, int]]:
+    '''
+    Session token for a logged-in user and its expiry (unix seconds), or None
+    when SESSION_SECRET is not configured. The token is base64url JSON claims
+    (sub, adm, iat, exp) and an HMAC-SHA256 of them, joined by a dot.
+    '''
+    secrets = _secrets()
+    if not secrets:
+        return None
+    now = int(time.time())
+    expires = now + (ttl or int(os.environ.get('SESSION_TTL', DEFAULT_TTL)))
+    claims = {'sub': int(user_id), 'adm': bool(is_admin), 'iat': now, 'exp': expires}
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    return f'{payload}.{_sign(secrets[0], payload)}', expires
+
+
+class _Cache:
+    '''Verified claims by token, so hot tokens skip the HMAC and JSON parse'''
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            claims = self._data.get(token)
+            if claims is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[token] = claims
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._data.pop(token, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+_cache = _Cache(int(os.environ.get('SESSION_CACHE_SIZE', CACHE_SIZE)))
+
+
+def _parse(token: str, secrets: List[bytes]) -> Optional[Dict[str, Any]]:
+    payload, dot, signature = token.partition('.')
+    if not dot or not payload or not signature:
+        return None
+    if not any(hmac.compare_digest(_sign(secret, payload), signature) for secret in secrets):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or not isinstance(claims.get('sub'), int) or not isinstance(claims.get('exp'), int):
+        return None
+    return {'userId': claims['sub'], 'isAdmin': claims.get('adm') is True, 'expiresAt': claims['exp']}
+
+
+def verify(token: str) -> Optional[Dict[str, Any]]:
+    '''
+    Claims ({userId, isAdmin, expiresAt}) of a valid, unexpired token, else
+    None. In memory only: no database round trip, and a token seen before is
+    answered from the cache with just the expiry check.
+    '''
+    secrets = _secrets()
+    if not secrets or not token:
+        return None
+    claims = _cache.get(token)
+    if claims is None:
+        claims = _parse(token, secrets)
+        if claims is None:
+            return None
+        _cache.put(token, claims)
+    if claims['expiresAt'] <= time.time():
+        _cache.discard(token)
+        return None
+    return claims
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
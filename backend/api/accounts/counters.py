@@ -0,0 +1,101 @@
+import argparse
+import json
+import sys
+from typing import Dict, Any
+
+from shared import db
+
+
+def verify(cur: Any) -> Dict[str, Any]:
+    '''
+    Compares user_stats, card counters, group card counts and the group/course
+    rollups with the source tables without changing anything. Every value is
+    zero when the triggers have kept up.
+    '''
+    cur.execute("""
+        SELECT COUNT(*)
+        FROM users u
+        LEFT JOIN user_stats s ON s.user_id = u.id
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) FILTER (WHERE is_learned) AS learned
+            FROM user_progress GROUP BY user_id
+        ) p ON p.user_id = u.id
+        WHERE s.user_id IS NULL OR s.cards_learned <> COALESCE(p.learned, 0)
+    """)
+    drifted_users = cur.fetchone()[0]
+    cur.execute("""
+        SELECT (SELECT COUNT(*) FROM cards) - COALESCE((SELECT value FROM library_counters WHERE name = 'cards'), 0)
+    """)
+    card_drift = cur.fetchone()[0]
+    cur.execute("""
+        SELECT COUNT(*)
+        FROM (
+            SELECT up.user_id, cg.group_id, COUNT(*) AS learned
+            FROM user_progress up
+            JOIN card_groups cg ON cg.card_id = up.card_id
+            WHERE up.is_learned
+            GROUP BY up.user_id, cg.group_id
+        ) actual
+        FULL JOIN user_group_progress ugp ON ugp.user_id = actual.user_id AND ugp.group_id = actual.group_id
+        WHERE COALESCE(ugp.cards_learned, 0) <> COALESCE(actual.learned, 0)
+    """)
+    group_drift = cur.fetchone()[0]
+    cur.execute("""
+        SELECT COUNT(*)
+        FROM (
+            SELECT up.user_id, COALESCE(c.course, 1) AS course, COUNT(*) AS learned
+            FROM user_progress up
+            JOIN cards c ON c.id = up.card_id
+            WHERE up.is_learned
+            GROUP BY up.user_id, COALESCE(c.course, 1)
+        ) actual
+        FULL JOIN user_course_progress ucp ON ucp.user_id = actual.user_id AND ucp.course = actual.course
+        WHERE COALESCE(ucp.cards_learned, 0) <> COALESCE(actual.learned, 0)
+    """)
+    course_drift = cur.fetchone()[0]
+    cur.execute("""
+        SELECT COUNT(*)
+        FROM groups g
+        LEFT JOIN (SELECT group_id, COUNT(*) AS cards FROM card_groups GROUP BY group_id) m ON m.group_id = g.id
+        WHERE g.card_count <> COALESCE(m.cards, 0)
+    """)
+    group_size_drift = cur.fetchone()[0]
+
+    return {
+        'driftedUsers': drifted_users,
+        'cardCountDrift': card_drift,
+        'driftedGroupSizes': group_size_drift,
+        'driftedGroupRollups': group_drift,
+        'driftedCourseRollups': course_drift
+    }
+
+
+def has_drift(report: Dict[str, Any]) -> bool:
+    return any(report.values())
+
+
+def rebuild(conn: Any) -> Dict[str, Any]:
+    '''
+    Recomputes every counter from the source tables (rebuild_progress_counters,
+    last replaced in V0020) and reports how much had drifted before.
+    '''
+    cur = conn.cursor()
+    report = verify(cur)
+    cur.execute("SELECT rebuild_progress_counters()")
+    conn.commit()
+    cur.close()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Verify or rebuild denormalized progress and group counters')
+    parser.add_argument('--check', action='store_true', help='only report drift; exit 1 if any counter is off')
+    args = parser.parse_args()
+    with db.connection() as connection:
+        if args.check:
+            cursor = connection.cursor()
+            result = verify(cursor)
+            cursor.close()
+            print(json.dumps(result))
+            sys.exit(1 if has_drift(result) else 0)
+        print(json.dumps(rebuild(connection)))
@@ -0,0 +1,202 @@
+import base64
+import io
+import json
+from typing import Dict, Any
+
+from shared import db, encoding, http, instrument, roster
+from shared.transfer import exporter, tables
+from accounts import counters, rollups
+
+MAX_PAGE_SIZE = 200
+DEFAULT_ROLLUP_PAGE_SIZE = 100
+SORT_COLUMNS = {
+    'createdAt': ['u.created_at', 'u.id'],
+    'progress': ['s.cards_learned', 's.user_id'],
+    'username': ['u.username']
+}
+DEFAULT_EXPORT_PAGE_SIZE = 10000
+MAX_EXPORT_PAGE_SIZE = 50000
+
+
+@instrument.traced('accounts')
+@encoding.compressed
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: API for viewing user accounts and their progress (admin only),
+              paginated and sortable, verify/rebuild of progress counters and paged
+              NDJSON/CSV export of the library and progress tables, bulk
+              provisioning of users from a CSV/JSON roster
+    Args: event - dict with httpMethod, headers with X-Session-Token (or X-Is-Admin)
+          context - object with request_id
+    Returns: HTTP response with users data and progress
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return http.preflight('GET, POST, OPTIONS', 'Content-Type, X-Session-Token, X-Is-Admin')
+    
+    _, is_admin = http.user_context(event)
+    
+    if not is_admin:
+        return http.json_response(403, {'error': 'Admin access required'})
+    
+    with db.connection() as conn:
+        cur = conn.cursor()
+        
+        if method == 'GET':
+            query_params = event.get('queryStringParameters') or {}
+            resource = query_params.get('resource')
+            sort = query_params.get('sort', 'createdAt')
+            order = 'ASC' if query_params.get('order') == 'asc' else 'DESC'
+            
+            if resource == 'export':
+                table = tables.TABLES.get(query_params.get('table') or '')
+                fmt = query_params.get('format') or 'ndjson'
+                error = None
+                if table is None or fmt not in tables.FORMATS:
+                    error = f"table must be one of: {', '.join(tables.TABLES)}; format ndjson or csv"
+                else:
+                    try:
+                        page_size = min(int(query_params.get('limit') or DEFAULT_EXPORT_PAGE_SIZE), MAX_EXPORT_PAGE_SIZE)
+                        after = tables.parse_key(table, query_params['after']) if query_params.get('after') else None
+                    except ValueError:
+                        error = f"limit must be an integer and after a {table.name} key ({','.join(table.key)})"
+                if error:
+                    cur.close()
+                    return http.json_response(400, {'error': error})
+                cur.close()
+                
+                # One keyset page per request (the runtime returns whole bodies); the
+                # named cursor keeps memory at one fetch batch while the page is written
+                out = io.StringIO()
+                page = exporter.write_table(conn, table.name, out, fmt, after, max(page_size, 1), header=after is None)
+                response_headers = {
+                    'Content-Type': f'{tables.FORMATS[fmt][1]}; charset=utf-8',
+                    'Access-Control-Allow-Origin': '*',
+                    'Access-Control-Expose-Headers': 'X-Export-Rows, X-Next-After',
+                    'Cache-Control': 'no-store',
+                    'X-Export-Rows': str(page['rows'])
+                }
+                if page['nextAfter']:
+                    response_headers['X-Next-After'] = tables.format_key(page['nextAfter'])
+                
+                return {
+                    'statusCode': 200,
+                    'headers': response_headers,
+                    'body': out.getvalue(),
+                    'isBase64Encoded': False
+                }
+            
+            try:
+                limit = min(int(query_params['limit']), MAX_PAGE_SIZE) if query_params.get('limit') else None
+                offset = max(int(query_params.get('offset') or 0), 0)
+                filter_user = int(query_params['userId']) if query_params.get('userId') else None
+                filter_group = int(query_params['groupId']) if query_params.get('groupId') else None
+                filter_course = int(query_params['course']) if query_params.get('course') else None
+            except ValueError:
+                cur.close()
+                return http.json_response(400, {'error': 'limit, offset, userId, groupId and course must be integers'})
+            
+            if resource in ('groupProgress', 'courseProgress'):
+                try:
+                    after = rollups.decode_cursor(query_params['cursor'], sort) if query_params.get('cursor') else None
+                except ValueError:
+                    cur.close()
+                    return http.json_response(400, {'error': 'Invalid cursor'})
+                if resource == 'groupProgress':
+                    result = rollups.list_group_progress(cur, filter_user, filter_group, filter_course, sort, limit or DEFAULT_ROLLUP_PAGE_SIZE, after)
+                else:
+                    result = rollups.list_course_progress(cur, filter_user, filter_course, sort, limit or DEFAULT_ROLLUP_PAGE_SIZE, after)
+                cur.close()
+                
+                return http.json_response(200, result)
+            
+            if sort not in SORT_COLUMNS:
+                cur.close()
+                return http.json_response(400, {'error': f"sort must be one of: {', '.join(SORT_COLUMNS)}"})
+            
+            order_by = ', '.join(f'{column} {order}' for column in SORT_COLUMNS[sort])
+            page = ''
+            params: list = []
+            if limit:
+                page = 'LIMIT %s OFFSET %s'
+                params = [limit + 1, offset]
+            
+            # Counters are kept up to date by triggers on user_progress and cards (V0015)
+            cur.execute(f"""
+                SELECT u.id, u.username, u.created_at, s.cards_learned
+                FROM user_stats s
+                JOIN users u ON u.id = s.user_id
+                WHERE NOT EXISTS (SELECT 1 FROM admins a WHERE a.username = u.username)
+                ORDER BY {order_by}
+                {page}
+            """, params)
+            rows = cur.fetchall()
+            
+            cur.execute("SELECT value FROM library_counters WHERE name = 'cards'")
+            counter = cur.fetchone()
+            total_cards = (counter[0] if counter else 0) or 1
+            
+            has_more = bool(limit) and len(rows) > limit
+            if has_more:
+                rows = rows[:limit]
+            
+            users = []
+            for row in rows:
+                learned = row[3] or 0
+                users.append({
+                    'id': row[0],
+                    'username': row[1],
+                    'createdAt': row[2].isoformat() if row[2] else None,
+                    'cardsLearned': learned,
+                    'totalCards': total_cards,
+                    'progress': round(learned / total_cards * 100, 1)
+                })
+            
+            cur.close()
+            
+            result: Dict[str, Any] = {'users': users}
+            if limit:
+                result['nextOffset'] = offset + limit if has_more else None
+            
+            return http.json_response(200, result)
+        
+        if method == 'POST':
+            query_params = event.get('queryStringParameters') or {}
+            
+            if query_params.get('resource') == 'roster':
+                raw_body = event.get('body') or ''
+                if event.get('isBase64Encoded'):
+                    raw_body = base64.b64decode(raw_body).decode('utf-8')
+                
+                fmt = roster.detect_format(raw_body, http.header(event, 'Content-Type'), query_params.get('format'))
+                rows, errors = roster.parse_rows(raw_body, fmt)
+                
+                if len(rows) > roster.MAX_ROSTER_ROWS:
+                    cur.close()
+                    return http.json_response(413, {'error': f'At most {roster.MAX_ROSTER_ROWS} users per roster'})
+                
+                cur.close()
+                report = roster.provision(conn, rows, errors)
+                
+                return http.json_response(200, report)
+            
+            body_data = json.loads(event.get('body') or '{}')
+            
+            action = body_data.get('action')
+            
+            if action not in ('rebuildCounters', 'verifyCounters'):
+                cur.close()
+                return http.json_response(400, {'error': 'Invalid action'})
+            
+            if action == 'verifyCounters':
+                report = counters.verify(cur)
+                report['drift'] = counters.has_drift(report)
+                cur.close()
+            else:
+                cur.close()
+                report = counters.rebuild(conn)
+            
+            return http.json_response(200, report)
+        
+        return http.json_response(405, {'error': 'Method not allowed'})
\ No newline at end of file
@@ -0,0 +1,133 @@
+import base64
+from typing import Dict, Any, List, Optional, Tuple
+
+# Rollup tables are maintained by triggers on user_progress, card_groups and cards (V0016)
+
+
+def encode_cursor(position: Tuple[int, ...]) -> str:
+    '''Opaque keyset cursor for the sort position of the last row on a page'''
+    raw = '|'.join(str(value) for value in position)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[int, ...]:
+    '''Position in a cursor from encode_cursor; ValueError unless it fits the sort'''
+    padded = cursor + '=' * (-len(cursor) % 4)
+    position = tuple(int(value) for value in base64.urlsafe_b64decode(padded.encode()).decode().split('|'))
+    if len(position) != (3 if sort == 'progress' else 2):
+        raise ValueError('cursor does not match the sort')
+    return position
+
+
+def _keyset(key: str, sort: str, after: Optional[Tuple[int, ...]]) -> Tuple[str, List[str], List[Any]]:
+    '''
+    ORDER BY, and the conditions for rows after `after` with their params.
+    Rows are ordered by (user_id, key), or by (cards_learned DESC, user_id,
+    key) for sort=progress; both orders have an index on the rollup table
+    (V0016, V0026).
+    '''
+    if sort == 'progress':
+        order_by = f'r.cards_learned DESC, r.user_id, {key}'
+        if after is None:
+            return order_by, [], []
+        return order_by, [f'(r.cards_learned < %s OR (r.cards_learned = %s AND (r.user_id, {key}) > (%s, %s)))'], \
+            [after[0], after[0], after[1], after[2]]
+    order_by = f'r.user_id, {key}'
+    if after is None:
+        return order_by, [], []
+    return order_by, [f'(r.user_id, {key}) > (%s, %s)'], list(after)
+
+
+def _page(rows: List[Any], limit: int, position: Any) -> Tuple[List[Any], Optional[str]]:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(position(rows[-1]))
+    return rows, None
+
+
+def list_group_progress(cur: Any, user_id: Optional[int], group_id: Optional[int], course: Optional[int],
+                        sort: str, limit: int, after: Optional[Tuple[int, ...]]) -> Dict[str, Any]:
+    '''
+    Completion per (student, group) for the pairs with learned cards, read
+    from user_group_progress in index order; a student missing from a group
+    has learned none of its cards. Group totals are the stored card_count
+    (V0020).
+    '''
+    conditions = ['r.cards_learned > 0', 'NOT EXISTS (SELECT 1 FROM admins a WHERE a.username = u.username)']
+    params: List[Any] = []
+    if user_id is not None:
+        conditions.append('r.user_id = %s')
+        params.append(user_id)
+    if group_id is not None:
+        conditions.append('r.group_id = %s')
+        params.append(group_id)
+    if course is not None:
+        conditions.append('g.course = %s')
+        params.append(course)
+    order_by, keyset, keyset_params = _keyset('r.group_id', sort, after)
+    conditions.extend(keyset)
+
+    cur.execute(f"""
+        SELECT r.user_id, u.username, r.group_id, g.name, g.course, r.cards_learned, g.card_count
+        FROM user_group_progress r
+        JOIN users u ON u.id = r.user_id
+        JOIN groups g ON g.id = r.group_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY {order_by}
+        LIMIT %s
+    """, params + keyset_params + [limit + 1])
+    rows, next_cursor = _page(cur.fetchall(), limit,
+                              lambda row: (row[5], row[0], row[2]) if sort == 'progress' else (row[0], row[2]))
+
+    items = [{
+        'userId': row[0],
+        'username': row[1],
+        'groupId': row[2],
+        'groupName': row[3],
+        'course': row[4] if row[4] else 1,
+        'cardsLearned': row[5],
+        'totalCards': row[6],
+        'progress': round(row[5] / row[6] * 100, 1) if row[6] else 0.0
+    } for row in rows]
+    return {'rows': items, 'nextCursor': next_cursor}
+
+
+def list_course_progress(cur: Any, user_id: Optional[int], course: Optional[int],
+                         sort: str, limit: int, after: Optional[Tuple[int, ...]]) -> Dict[str, Any]:
+    '''
+    Completion per (student, course) for the pairs with learned cards, read
+    from user_course_progress in index order; course totals come from
+    library_counters.
+    '''
+    conditions = ['r.cards_learned > 0', 'NOT EXISTS (SELECT 1 FROM admins a WHERE a.username = u.username)']
+    params: List[Any] = []
+    if user_id is not None:
+        conditions.append('r.user_id = %s')
+        params.append(user_id)
+    if course is not None:
+        conditions.append('r.course = %s')
+        params.append(course)
+    order_by, keyset, keyset_params = _keyset('r.course', sort, after)
+    conditions.extend(keyset)
+
+    cur.execute(f"""
+        SELECT r.user_id, u.username, r.course, COALESCE(lc.value, 0), r.cards_learned
+        FROM user_course_progress r
+        JOIN users u ON u.id = r.user_id
+        LEFT JOIN library_counters lc ON lc.name = 'course:' || r.course
+        WHERE {' AND '.join(conditions)}
+        ORDER BY {order_by}
+        LIMIT %s
+    """, params + keyset_params + [limit + 1])
+    rows, next_cursor = _page(cur.fetchall(), limit,
+                              lambda row: (row[4], row[0], row[2]) if sort == 'progress' else (row[0], row[2]))
+
+    items = [{
+        'userId': row[0],
+        'username': row[1],
+        'course': row[2],
+        'cardsLearned': row[4],
+        'totalCards': row[3],
+        'progress': round(row[4] / row[3] * 100, 1) if row[3] else 0.0
+    } for row in rows]
+    return {'rows': items, 'nextCursor': next_cursor}
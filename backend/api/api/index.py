@@ -0,0 +1,101 @@
+import importlib
+import threading
+from typing import Dict, Any, Callable
+
+from shared import db, encoding, http, instrument, versions
+
+# The router runs the other functions' handlers in-process; their packages are
+# vendored next to it by python -m deploy
+ROUTES = ('accounts', 'auth', 'cards', 'categories', 'translate')
+
+# Handlers are imported on the first request that needs them, so a cold start
+# only pays for the functions it actually serves
+_handlers: Dict[str, Callable[..., Dict[str, Any]]] = {}
+_handlers_lock = threading.Lock()
+
+
+def _load(route: str) -> Callable[..., Dict[str, Any]]:
+    handler = _handlers.get(route)
+    if handler is None:
+        with _handlers_lock:
+            handler = _handlers.get(route)
+            if handler is None:
+                handler = importlib.import_module(f'{route}.index').handler
+                _handlers[route] = handler
+    return handler
+
+
+def _bootstrap(event: Dict[str, Any], query_params: Dict[str, Any]) -> Dict[str, Any]:
+    '''
+    Cards, groups and categories for the first page load, on one connection
+    and one ETag. Cards come one page at a time (limit, cursor) as in the
+    cards listing; nextCursor continues through route=cards.
+    '''
+    from cards import listing as card_listing
+    from categories import listing as category_listing
+
+    user_id, _ = http.user_context(event)
+    if not user_id:
+        return http.json_response(401, {'error': 'User ID required'})
+
+    try:
+        limit = min(int(query_params['limit']), card_listing.MAX_PAGE_SIZE) if query_params.get('limit') else card_listing.DEFAULT_PAGE_SIZE
+        after = card_listing.decode_cursor(query_params['cursor']) if query_params.get('cursor') else None
+    except (ValueError, TypeError):
+        return http.json_response(400, {'error': 'Invalid limit or cursor'})
+    if limit < 1:
+        limit = card_listing.DEFAULT_PAGE_SIZE
+
+    with db.connection() as conn:
+        cur = conn.cursor()
+        etag = versions.build_etag('bootstrap', versions.fetch_versions(
+            cur, [versions.LIBRARY, ('progress', user_id), ('categories', user_id)]
+        ), query_params)
+
+        if versions.etag_matches(event.get('headers') or {}, etag):
+            cur.close()
+            return versions.not_modified(etag)
+
+        cards, next_cursor = card_listing.fetch_cards(cur, user_id, query_params, limit, after)
+        groups = card_listing.fetch_groups(cur, user_id)
+        categories = category_listing.fetch_categories(cur, user_id)
+        cur.close()
+
+    return http.json_response(200, {
+        'cards': card_listing.to_columns(cards) if query_params.get('format') == 'columns' else cards,
+        'groups': groups,
+        'categories': categories,
+        'nextCursor': next_cursor
+    }, versions.cache_headers(etag))
+
+
+@instrument.traced('api')
+@encoding.compressed
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Single entry point that serves every backend resource from one warm function
+    Args: event - dict with httpMethod, headers and queryStringParameters with route
+                  (accounts, auth, cards, categories, translate or bootstrap)
+          context - object with request_id
+    Returns: HTTP response of the routed function; route=bootstrap returns the first page of cards,
+             groups and categories
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return http.preflight('GET, POST, PUT, DELETE, OPTIONS', 'Content-Type, X-Session-Token, X-User-Id, X-Is-Admin, If-None-Match')
+    
+    query_params = dict(event.get('queryStringParameters') or {})
+    route = query_params.pop('route', None)
+    
+    trace = instrument.current()
+    if trace is not None:
+        trace.resource = f"{route}/{query_params['resource']}" if query_params.get('resource') else route
+    
+    if route == 'bootstrap' and method == 'GET':
+        return _bootstrap(event, query_params)
+    
+    if route not in ROUTES:
+        return http.json_response(404, {'error': f"Unknown route, expected one of: {', '.join(ROUTES + ('bootstrap',))}"})
+    
+    return _load(route)(dict(event, queryStringParameters=query_params), context)
@@ -0,0 +1,225 @@
+import csv
+import io
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+MAX_IMPORT_ROWS = 20000
+MAX_REPORTED_ERRORS = 100
+IMPORT_COLUMNS = ['russian', 'english', 'russianExample', 'englishExample', 'categoryId', 'course', 'groupId']
+
+
+def detect_format(text: str, content_type: Optional[str], requested: Optional[str]) -> str:
+    if requested in ('csv', 'ndjson'):
+        return requested
+    if content_type and ('ndjson' in content_type or 'jsonl' in content_type or 'json' in content_type):
+        return 'ndjson'
+    if content_type and 'csv' in content_type:
+        return 'csv'
+    return 'ndjson' if text.lstrip().startswith('{') else 'csv'
+
+
+def _read_records(text: str, fmt: str) -> List[Tuple[int, Any]]:
+    '''Returns (line number, raw record) pairs; malformed NDJSON lines come back as exceptions'''
+    records: List[Tuple[int, Any]] = []
+    if fmt == 'ndjson':
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append((line_no, json.loads(line)))
+            except ValueError as e:
+                records.append((line_no, e))
+        return records
+
+    reader = csv.reader(io.StringIO(text))
+    header: Optional[List[str]] = None
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if header is None:
+            if 'russian' in [cell.strip() for cell in row]:
+                header = [cell.strip() for cell in row]
+                continue
+            header = IMPORT_COLUMNS
+        records.append((reader.line_num, dict(zip(header, row))))
+    return records
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return int(value)
+
+
+def parse_rows(text: str, fmt: str, defaults: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    '''
+    Validates import records and drops in-file duplicates. A card repeated
+    with another groupId stays one row that collects every (line, group)
+    membership in `groups`. Returns (rows, errors); repeats that add nothing
+    are reported with skipped=True.
+    '''
+    rows: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    seen: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    for line_no, record in _read_records(text, fmt):
+        if isinstance(record, Exception) or not isinstance(record, dict):
+            errors.append({'line': line_no, 'error': 'Malformed row'})
+            continue
+
+        russian = str(record.get('russian') or '').strip()
+        english = str(record.get('english') or '').strip()
+        if not russian or not english:
+            errors.append({'line': line_no, 'error': 'russian and english required'})
+            continue
+        if len(russian) > 255 or len(english) > 255:
+            errors.append({'line': line_no, 'error': 'Word longer than 255 characters'})
+            continue
+
+        try:
+            category_id = _optional_int(record.get('categoryId', defaults.get('categoryId')))
+            course = _optional_int(record.get('course', defaults.get('course'))) or 1
+            group_id = _optional_int(record.get('groupId', defaults.get('groupId')))
+        except (TypeError, ValueError):
+            errors.append({'line': line_no, 'error': 'categoryId, course and groupId must be integers'})
+            continue
+
+        pair = (russian.lower(), english.lower())
+        if pair in seen:
+            first = seen[pair]
+            if group_id is not None and group_id not in [g for _, g in first['groups']]:
+                first['groups'].append((line_no, group_id))
+            else:
+                errors.append({'line': line_no, 'error': 'Duplicate row in file', 'skipped': True})
+            continue
+
+        row = {
+            'line': line_no,
+            'russian': russian,
+            'english': english,
+            'russian_example': str(record.get('russianExample') or ''),
+            'english_example': str(record.get('englishExample') or ''),
+            'category_id': category_id,
+            'course': course,
+            'groups': [] if group_id is None else [(line_no, group_id)]
+        }
+        seen[pair] = row
+        rows.append(row)
+
+    return rows, errors
+
+
+def _filter_references(cur: Any, rows: List[Dict[str, Any]], errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    '''
+    Fails lines pointing at groups or categories that do not exist instead of
+    aborting the batch. A card's own line failing drops the card; a repeated
+    line only loses its membership.
+    '''
+    group_ids = list({group_id for r in rows for _, group_id in r['groups']})
+    category_ids = list({r['category_id'] for r in rows if r['category_id'] is not None})
+
+    known_groups = set()
+    if group_ids:
+        cur.execute("SELECT id FROM groups WHERE id = ANY(%s)", (group_ids,))
+        known_groups = {row[0] for row in cur.fetchall()}
+    known_categories = set()
+    if category_ids:
+        cur.execute("SELECT id FROM categories WHERE id = ANY(%s)", (category_ids,))
+        known_categories = {row[0] for row in cur.fetchall()}
+
+    valid = []
+    for row in rows:
+        missing = [(line, group_id) for line, group_id in row['groups'] if group_id not in known_groups]
+        for line, group_id in missing:
+            errors.append({'line': line, 'error': f'Group {group_id} not found'})
+        if any(line == row['line'] for line, _ in missing):
+            continue
+        if row['category_id'] is not None and row['category_id'] not in known_categories:
+            errors.append({'line': row['line'], 'error': f"Category {row['category_id']} not found"})
+            continue
+        row['groups'] = [(line, group_id) for line, group_id in row['groups'] if group_id in known_groups]
+        valid.append(row)
+    return valid
+
+
+def import_cards(conn: Any, rows: List[Dict[str, Any]], errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    '''
+    Loads validated rows in one transaction: COPY into a temp table, one
+    INSERT ... SELECT for cards that do not exist yet (case-insensitive
+    russian/english pair) and one INSERT ... SELECT linking every card,
+    new or existing, to each group its lines named.
+    '''
+    cur = conn.cursor()
+    rows = _filter_references(cur, rows, errors)
+
+    inserted = 0
+    linked = 0
+    if rows:
+        cur.execute("""
+            CREATE TEMP TABLE import_rows (
+                russian VARCHAR(255) NOT NULL,
+                english VARCHAR(255) NOT NULL,
+                russian_example TEXT,
+                english_example TEXT,
+                category_id INTEGER,
+                course INTEGER
+            ) ON COMMIT DROP
+        """)
+        cur.execute("""
+            CREATE TEMP TABLE import_groups (
+                russian VARCHAR(255) NOT NULL,
+                english VARCHAR(255) NOT NULL,
+                group_id INTEGER NOT NULL
+            ) ON COMMIT DROP
+        """)
+
+        buffer = io.StringIO()
+        memberships = io.StringIO()
+        writer = csv.writer(buffer)
+        membership_writer = csv.writer(memberships)
+        for row in rows:
+            writer.writerow([
+                row['russian'], row['english'], row['russian_example'], row['english_example'],
+                '' if row['category_id'] is None else row['category_id'],
+                row['course']
+            ])
+            for _, group_id in row['groups']:
+                membership_writer.writerow([row['russian'], row['english'], group_id])
+        buffer.seek(0)
+        memberships.seek(0)
+        cur.copy_expert("COPY import_rows FROM STDIN WITH (FORMAT csv)", buffer)
+        cur.copy_expert("COPY import_groups FROM STDIN WITH (FORMAT csv)", memberships)
+
+        cur.execute("""
+            INSERT INTO cards (category_id, russian, english, russian_example, english_example, course, word_id)
+            SELECT r.category_id, r.russian, r.english, r.russian_example, r.english_example, r.course, w.id
+            FROM import_rows r
+            LEFT JOIN global_words w ON w.normalized = search_fold(r.russian)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM cards c
+                WHERE lower(c.russian) = lower(r.russian) AND lower(c.english) = lower(r.english)
+            )
+        """)
+        inserted = cur.rowcount
+
+        cur.execute("""
+            INSERT INTO card_groups (card_id, group_id)
+            SELECT c.id, m.group_id
+            FROM import_groups m
+            JOIN cards c ON lower(c.russian) = lower(m.russian) AND lower(c.english) = lower(m.english)
+            ON CONFLICT DO NOTHING
+        """)
+        linked = cur.rowcount
+
+    conn.commit()
+    cur.close()
+
+    skipped_in_file = sum(1 for e in errors if e.get('skipped'))
+    failures = [e for e in errors if not e.get('skipped')]
+    return {
+        'inserted': inserted,
+        'skipped': len(rows) - inserted + skipped_in_file,
+        'failed': len(failures),
+        'linked': linked,
+        'errors': sorted(failures, key=lambda e: e['line'])[:MAX_REPORTED_ERRORS]
+    }
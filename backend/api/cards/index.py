@@ -0,0 +1,371 @@
+import base64
+import json
+from typing import Dict, Any
+
+from shared import db, encoding, enrichment, http, instrument, versions
+from cards import dictionary, importer, listing, progress, scheduler, search, session, sync
+
+MAX_ENRICHMENT_IDS = 500
+
+@instrument.traced('cards')
+@encoding.compressed
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: API for managing shared word cards library with user progress tracking
+    Args: event - dict with httpMethod, body, headers with X-Session-Token or X-User-Id
+          context - object with request_id
+    Returns: HTTP response with cards data
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return http.preflight('GET, POST, PUT, DELETE, OPTIONS', 'Content-Type, X-Session-Token, X-User-Id, X-Is-Admin, If-None-Match')
+    
+    headers = event.get('headers', {})
+    user_id, is_admin = http.user_context(event)
+    
+    if not user_id:
+        return http.json_response(401, {'error': 'User ID required'})
+    
+    with db.connection() as conn:
+        cur = conn.cursor()
+        
+        if method == 'GET':
+            query_params = event.get('queryStringParameters') or {}
+            resource = query_params.get('resource')
+            group_id = query_params.get('groupId')
+            
+            # The due queue depends on the clock, sessions on a seed, search on the
+            # unversioned dictionary and the enrichment queue on the background
+            # worker, so none of them is answered with 304
+            if resource == 'due':
+                try:
+                    batch_size = min(int(query_params.get('limit') or scheduler.DEFAULT_BATCH_SIZE), scheduler.MAX_BATCH_SIZE)
+                except ValueError:
+                    batch_size = scheduler.DEFAULT_BATCH_SIZE
+                
+                cards = scheduler.due_cards(
+                    cur, user_id, max(batch_size, 1),
+                    course=query_params.get('course'),
+                    group_id=group_id,
+                    category_id=query_params.get('categoryId')
+                )
+                cur.close()
+                
+                return http.json_response(200, {'cards': cards}, {'Cache-Control': 'no-store'})
+            
+            if resource == 'session':
+                try:
+                    size = min(int(query_params.get('limit') or session.DEFAULT_SESSION_SIZE), session.MAX_SESSION_SIZE)
+                except ValueError:
+                    size = session.DEFAULT_SESSION_SIZE
+                seed = query_params.get('seed') or session.new_seed()
+                
+                cards = session.sample_cards(
+                    cur, user_id, max(size, 1), seed,
+                    course=query_params.get('course'),
+                    group_id=group_id,
+                    category_id=query_params.get('categoryId'),
+                    unlearned=query_params.get('learned') == 'false'
+                )
+                cur.close()
+                
+                return http.json_response(200, {'seed': seed, 'cards': cards}, {'Cache-Control': 'no-store'})
+            
+            if resource == 'enrichment':
+                try:
+                    card_ids = [int(part) for part in (query_params.get('ids') or '').split(',') if part.strip()]
+                except ValueError:
+                    card_ids = None
+                
+                if card_ids is None or len(card_ids) > MAX_ENRICHMENT_IDS:
+                    cur.close()
+                    return http.json_response(400, {'error': f'ids must be up to {MAX_ENRICHMENT_IDS} comma-separated card ids'})
+                
+                result = {'queue': enrichment.stats(cur)}
+                if card_ids:
+                    result['cards'] = enrichment.statuses(cur, card_ids)
+                cur.close()
+                
+                return http.json_response(200, result, {'Cache-Control': 'no-store'})
+            
+            if resource == 'search':
+                scope = query_params.get('scope') or 'all'
+                if not (query_params.get('q') or '').strip() or scope not in ('all', 'cards', 'dictionary'):
+                    cur.close()
+                    return http.json_response(400, {'error': 'q is required and scope must be all, cards or dictionary'})
+                
+                try:
+                    limit = min(int(query_params.get('limit') or search.DEFAULT_SEARCH_SIZE), search.MAX_SEARCH_SIZE)
+                    offset = max(int(query_params.get('offset') or 0), 0)
+                except ValueError:
+                    limit, offset = search.DEFAULT_SEARCH_SIZE, 0
+                
+                found = search.search(cur, query_params['q'], scope, max(limit, 1), offset,
+                                      course=query_params.get('course'))
+                cur.close()
+                
+                return http.json_response(200, found)
+            
+            if resource == 'groups':
+                etag = versions.build_etag('groups', versions.fetch_versions(cur, [versions.LIBRARY, ('progress', user_id)]), query_params)
+            else:
+                etag = versions.build_etag('cards', versions.fetch_versions(cur, [versions.LIBRARY, ('progress', user_id)]), query_params)
+            
+            if versions.etag_matches(headers, etag):
+                cur.close()
+                return versions.not_modified(etag)
+            
+            if resource == 'groups':
+                groups = listing.fetch_groups(cur, user_id)
+                cur.close()
+                
+                return http.json_response(200, {'groups': groups}, versions.cache_headers(etag))
+            
+            if resource == 'changes':
+                try:
+                    since = int(query_params.get('since') or 0)
+                except ValueError:
+                    since = -1
+                
+                if since < 0:
+                    cur.close()
+                    return http.json_response(400, {'error': 'since must be a non-negative revision'})
+                
+                changes = sync.fetch_changes(cur, user_id, since)
+                cur.close()
+                
+                if query_params.get('format') == 'columns':
+                    changes['cards'] = listing.to_columns(changes['cards'])
+                
+                return http.json_response(200, changes, versions.cache_headers(etag))
+            
+            limit_param = query_params.get('limit')
+            cursor_param = query_params.get('cursor')
+            paginate = bool(limit_param or cursor_param)
+            
+            try:
+                limit = min(int(limit_param), listing.MAX_PAGE_SIZE) if limit_param else listing.DEFAULT_PAGE_SIZE
+                after = listing.decode_cursor(cursor_param) if cursor_param else None
+            except (ValueError, TypeError):
+                cur.close()
+                return http.json_response(400, {'error': 'Invalid limit or cursor'})
+            if limit < 1:
+                limit = listing.DEFAULT_PAGE_SIZE
+            
+            cards, next_cursor = listing.fetch_cards(cur, user_id, query_params, limit if paginate else None, after)
+            cur.close()
+            
+            result: Dict[str, Any] = listing.to_columns(cards) if query_params.get('format') == 'columns' else {'cards': cards}
+            if paginate:
+                result['nextCursor'] = next_cursor
+            
+            return http.json_response(200, result, versions.cache_headers(etag))
+        
+        elif method == 'POST':
+            if not is_admin:
+                cur.close()
+                return http.json_response(403, {'error': 'Admin access required'})
+            
+            query_params = event.get('queryStringParameters') or {}
+            
+            if query_params.get('resource') == 'import':
+                raw_body = event.get('body') or ''
+                if event.get('isBase64Encoded'):
+                    raw_body = base64.b64decode(raw_body).decode('utf-8')
+                
+                content_type = http.header(event, 'Content-Type')
+                fmt = importer.detect_format(raw_body, content_type, query_params.get('format'))
+                rows, errors = importer.parse_rows(raw_body, fmt, {
+                    'groupId': query_params.get('groupId'),
+                    'categoryId': query_params.get('categoryId'),
+                    'course': query_params.get('course')
+                })
+                
+                if len(rows) > importer.MAX_IMPORT_ROWS:
+                    cur.close()
+                    return http.json_response(413, {'error': f'At most {importer.MAX_IMPORT_ROWS} rows per import'})
+                
+                cur.close()
+                report = importer.import_cards(conn, rows, errors)
+                
+                return http.json_response(200, report)
+            
+            body_data = json.loads(event.get('body', '{}'))
+            
+            if 'name' in body_data and 'color' in body_data and 'russian' not in body_data:
+                name = body_data.get('name', '')
+                description = body_data.get('description', '')
+                color = body_data.get('color', '#3b82f6')
+                course = body_data.get('course', 1)
+                
+                cur.execute(
+                    "INSERT INTO groups (name, description, color, course) VALUES (%s, %s, %s, %s) RETURNING id",
+                    (name, description, color, course)
+                )
+                
+                group_id = cur.fetchone()[0]
+                conn.commit()
+                cur.close()
+                
+                return http.json_response(200, {'groupId': group_id})
+            
+            if 'groupId' in body_data and 'cardIds' in body_data:
+                group_id = body_data['groupId']
+                card_ids = body_data['cardIds']
+                
+                cur.execute(
+                    "INSERT INTO card_groups (card_id, group_id) SELECT unnest(%s::int[]), %s ON CONFLICT DO NOTHING",
+                    (list(card_ids), group_id)
+                )
+                
+                conn.commit()
+                cur.close()
+                
+                return http.json_response(200, {'success': True})
+            
+            russian = body_data.get('russian', '')
+            english = body_data.get('english', '')
+            russian_example = body_data.get('russianExample', '')
+            english_example = body_data.get('englishExample', '')
+            category_id = body_data.get('categoryId')
+            course = body_data.get('course', 1)
+            
+            word_id = dictionary.remember(cur, russian, english, russian_example, english_example, dictionary.CONFIRMED)
+            
+            cur.execute(
+                """INSERT INTO cards (category_id, russian, english, russian_example, english_example, course, word_id) 
+                   VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id""",
+                (category_id if category_id else None, russian, english, russian_example, english_example, course, word_id)
+            )
+            
+            card_id = cur.fetchone()[0]
+            # Incomplete cards are queued by a trigger (V0021); the worker fills them in later
+            cur.execute("SELECT status FROM enrichment_jobs WHERE card_id = %s", (card_id,))
+            job = cur.fetchone()
+            conn.commit()
+            cur.close()
+            
+            return http.json_response(200, {'cardId': card_id, 'enrichment': job[0] if job else None})
+        
+        elif method == 'PUT':
+            body_data = json.loads(event.get('body', '{}'))
+            
+            if 'events' in body_data:
+                latest, rejected = progress.parse_events(body_data['events'])
+                
+                if len(latest) > progress.MAX_SYNC_EVENTS:
+                    cur.close()
+                    return http.json_response(413, {'error': f'At most {progress.MAX_SYNC_EVENTS} cards per sync'})
+                
+                cur.close()
+                report = progress.apply_events(conn, user_id, latest)
+                report['rejected'] = rejected
+                
+                return http.json_response(200, report)
+            
+            if 'grade' in body_data:
+                card_id = http.positive_int(body_data.get('cardId') or body_data.get('id'))
+                limit = scheduler.DEFAULT_BATCH_SIZE if body_data.get('limit') is None else http.positive_int(body_data['limit'])
+                grade = body_data['grade']
+                
+                if card_id is None or not isinstance(grade, int) or isinstance(grade, bool) or not 0 <= grade <= 5:
+                    cur.close()
+                    return http.json_response(400, {'error': 'cardId and integer grade 0-5 required'})
+                if limit is None:
+                    cur.close()
+                    return http.json_response(400, {'error': 'limit must be a positive integer'})
+                
+                schedule = scheduler.review(conn, user_id, card_id, grade)
+                
+                if schedule is None:
+                    cur.close()
+                    return http.json_response(404, {'error': 'Card not found'})
+                
+                next_cards = scheduler.due_cards(
+                    cur, user_id, min(limit, scheduler.MAX_BATCH_SIZE),
+                    course=body_data.get('course'),
+                    group_id=body_data.get('groupId'),
+                    category_id=body_data.get('categoryId')
+                )
+                cur.close()
+                
+                return http.json_response(200, {'schedule': schedule, 'next': next_cards})
+            
+            if is_admin and 'groupId' in body_data and ('name' in body_data or 'color' in body_data):
+                group_id = body_data.get('groupId') or body_data.get('id')
+                name = body_data.get('name', '')
+                description = body_data.get('description', '')
+                color = body_data.get('color', '#3b82f6')
+                course = body_data.get('course', 1)
+                
+                cur.execute(
+                    "UPDATE groups SET name = %s, description = %s, color = %s, course = %s WHERE id = %s",
+                    (name, description, color, course, group_id)
+                )
+            else:
+                card_id = body_data.get('id') or body_data.get('cardId')
+                
+                if 'learned' in body_data:
+                    cur.execute(
+                        """INSERT INTO user_progress (user_id, card_id, is_learned, updated_at) 
+                           VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+                           ON CONFLICT (user_id, card_id) 
+                           DO UPDATE SET is_learned = %s, updated_at = CURRENT_TIMESTAMP""",
+                        (user_id, card_id, body_data['learned'], body_data['learned'])
+                    )
+                elif is_admin and ('russian' in body_data and 'english' in body_data):
+                    russian = body_data.get('russian', '')
+                    english = body_data.get('english', '')
+                    russian_example = body_data.get('russianExample', '')
+                    english_example = body_data.get('englishExample', '')
+                    category_id = body_data.get('categoryId')
+                    course = body_data.get('course', 1)
+                    
+                    word_id = dictionary.remember(cur, russian, english, russian_example, english_example, dictionary.ADMIN)
+                    
+                    cur.execute(
+                        "UPDATE cards SET russian = %s, english = %s, russian_example = %s, english_example = %s, category_id = %s, course = %s, word_id = %s WHERE id = %s",
+                        (russian, english, russian_example, english_example, category_id, course, word_id, card_id)
+                    )
+            
+            conn.commit()
+            cur.close()
+            
+            return http.json_response(200, {'success': True})
+        
+        elif method == 'DELETE':
+            if not is_admin:
+                cur.close()
+                return http.json_response(403, {'error': 'Admin access required'})
+            
+            query_params = event.get('queryStringParameters', {})
+            body_data = json.loads(event.get('body', '{}')) if event.get('body') else {}
+            
+            if 'cardId' in query_params and 'groupId' in query_params:
+                cur.execute(
+                    "DELETE FROM card_groups WHERE card_id = %s AND group_id = %s",
+                    (query_params['cardId'], query_params['groupId'])
+                )
+            elif 'cardId' in body_data and 'groupId' in body_data:
+                cur.execute(
+                    "DELETE FROM card_groups WHERE card_id = %s AND group_id = %s",
+                    (body_data['cardId'], body_data['groupId'])
+                )
+            elif 'groupId' in query_params or 'groupId' in body_data:
+                group_id = query_params.get('groupId') or body_data.get('groupId')
+                cur.execute("DELETE FROM card_groups WHERE group_id = %s", (group_id,))
+                cur.execute("DELETE FROM groups WHERE id = %s", (group_id,))
+            else:
+                card_id = body_data.get('cardId') or body_data.get('id') or query_params.get('id')
+                cur.execute("DELETE FROM card_groups WHERE card_id = %s", (card_id,))
+                cur.execute("DELETE FROM user_progress WHERE card_id = %s", (card_id,))
+                cur.execute("DELETE FROM enrichment_jobs WHERE card_id = %s", (card_id,))
+                cur.execute("DELETE FROM cards WHERE id = %s", (card_id,))
+            
+            conn.commit()
+            cur.close()
+            
+            return http.json_response(200, {'success': True})
+        
+        return http.json_response(405, {'error': 'Method not allowed'})
\ No newline at end of file
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+MAX_SYNC_EVENTS = 1000
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    '''Accepts epoch milliseconds or an ISO 8601 string; naive values are taken as UTC'''
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value / 1000.0, tz=timezone.utc)
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_events(events: Any) -> Tuple[Dict[int, Tuple[bool, datetime]], List[Dict[str, Any]]]:
+    '''
+    Validates {cardId, learned, clientTimestamp} events and keeps only the
+    latest event per card. Returns (latest by card id, rejected events).
+    '''
+    latest: Dict[int, Tuple[bool, datetime]] = {}
+    rejected: List[Dict[str, Any]] = []
+    now = datetime.now(timezone.utc)
+
+    for index, event in enumerate(events if isinstance(events, list) else []):
+        try:
+            card_id = int(event['cardId'])
+            learned = event['learned']
+            if not isinstance(learned, bool):
+                raise ValueError('learned must be boolean')
+            timestamp = _parse_timestamp(event.get('clientTimestamp')) or now
+        except (KeyError, TypeError, ValueError, OverflowError, OSError):
+            rejected.append({'index': index, 'error': 'Invalid event'})
+            continue
+
+        # Clocks running ahead must not pin a card forever
+        timestamp = min(timestamp, now)
+        if card_id not in latest or latest[card_id][1] <= timestamp:
+            latest[card_id] = (learned, timestamp)
+
+    return latest, rejected
+
+
+def apply_events(conn: Any, user_id: Any, latest: Dict[int, Tuple[bool, datetime]]) -> Dict[str, int]:
+    '''
+    Upserts all events with one INSERT ... ON CONFLICT. A stored row is only
+    replaced when the incoming event is at least as new (last writer wins);
+    events for cards that no longer exist are dropped.
+    '''
+    if not latest:
+        return {'applied': 0, 'ignored': 0}
+
+    # psycopg2.extras costs ~10 ms at import; only write paths need it
+    from psycopg2.extras import execute_values
+
+    cur = conn.cursor()
+    applied = execute_values(
+        cur,
+        """INSERT INTO user_progress (user_id, card_id, is_learned, updated_at)
+           SELECT v.user_id, v.card_id, v.is_learned, v.updated_at
+           FROM (VALUES %s) AS v(user_id, card_id, is_learned, updated_at)
+           JOIN cards c ON c.id = v.card_id
+           ON CONFLICT (user_id, card_id) DO UPDATE
+           SET is_learned = EXCLUDED.is_learned, updated_at = EXCLUDED.updated_at
+           WHERE user_progress.updated_at IS NULL OR user_progress.updated_at <= EXCLUDED.updated_at
+           RETURNING card_id""",
+        [(int(user_id), card_id, learned, timestamp) for card_id, (learned, timestamp) in latest.items()],
+        template='(%s::integer, %s::integer, %s::boolean, %s::timestamptz)',
+        page_size=len(latest),
+        fetch=True
+    )
+    conn.commit()
+    cur.close()
+
+    return {'applied': len(applied), 'ignored': len(latest) - len(applied)}
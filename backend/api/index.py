@@ -0,0 +1,3 @@
+# Entry point the platform loads from this folder. The handler lives in the
+# api package beside it; shared/ is a copy kept in sync by python -m deploy
+from api.index import handler
@@ -0,0 +1,82 @@
+import os
+from typing import Dict, Any, Optional, Tuple
+
+from shared import instrument, tokens
+
+JSON_HEADERS = {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'}
+# users.id and cards.id are SERIALs
+MAX_SERIAL_ID = 2147483647
+
+
+def header(event: Dict[str, Any], name: str) -> Optional[str]:
+    '''Request header lookup that tolerates the gateway lower-casing names'''
+    headers = event.get('headers') or {}
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return value
+
+
+def positive_int(value: Any, maximum: int = MAX_SERIAL_ID) -> Optional[int]:
+    '''A JSON integer or a string of ASCII digits in 1..maximum, otherwise None'''
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.isascii() or not value.isdigit():
+            return None
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 < value <= maximum:
+        return None
+    return value
+
+
+def _user_id(value: Optional[str]) -> Optional[str]:
+    '''X-User-Id as a canonical id string, or None unless it is a positive integer'''
+    user_id = positive_int(value or '')
+    return str(user_id) if user_id is not None else None
+
+
+def user_context(event: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+    '''
+    User id and admin flag of the caller. The X-Session-Token issued by auth at
+    login is authoritative and checked in memory (shared.tokens); a token that
+    fails verification leaves the request anonymous. Once SESSION_SECRET is
+    configured a request without a token is anonymous too, unless
+    ALLOW_HEADER_AUTH=1 lets X-User-Id through (never X-Is-Admin) while clients
+    move over. Without a secret the X-User-Id / X-Is-Admin headers are used as before.
+    A header user id that is not a positive integer leaves the request anonymous.
+    '''
+    token = header(event, 'X-Session-Token')
+    if token:
+        claims = tokens.verify(token.strip())
+        if claims is None:
+            return None, False
+        return str(claims['userId']), claims['isAdmin']
+    if tokens.enabled():
+        if os.environ.get('ALLOW_HEADER_AUTH', '0') in ('1', 'true', 'yes'):
+            return _user_id(header(event, 'X-User-Id')), False
+        return None, False
+    return _user_id(header(event, 'X-User-Id')), header(event, 'X-Is-Admin') == 'true'
+
+
+def preflight(methods: str, allow_headers: str) -> Dict[str, Any]:
+    '''CORS answer for OPTIONS; browsers cache it for a day'''
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Methods': methods,
+            'Access-Control-Allow-Headers': allow_headers,
+            'Access-Control-Max-Age': '86400'
+        },
+        'body': '',
+        'isBase64Encoded': False
+    }
+
+
+def json_response(status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return {
+        'statusCode': status,
+        'headers': {**JSON_HEADERS, **(headers or {})},
+        'body': instrument.dumps(payload),
+        'isBase64Encoded': False
+    }
@@ -0,0 +1,123 @@
+import csv
+import io
+import itertools
+import json
+import os
+from typing import Dict, Any, Callable, Iterator, List, TextIO
+
+from shared.transfer.exporter import csv_line
+from shared.transfer.tables import SEQUENCES, TABLES
+
+BATCH_SIZE = 5000
+
+
+def csv_records(f: TextIO) -> Iterator[str]:
+    '''
+    Raw CSV records of an export file without the header line. Records are
+    passed to COPY untouched; csv.reader only finds where each one ends, so
+    quoted line breaks in examples stay inside their record.
+    '''
+    consumed: List[str] = []
+
+    def lines() -> Iterator[str]:
+        for line in f:
+            consumed.append(line)
+            yield line
+
+    for index, _ in enumerate(csv.reader(lines())):
+        record = ''.join(consumed)
+        consumed.clear()
+        if index:
+            yield record
+
+
+def ndjson_records(f: TextIO, columns: List[str]) -> Iterator[str]:
+    '''NDJSON rows re-encoded as the CSV records COPY expects'''
+    for line in f:
+        if line.strip():
+            record = json.loads(line)
+            yield csv_line(record.get(name) for name in columns)
+
+
+def load_table(conn: Any, table_name: str, records: Iterator[str], done: int, batch_size: int,
+               checkpoint: Callable[[int], None]) -> Dict[str, int]:
+    '''
+    Loads records after the first `done` ones in batches of batch_size. Each
+    batch is staged with COPY, moved with the table's INSERT ... SELECT and
+    committed on its own, then checkpoint() records how far the file got.
+    Re-running a batch after a crash is harmless: every load is an upsert.
+    '''
+    table = TABLES[table_name]
+    columns = ', '.join(table.columns)
+    cur = conn.cursor()
+    read = 0
+    applied = 0
+    remaining = itertools.islice(records, done, None)
+    while True:
+        batch = list(itertools.islice(remaining, batch_size))
+        if not batch:
+            break
+        cur.execute(f"CREATE TEMP TABLE transfer_stage ON COMMIT DROP AS SELECT {columns} FROM {table.name} WITH NO DATA")
+        cur.copy_expert(f"COPY transfer_stage ({columns}) FROM STDIN WITH (FORMAT csv)", io.StringIO(''.join(batch)))
+        cur.execute(table.load)
+        applied += max(cur.rowcount, 0)
+        conn.commit()
+        read += len(batch)
+        checkpoint(done + read)
+    cur.close()
+    return {'read': read, 'applied': applied, 'skipped': read - applied}
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    '''Write-then-rename so an interrupted run never leaves a torn state file'''
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def load_dump(conn: Any, directory: str, state_path: str, restart: bool = False,
+              batch_size: int = BATCH_SIZE, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    '''
+    Imports an export directory (manifest.json plus one file per table)
+    parents first. Progress is kept in state_path as records done per table,
+    so a rerun after a failure continues with the first uncommitted batch.
+    '''
+    manifest = _read_json(os.path.join(directory, 'manifest.json'))
+    state: Dict[str, Any] = {} if restart or not os.path.exists(state_path) else _read_json(state_path)
+    progress: Dict[str, int] = state.setdefault('tables', {})
+    report: Dict[str, Any] = {}
+
+    for name, table in TABLES.items():
+        entry = manifest['tables'].get(name)
+        if entry is None:
+            continue
+        if tuple(entry['columns']) != table.columns:
+            raise ValueError(f"{name}: export columns {entry['columns']} do not match this schema {list(table.columns)}")
+        done = progress.get(name, 0)
+        if done >= entry['rows']:
+            report[name] = {'read': 0, 'applied': 0, 'skipped': 0, 'resumedAt': done}
+            continue
+        if done:
+            log(f'{name}: resuming after {done} of {entry["rows"]} rows')
+
+        def checkpoint(count: int, name: str = name) -> None:
+            progress[name] = count
+            _write_json(state_path, state)
+
+        with open(os.path.join(directory, entry['file']), encoding='utf-8', newline='') as f:
+            records = csv_records(f) if manifest['format'] == 'csv' else ndjson_records(f, list(table.columns))
+            report[name] = load_table(conn, name, records, done, batch_size, checkpoint)
+        report[name]['resumedAt'] = done
+        log(f"{name}: {report[name]['applied']} applied, {report[name]['skipped']} skipped")
+
+    cur = conn.cursor()
+    for name in SEQUENCES:
+        cur.execute(f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), GREATEST((SELECT MAX(id) FROM {name}), 1))")
+    conn.commit()
+    cur.close()
+    return report
@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from shared import db
+from shared.text import fold
+
+# Model output never overwrites confirmed or admin-edited rows (V0019)
+UPSERT_SQL = """INSERT INTO global_words (russian, normalized, english, russian_example, english_example, source)
+                VALUES %s
+                ON CONFLICT (normalized) DO UPDATE SET
+                    english = EXCLUDED.english,
+                    russian_example = EXCLUDED.russian_example,
+                    english_example = EXCLUDED.english_example,
+                    source = EXCLUDED.source,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE dictionary_source_rank(EXCLUDED.source) >= dictionary_source_rank(global_words.source)"""
+
+
+class LRUCache:
+    '''Thread-safe in-process LRU with per-entry TTL'''
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            stored_at, value = item
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class TranslationCache:
+    '''
+    Two-level translation cache: in-process LRU in front of the global_words table.
+    Model-sourced rows older than store_ttl seconds are treated as misses and
+    refreshed; rows confirmed through a saved card or edited by an admin never
+    expire. The store is skipped entirely when DATABASE_URL is not configured.
+    '''
+
+    def __init__(self, memory: LRUCache, store_ttl: float = 0.0):
+        self.memory = memory
+        self.store_ttl = store_ttl
+        self._lock = threading.Lock()
+        self.store_hits = 0
+        self.store_misses = 0
+        self.store_errors = 0
+
+    @property
+    def store_enabled(self) -> bool:
+        return bool(os.environ.get('DATABASE_URL'))
+
+    def get(self, word: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        '''Returns (translation, level) where level is memory, store or miss'''
+        return self.get_many([word])[fold(word)]
+
+    def get_many(self, words: List[str]) -> Dict[str, Tuple[Optional[Dict[str, Any]], str]]:
+        '''
+        Looks up several words at once, keyed by normalized word. Memory misses
+        are resolved with a single store query.
+        '''
+        results: Dict[str, Tuple[Optional[Dict[str, Any]], str]] = {}
+        pending: List[str] = []
+        for word in words:
+            key = fold(word)
+            if key in results or key in pending:
+                continue
+            cached = self.memory.get(key)
+            if cached is not None:
+                results[key] = (cached, 'memory')
+            else:
+                pending.append(key)
+
+        found: Dict[str, Dict[str, Any]] = {}
+        if pending and self.store_enabled:
+            try:
+                found = self._load_many(pending)
+            except Exception:
+                with self._lock:
+                    self.store_errors += 1
+            with self._lock:
+                self.store_hits += len(found)
+                self.store_misses += len(pending) - len(found)
+
+        for key in pending:
+            if key in found:
+                self.memory.put(key, found[key])
+                results[key] = (found[key], 'store')
+            else:
+                results[key] = (None, 'miss')
+        return results
+
+    def put(self, word: str, translation: Dict[str, Any], source: str = 'model') -> None:
+        self.put_many([(word, translation)], source)
+
+    def put_many(self, items: List[Tuple[str, Dict[str, Any]]], source: str = 'model') -> None:
+        '''Stores several translations with one multi-row upsert'''
+        rows: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for word, translation in items:
+            key = fold(word)
+            self.memory.put(key, translation)
+            rows[key] = (word.strip(), translation)
+        if not rows or not self.store_enabled:
+            return
+        try:
+            self._save_many(rows, source)
+        except Exception:
+            with self._lock:
+                self.store_errors += 1
+
+    def _load_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        with db.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """SELECT normalized, english, russian_example, english_example, source,
+                          EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - updated_at))
+                   FROM global_words WHERE normalized = ANY(%s)""",
+                (keys,)
+            )
+            rows = cur.fetchall()
+            cur.close()
+        found = {}
+        for row in rows:
+            if not row[1]:
+                continue
+            if self.store_ttl and row[4] == 'model' and row[5] is not None and float(row[5]) > self.store_ttl:
+                continue
+            found[row[0]] = {
+                'english': row[1],
+                'russianExample': row[2] or '',
+                'englishExample': row[3] or ''
+            }
+        return found
+
+    def _save_many(self, rows: Dict[str, Tuple[str, Dict[str, Any]]], source: str) -> None:
+        # Imported on first write so cache hits never pay for psycopg2.extras
+        import psycopg2
+        from psycopg2.extras import execute_values
+
+        values = [
+            (russian, key, translation.get('english', ''), translation.get('russianExample', ''),
+             translation.get('englishExample', ''), source)
+            for key, (russian, translation) in rows.items()
+        ]
+        with db.connection() as conn:
+            cur = conn.cursor()
+            try:
+                execute_values(cur, UPSERT_SQL, values)
+            except psycopg2.IntegrityError:
+                # A legacy row holds the same russian under another key (UNIQUE
+                # russian, V0002): retry word by word so only that word is skipped
+                conn.rollback()
+                skipped = 0
+                for value in values:
+                    cur.execute("SAVEPOINT cache_word")
+                    try:
+                        execute_values(cur, UPSERT_SQL, [value])
+                    except psycopg2.IntegrityError:
+                        cur.execute("ROLLBACK TO SAVEPOINT cache_word")
+                        skipped += 1
+                    else:
+                        cur.execute("RELEASE SAVEPOINT cache_word")
+                with self._lock:
+                    self.store_errors += skipped
+            conn.commit()
+            cur.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            store = {
+                'enabled': self.store_enabled,
+                'hits': self.store_hits,
+                'misses': self.store_misses,
+                'errors': self.store_errors,
+                'ttl': self.store_ttl
+            }
+        return {'memory': self.memory.stats(), 'store': store}
+
+
+_cache: Optional[TranslationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> TranslationCache:
+    '''
+    Process-wide cache sized by TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL
+    (memory, seconds) and TRANSLATION_STORE_TTL (global_words, seconds, 0 = forever).
+    '''
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TranslationCache(
+                    LRUCache(
+                        maxsize=int(os.environ.get('TRANSLATION_CACHE_SIZE', '2048')),
+                        ttl=float(os.environ.get('TRANSLATION_CACHE_TTL', '3600'))
+                    ),
+                    store_ttl=float(os.environ.get('TRANSLATION_STORE_TTL', '0'))
+                )
+    return _cache
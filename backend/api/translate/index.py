@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from shared import encoding, http, instrument
+from shared.text import fold
+from translate.cache import get_cache
+from translate.upstream import RateLimited, UpstreamError, get_gate
+
+MAX_BATCH_WORDS = 500
+BATCH_CONCURRENCY = int(os.environ.get('TRANSLATE_BATCH_CONCURRENCY', '4'))
+
+_session: Optional[Any] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> Any:
+    '''Shared HTTP session so upstream connections stay open across calls and warm invocations'''
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(BATCH_CONCURRENCY, 1))
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def _translate_with_model(russian_word: str, api_key: str) -> Dict[str, Any]:
+    '''Calls the chat model once; raises on transport errors and UpstreamError on non-200 answers'''
+    base_url = os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1').rstrip('/')
+    response = _get_session().post(
+        f'{base_url}/chat/completions',
+        headers={
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        },
+        json={
+            'model': 'gpt-3.5-turbo',
+            'messages': [
+                {
+                    'role': 'system',
+                    'content': 'You are a helpful language teacher. Translate Russian words to English and provide example sentences in both languages. Respond ONLY with valid JSON in this exact format: {"english": "word", "russianExample": "sentence", "englishExample": "sentence"}'
+                },
+                {
+                    'role': 'user',
+                    'content': f'Translate this Russian word to English and provide example sentences: {russian_word}'
+                }
+            ],
+            'temperature': 0.3,
+            'max_tokens': 200
+        },
+        timeout=10
+    )
+    
+    if response.status_code != 200:
+        raise UpstreamError(response.status_code, response.headers.get('Retry-After'))
+    
+    result = response.json()
+    content = result['choices'][0]['message']['content']
+    
+    translation_data = json.loads(content)
+    
+    return {
+        'english': translation_data.get('english', ''),
+        'russianExample': translation_data.get('russianExample', f'{russian_word} в предложении'),
+        'englishExample': translation_data.get('englishExample', 'Example sentence')
+    }
+
+
+def _fetch_translation(russian_word: str, api_key: str) -> Dict[str, Any]:
+    '''Model call behind the upstream gate: concurrent requests for one word share a call'''
+    return get_gate().call(fold(russian_word), lambda: _translate_with_model(russian_word, api_key))
+
+
+def translate_batch(words: List[str], api_key: Optional[str]) -> List[Dict[str, Any]]:
+    '''
+    Translates a list of words: duplicates share one lookup, cache hits are
+    served locally and misses fan out to the model with bounded concurrency.
+    Returns one entry per input word, with an error entry for words that failed.
+    Also used by the background enrichment worker (python -m enrichment).
+    '''
+    cache = get_cache()
+    cached = cache.get_many(words)
+    
+    first_word: Dict[str, str] = {}
+    for word in words:
+        first_word.setdefault(fold(word), word)
+    misses = [key for key, (translation, _) in cached.items() if translation is None]
+    
+    outcomes: Dict[str, Dict[str, Any]] = {
+        key: {**translation, 'source': level}
+        for key, (translation, level) in cached.items() if translation is not None
+    }
+    
+    if misses and not api_key:
+        for key in misses:
+            outcomes[key] = {'error': 'OpenAI API key not configured'}
+    elif misses:
+        def run(key: str) -> Dict[str, Any]:
+            try:
+                return _fetch_translation(first_word[key], api_key)
+            except RateLimited as e:
+                return {'error': str(e)}
+            except Exception as e:
+                return {'error': f'Translation error: {str(e)}'}
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(BATCH_CONCURRENCY, len(misses)))) as pool:
+            translated = list(pool.map(run, misses))
+        
+        fresh = []
+        for key, result in zip(misses, translated):
+            if 'error' not in result and result.get('english'):
+                fresh.append((first_word[key], result))
+                outcomes[key] = {**result, 'source': 'model'}
+            else:
+                outcomes[key] = result
+        cache.put_many(fresh)
+    
+    return [{'russian': word, **outcomes[fold(word)]} for word in words]
+
+
+@instrument.traced('translate')
+@encoding.compressed
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: AI-powered translation and example generation for word cards
+    Args: event - dict with httpMethod, body containing russian word or words list;
+                  GET returns translation cache and upstream limiter counters
+          context - object with request_id
+    Returns: HTTP response with translation and example sentences
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return http.preflight('GET, POST, OPTIONS', 'Content-Type')
+    
+    if method == 'GET':
+        return http.json_response(200, {'cache': get_cache().stats(), 'upstream': get_gate().stats()})
+    
+    if method != 'POST':
+        return http.json_response(405, {'error': 'Method not allowed'})
+    
+    body_data = json.loads(event.get('body', '{}'))
+    
+    if 'words' in body_data:
+        words = [w.strip() for w in body_data.get('words') or [] if isinstance(w, str) and w.strip()]
+        
+        if not words or len(words) > MAX_BATCH_WORDS:
+            return http.json_response(400, {'error': f'Between 1 and {MAX_BATCH_WORDS} words required'})
+        
+        results = translate_batch(words, os.environ.get('OPENAI_API_KEY'))
+        
+        return http.json_response(200, {
+            'results': results,
+            'failed': sum(1 for r in results if 'error' in r)
+        })
+    
+    russian_word = body_data.get('russian', '').strip()
+    
+    if not russian_word:
+        return http.json_response(400, {'error': 'Russian word required'})
+    
+    cache = get_cache()
+    cached, level = cache.get(russian_word)
+    
+    if cached is not None:
+        return http.json_response(200, cached, {
+            'Access-Control-Expose-Headers': 'X-Cache',
+            'X-Cache': f'HIT-{level.upper()}'
+        })
+    
+    api_key = os.environ.get('OPENAI_API_KEY')
+    
+    if not api_key:
+        return http.json_response(500, {'error': 'OpenAI API key not configured'})
+    
+    try:
+        translation = _fetch_translation(russian_word, api_key)
+    except RateLimited as e:
+        return http.json_response(429, {'error': str(e)}, {'Retry-After': str(max(1, round(e.retry_after)))})
+    except RuntimeError as e:
+        return http.json_response(500, {'error': str(e)})
+    except Exception as e:
+        return http.json_response(500, {'error': f'Translation error: {str(e)}'})
+    
+    if translation['english']:
+        cache.put(russian_word, translation)
+    
+    return http.json_response(200, translation, {'Access-Control-Expose-Headers': 'X-Cache', 'X-Cache': 'MISS'})
@@ -0,0 +1,222 @@
+import os
+import random
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+
+class UpstreamError(RuntimeError):
+    '''Non-200 answer from the model API; 429 and 5xx are worth retrying'''
+
+    def __init__(self, status: int, retry_after: Optional[str] = None):
+        super().__init__('OpenAI API error')
+        self.status = status
+        try:
+            self.retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            self.retry_after = None
+
+    @property
+    def retryable(self) -> bool:
+        return self.status == 429 or self.status >= 500
+
+
+class RateLimited(RuntimeError):
+    '''No upstream slot became free within the limiter's bounded wait'''
+
+    def __init__(self, retry_after: float):
+        super().__init__('Translation rate limit exceeded, retry later')
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    '''
+    Thread-safe token bucket: `rate` tokens per second up to `capacity`.
+    Callers queue in acquire() for at most max_wait seconds.
+    '''
+
+    def __init__(self, rate: float, capacity: float, max_wait: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self.granted = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.wait_time_total = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> bool:
+        '''Takes one token; returns False when none was available within max_wait'''
+        with self._cond:
+            start = time.monotonic()
+            deadline = start + self.max_wait
+            self._refill(start)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.granted += 1
+                return True
+
+            self.throttled += 1
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.granted += 1
+                        return True
+                    if now >= deadline:
+                        self.rejected += 1
+                        return False
+                    self._cond.wait(min(deadline - now, (1 - self._tokens) / self.rate))
+            finally:
+                self.waiting -= 1
+                self.wait_time_total += time.monotonic() - start
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                'rate': self.rate,
+                'capacity': self.capacity,
+                'tokens': round(self._tokens, 2),
+                'granted': self.granted,
+                'throttled': self.throttled,
+                'rejected': self.rejected,
+                'queueDepth': self.waiting,
+                'maxQueueDepth': self.max_waiting,
+                'waitTimeTotal': round(self.wait_time_total, 3)
+            }
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    '''Concurrent calls with the same key share one execution of the function'''
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'inFlight': len(self._calls), 'executed': self.executed, 'coalesced': self.coalesced}
+
+
+class UpstreamGate:
+    '''
+    Everything between a cache miss and the model API: single-flight per
+    normalized word, a token bucket shared by all threads of this instance and
+    retries with full-jitter exponential backoff on 429/5xx (Retry-After is
+    honoured up to backoff_cap). Each retry takes a fresh token.
+    '''
+
+    def __init__(self, bucket: TokenBucket, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_cap: float = 8.0):
+        self.bucket = bucket
+        self.flight = SingleFlight()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.failures = 0
+
+    def call(self, key: str, fn: Callable[[], Any]) -> Any:
+        return self.flight.do(key, lambda: self._with_retries(fn))
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_cap))
+        return delay
+
+    def _with_retries(self, fn: Callable[[], Any]) -> Any:
+        attempt = 0
+        while True:
+            if not self.bucket.acquire():
+                raise RateLimited(retry_after=round(1 / self.bucket.rate, 1))
+            try:
+                return fn()
+            except UpstreamError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self._backoff(attempt, e.retry_after))
+                attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {'retries': self.retries, 'failures': self.failures}
+        return {'limiter': self.bucket.stats(), 'singleFlight': self.flight.stats(), **counters}
+
+
+_gate: Optional[UpstreamGate] = None
+_gate_lock = threading.Lock()
+
+
+def get_gate() -> UpstreamGate:
+    '''
+    Process-wide gate configured by TRANSLATE_RATE (calls per second),
+    TRANSLATE_BURST, TRANSLATE_MAX_WAIT (seconds in queue) and
+    TRANSLATE_MAX_RETRIES. Limits apply per function instance.
+    '''
+    global _gate
+    if _gate is None:
+        with _gate_lock:
+            if _gate is None:
+                _gate = UpstreamGate(
+                    TokenBucket(
+                        rate=float(os.environ.get('TRANSLATE_RATE', '3')),
+                        capacity=float(os.environ.get('TRANSLATE_BURST', '5')),
+                        max_wait=float(os.environ.get('TRANSLATE_MAX_WAIT', '5'))
+                    ),
+                    max_retries=int(os.environ.get('TRANSLATE_MAX_RETRIES', '2'))
+                )
+    return _gate
@@ -0,0 +1,93 @@
+import json
+import hmac
+import time
+from typing import Dict, Any
+
+from shared import db, encoding, http, instrument, roster, tokens
+
+
+def session(user_id: int, username: str, is_admin: bool) -> Dict[str, Any]:
+    '''Login/register payload; carries a signed session token when SESSION_SECRET is set'''
+    payload: Dict[str, Any] = {'userId': user_id, 'username': username, 'isAdmin': is_admin}
+    issued = tokens.issue(user_id, is_admin)
+    if issued:
+        payload['token'], expires = issued
+        payload['expiresAt'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(expires))
+    return payload
+
+
+@instrument.traced('auth', log_sql=False)
+@encoding.compressed
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Authentication API for user login and registration
+    Args: event - dict with httpMethod, body, queryStringParameters
+          context - object with request_id
+    Returns: HTTP response with user session data
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return http.preflight('POST, OPTIONS', 'Content-Type, X-User-Id')
+    
+    if method != 'POST':
+        return http.json_response(405, {'error': 'Method not allowed'})
+    
+    body_data = json.loads(event.get('body', '{}'))
+    action = body_data.get('action')
+    username = body_data.get('username', '').strip()
+    password = body_data.get('password', '')
+    
+    if not username or not password:
+        return http.json_response(400, {'error': 'Username and password required'})
+    
+    password_hash = roster.hash_password(password)
+    
+    with db.connection() as conn:
+        cur = conn.cursor()
+        
+        if action == 'register':
+            cur.execute(
+                "INSERT INTO users (username, password_hash) VALUES (%s, %s) ON CONFLICT (username) DO NOTHING RETURNING id",
+                (username, password_hash)
+            )
+            created = cur.fetchone()
+            
+            if not created:
+                conn.rollback()
+                cur.close()
+                return http.json_response(400, {'error': 'Username already exists'})
+            
+            user_id = created[0]
+            roster.add_default_categories(cur, [user_id])
+            conn.commit()
+            cur.close()
+            
+            return http.json_response(200, session(user_id, username, False))
+        
+        elif action == 'login':
+            # One round trip: an admin account shadows a user with the same name
+            cur.execute(
+                """SELECT id, username, password_hash, is_admin FROM (
+                       SELECT id, username, password_hash, TRUE AS is_admin FROM admins WHERE username = %s
+                       UNION ALL
+                       SELECT id, username, password_hash, FALSE FROM users WHERE username = %s
+                   ) accounts
+                   ORDER BY is_admin DESC
+                   LIMIT 1""",
+                (username, username)
+            )
+            account = cur.fetchone()
+            
+            if account and account[3] and account[2] == 'admin':
+                # First admin login replaces the placeholder with the chosen password
+                cur.execute("UPDATE admins SET password_hash = %s WHERE id = %s", (password_hash, account[0]))
+                conn.commit()
+            elif not account or not hmac.compare_digest(account[2] or '', password_hash):
+                cur.close()
+                return http.json_response(401, {'error': 'Invalid credentials'})
+            cur.close()
+            
+            return http.json_response(200, session(account[0], account[1], account[3]))
+        
+        return http.json_response(400, {'error': 'Invalid action'})
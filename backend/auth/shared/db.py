@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Generator, List, Optional, Iterator, Tuple
+
+import psycopg2
+import psycopg2.extensions
+
+from shared import instrument
+
+
+# A read path written once for both drivers: yields (sql, params), is sent back
+# each statement's rows and returns its result. See run_plan and server.pg.run_plan.
+Plan = Generator[Tuple[str, List[Any]], List[Any], Any]
+
+
+class PoolTimeout(Exception):
+    '''Raised when no connection becomes available within the pool timeout'''
+
+
+class ConnectionPool:
+    '''
+    Process-level Postgres connection pool that survives warm invocations.
+    Idle connections are health-checked before reuse and recycled after
+    max_lifetime seconds, so a stale socket never reaches a handler.
+    '''
+
+    def __init__(
+        self,
+        dsn: str,
+        minconn: int = 0,
+        maxconn: int = 4,
+        timeout: float = 5.0,
+        max_lifetime: float = 1800.0,
+        max_idle: float = 300.0,
+        check_after: float = 30.0,
+        connect_timeout: int = 5,
+        connection_factory: Any = None,
+    ):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.connect_timeout = connect_timeout
+        self.connection_factory = connection_factory
+
+        self._lock = threading.Condition()
+        self._idle: List[Any] = []
+        self._born: Dict[int, float] = {}
+        self._returned: Dict[int, float] = {}
+        self._size = 0
+        self._closed = False
+        self._metrics: Dict[str, float] = {
+            'connects': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'connect_failures': 0,
+            'health_check_failures': 0,
+            'recycled': 0,
+            'discarded': 0,
+        }
+
+        for _ in range(minconn):
+            conn = self._connect()
+            self._size += 1
+            self._idle.append(conn)
+            self._returned[id(conn)] = time.monotonic()
+
+    def _connect(self) -> Any:
+        try:
+            conn = psycopg2.connect(self.dsn, connect_timeout=self.connect_timeout,
+                                    connection_factory=self.connection_factory)
+        except Exception:
+            with self._lock:
+                self._metrics['connect_failures'] += 1
+            raise
+        with self._lock:
+            self._metrics['connects'] += 1
+            self._born[id(conn)] = time.monotonic()
+        return conn
+
+    def _drop(self, conn: Any) -> None:
+        '''Close a connection and release its slot; caller must hold no lock'''
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._size -= 1
+            self._born.pop(id(conn), None)
+            self._returned.pop(id(conn), None)
+            self._lock.notify()
+
+    def _is_usable(self, conn: Any) -> bool:
+        now = time.monotonic()
+        if conn.closed:
+            return False
+        if now - self._born.get(id(conn), now) > self.max_lifetime:
+            with self._lock:
+                self._metrics['recycled'] += 1
+            return False
+        idle_for = now - self._returned.get(id(conn), now)
+        if idle_for > self.max_idle:
+            with self._lock:
+                self._metrics['recycled'] += 1
+            return False
+        if idle_for > self.check_after:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+            except Exception:
+                with self._lock:
+                    self._metrics['health_check_failures'] += 1
+                return False
+        return True
+
+    def getconn(self) -> Any:
+        '''Check out a healthy connection, waiting up to timeout seconds for a free slot'''
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise PoolTimeout('Connection pool is closed')
+                conn = None
+                reserve = False
+                if self._idle:
+                    conn = self._idle.pop()
+                elif self._size < self.maxconn:
+                    self._size += 1
+                    reserve = True
+                else:
+                    remaining = self.timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeout(f'No database connection available within {self.timeout}s')
+                    waited = True
+                    self._lock.wait(remaining)
+                    continue
+
+            if reserve:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+            elif not self._is_usable(conn):
+                self._drop(conn)
+                continue
+
+            waited_for = time.monotonic() - started
+            with self._lock:
+                self._metrics['checkouts'] += 1
+                if waited:
+                    self._metrics['waits'] += 1
+                self._metrics['wait_time_total'] += waited_for
+                self._metrics['wait_time_max'] = max(self._metrics['wait_time_max'], waited_for)
+                self._returned.pop(id(conn), None)
+            return conn
+
+    def putconn(self, conn: Any, discard: bool = False) -> None:
+        '''Return a connection; anything left in a transaction is rolled back first'''
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        if discard or conn.closed or self._closed:
+            with self._lock:
+                self._metrics['discarded'] += 1
+            self._drop(conn)
+            return
+        with self._lock:
+            self._returned[id(conn)] = time.monotonic()
+            self._idle.append(conn)
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        '''Borrow a connection for the duration of a with-block'''
+        started = time.perf_counter()
+        conn = self.getconn()
+        instrument.record_checkout((time.perf_counter() - started) * 1000)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def stats(self) -> Dict[str, Any]:
+        '''Snapshot of pool counters for logging and diagnostics'''
+        with self._lock:
+            result: Dict[str, Any] = dict(self._metrics)
+            result['size'] = self._size
+            result['idle'] = len(self._idle)
+            result['in_use'] = self._size - len(self._idle)
+            result['max_size'] = self.maxconn
+        checkouts = result['checkouts'] or 1
+        result['wait_time_avg'] = round(result['wait_time_total'] / checkouts, 6)
+        return result
+
+    def closeall(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._drop(conn)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    '''
+    Returns the process-wide pool, creating it on first use from DATABASE_URL.
+    Sizing can be tuned with DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT
+    and DB_POOL_MAX_LIFETIME.
+    '''
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    os.environ.get('DATABASE_URL', ''),
+                    minconn=int(os.environ.get('DB_POOL_MIN_SIZE', '0')),
+                    maxconn=int(os.environ.get('DB_POOL_MAX_SIZE', '4')),
+                    timeout=float(os.environ.get('DB_POOL_TIMEOUT', '5')),
+                    max_lifetime=float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),
+                    connection_factory=instrument.InstrumentedConnection,
+                )
+    return _pool
+
+
+def connection():
+    '''Shortcut for get_pool().connection()'''
+    return get_pool().connection()
+
+
+def pool_stats() -> Dict[str, Any]:
+    return get_pool().stats() if _pool is not None else {}
+
+
+def run_plan(cur: Any, plan: Plan) -> Any:
+    '''Drives a query plan on a psycopg2 cursor and returns the plan's result'''
+    rows: Any = None
+    while True:
+        try:
+            sql, params = plan.send(rows)
+        except StopIteration as done:
+            return done.value
+        cur.execute(sql, params)
+        rows = cur.fetchall()
@@ -0,0 +1,103 @@
+from typing import Dict, NamedTuple, Tuple
+
+
+class Table(NamedTuple):
+    '''
+    One exportable table: the key that orders the stream (and pages the
+    export endpoint), the exported columns and the statement that moves a
+    staged batch into the live table on import.
+    '''
+    name: str
+    key: Tuple[str, ...]
+    columns: Tuple[str, ...]
+    load: str
+
+
+# Listed parents first, the order import has to follow. Revisions, word links
+# and user_progress.id belong to the database they live in and are not
+# exported; the target assigns its own. Rows whose parents are missing on the
+# target (users are never exported) are skipped instead of failing the batch.
+TABLES: Dict[str, Table] = {t.name: t for t in (
+    Table(
+        'categories', ('id',),
+        ('id', 'user_id', 'name', 'color', 'created_at'),
+        """INSERT INTO categories (id, user_id, name, color, created_at)
+           SELECT s.id, s.user_id, s.name, s.color, s.created_at
+           FROM transfer_stage s
+           WHERE s.user_id IS NULL OR EXISTS (SELECT 1 FROM users u WHERE u.id = s.user_id)
+           ON CONFLICT DO NOTHING"""
+    ),
+    Table(
+        'groups', ('id',),
+        ('id', 'name', 'description', 'color', 'course', 'created_at'),
+        """INSERT INTO groups (id, name, description, color, course, created_at)
+           SELECT s.id, s.name, s.description, s.color, s.course, s.created_at
+           FROM transfer_stage s
+           ON CONFLICT (id) DO UPDATE SET
+               name = EXCLUDED.name, description = EXCLUDED.description,
+               color = EXCLUDED.color, course = EXCLUDED.course"""
+    ),
+    Table(
+        'cards', ('id',),
+        ('id', 'user_id', 'category_id', 'russian', 'russian_example', 'english', 'english_example',
+         'course', 'created_at'),
+        """INSERT INTO cards (id, user_id, category_id, russian, russian_example, english, english_example,
+                              course, created_at, word_id)
+           SELECT s.id, u.id, cat.id, s.russian, s.russian_example, s.english, s.english_example,
+                  s.course, COALESCE(s.created_at, CURRENT_TIMESTAMP), w.id
+           FROM transfer_stage s
+           LEFT JOIN users u ON u.id = s.user_id
+           LEFT JOIN categories cat ON cat.id = s.category_id
+           LEFT JOIN global_words w ON w.normalized = search_fold(s.russian)
+           ON CONFLICT (id) DO UPDATE SET
+               category_id = EXCLUDED.category_id, russian = EXCLUDED.russian,
+               russian_example = EXCLUDED.russian_example, english = EXCLUDED.english,
+               english_example = EXCLUDED.english_example, course = EXCLUDED.course,
+               word_id = EXCLUDED.word_id"""
+    ),
+    Table(
+        'card_groups', ('card_id', 'group_id'),
+        ('card_id', 'group_id', 'created_at'),
+        """INSERT INTO card_groups (card_id, group_id, created_at)
+           SELECT s.card_id, s.group_id, s.created_at
+           FROM transfer_stage s
+           JOIN cards c ON c.id = s.card_id
+           JOIN groups g ON g.id = s.group_id
+           ON CONFLICT DO NOTHING"""
+    ),
+    Table(
+        'user_progress', ('id',),
+        ('user_id', 'card_id', 'is_learned', 'created_at', 'updated_at', 'ease', 'interval_days',
+         'repetitions', 'lapses', 'due_at', 'last_reviewed_at'),
+        """INSERT INTO user_progress (user_id, card_id, is_learned, created_at, updated_at, ease, interval_days,
+                                      repetitions, lapses, due_at, last_reviewed_at)
+           SELECT s.user_id, s.card_id, s.is_learned, s.created_at, s.updated_at, s.ease, s.interval_days,
+                  s.repetitions, s.lapses, s.due_at, s.last_reviewed_at
+           FROM transfer_stage s
+           JOIN users u ON u.id = s.user_id
+           JOIN cards c ON c.id = s.card_id
+           ON CONFLICT (user_id, card_id) DO UPDATE SET
+               is_learned = EXCLUDED.is_learned, updated_at = EXCLUDED.updated_at,
+               ease = EXCLUDED.ease, interval_days = EXCLUDED.interval_days,
+               repetitions = EXCLUDED.repetitions, lapses = EXCLUDED.lapses,
+               due_at = EXCLUDED.due_at, last_reviewed_at = EXCLUDED.last_reviewed_at
+           WHERE user_progress.updated_at IS NULL OR user_progress.updated_at <= EXCLUDED.updated_at"""
+    ),
+)}
+
+# Serial ids are imported as-is, so their sequences are moved past them afterwards
+SEQUENCES = ('categories', 'groups', 'cards')
+
+FORMATS = {'ndjson': ('ndjson', 'application/x-ndjson'), 'csv': ('csv', 'text/csv')}
+
+
+def parse_key(table: Table, value: str) -> Tuple[int, ...]:
+    '''"12" or "12,5" (composite keys) -> a tuple matching table.key; raises ValueError'''
+    parts = tuple(int(part) for part in value.split(','))
+    if len(parts) != len(table.key):
+        raise ValueError(f'{table.name} keys have {len(table.key)} part(s)')
+    return parts
+
+
+def format_key(key: Tuple[int, ...]) -> str:
+    return ','.join(str(part) for part in key)
@@ -0,0 +1,112 @@
+'''
+Local benchmark for the backend functions.
+
+    cd backend && python -m bench --admin-url postgresql://postgres@localhost/postgres
+
+Creates a scratch database from db_migrations, seeds it, starts a fake OpenAI
+server, replays the tests.json specs of every function in-process at the
+given concurrency and writes the results as JSON (see --output, --compare).
+The scratch database is dropped afterwards unless --keep is given.
+'''
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deploy
+
+deploy.use_source_tree()
+
+from bench import runner, seed, specs
+from bench.fake_openai import FakeOpenAI
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Benchmark backend handlers locally')
+    parser.add_argument('--admin-url', default=os.environ.get('BENCH_ADMIN_URL', 'postgresql://postgres@localhost/postgres'),
+                        help='superuser DSN of a disposable local server (used to create/drop the scratch DB)')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--cards', type=int, default=50000)
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--progress', type=int, default=1000000)
+    parser.add_argument('--words', type=int, default=20000, help='global_words dictionary entries')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--functions', help='comma-separated subset, e.g. cards,accounts')
+    parser.add_argument('--mix', help='per-function weights, e.g. cards=5,accounts=1')
+    parser.add_argument('--read-only', action='store_true', help='replay GET specs only')
+    parser.add_argument('--openai-latency', type=float, default=0.3, help='fake upstream delay in seconds')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the request mix')
+    parser.add_argument('--output', help='result file (default bench_results/bench-<timestamp>.json)')
+    parser.add_argument('--compare', help='previous result file to diff against')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch database')
+    args = parser.parse_args()
+
+    dbname = f'bench_{os.getpid()}_{int(time.time())}'
+    print(f'creating scratch database {dbname}', file=sys.stderr)
+    dsn = seed.create_database(args.admin_url, dbname)
+    fake = FakeOpenAI(latency=args.openai_latency).start()
+    try:
+        migrations = seed.apply_migrations(dsn)
+        print(f'applied {migrations} migrations, seeding', file=sys.stderr)
+        seeded = seed.seed(dsn, args.users, args.cards, args.groups, args.progress, args.words)
+        print(f"seeded in {seeded['seconds']}s: {seeded['rows']}", file=sys.stderr)
+
+        os.environ['DATABASE_URL'] = dsn
+        os.environ['OPENAI_API_KEY'] = 'bench'
+        os.environ['OPENAI_BASE_URL'] = fake.base_url
+        os.environ.setdefault('DB_POOL_MAX_SIZE', str(args.concurrency))
+        os.environ.setdefault('REQUEST_LOG', '0')
+
+        from shared import db
+
+        functions = args.functions.split(',') if args.functions else None
+        replay = specs.load_specs(functions, read_only=args.read_only)
+        print(f'replaying {args.requests} requests over {len(replay)} specs at concurrency {args.concurrency}',
+              file=sys.stderr)
+        result = runner.run(replay, specs.parse_mix(args.mix), args.requests, args.concurrency, args.seed)
+        result.update({
+            'startedAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'config': {k: v for k, v in vars(args).items() if k not in ('admin_url', 'output', 'compare')},
+            'seed': seeded,
+            'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+            'pool': db.pool_stats(),
+            'upstreamCalls': fake.calls
+        })
+        db.get_pool().closeall()
+    finally:
+        fake.stop()
+        if not args.keep:
+            seed.drop_database(args.admin_url, dbname)
+
+    output = args.output or os.path.join('bench_results', f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(f"{'function':<11}{'spec':<45}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'bytes':>10}{'bad':>5}")
+    for row in result['specs']:
+        print(f"{row['function']:<11}{row['name'][:44]:<45}{row['count']:>6}"
+              f"{row['latencyMs']['p50']:>9}{row['latencyMs']['p95']:>9}{row['latencyMs']['p99']:>9}"
+              f"{row['queries']['mean']:>9}{row['payloadBytes']['mean']:>10}"
+              f"{row['errors'] + row['statusMismatches']:>5}")
+    totals = result['totals']
+    print(f"total {totals['requests']} requests in {totals['wallSeconds']}s, {totals['throughputRps']} req/s, "
+          f"p50 {totals['latencyMs']['p50']} ms, p95 {totals['latencyMs']['p95']} ms, p99 {totals['latencyMs']['p99']} ms")
+    print(f'results written to {output}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f'\ncompared with {args.compare}:')
+        for line in runner.compare(result, baseline):
+            print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+'''
+Who shared.http.user_context says the caller is, for every way a request can
+identify itself, with and without SESSION_SECRET.
+
+    cd backend && python -m bench.contexts
+
+The tests.json specs run against one environment, so they cannot cover both
+sides of the token switch; this does, without a database. Prints one line per
+case and exits 1 when any resolves differently than expected.
+'''
+import os
+import sys
+from typing import Dict, Any, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared import http, tokens
+
+SECRET = 'bench-contexts-secret'
+ENV_NAMES = ('SESSION_SECRET', 'ALLOW_HEADER_AUTH')
+
+# (case, SESSION_SECRET, ALLOW_HEADER_AUTH, headers, expected (user id, admin));
+# a headers value of None stands for a token issued for user 7 as admin
+CASES: List[Tuple[str, Optional[str], Optional[str], Optional[Dict[str, str]], Tuple[Optional[str], bool]]] = [
+    ('no secret: X-User-Id and X-Is-Admin are trusted', None, None, {'X-User-Id': '2', 'X-Is-Admin': 'true'}, ('2', True)),
+    ('no secret: non-numeric X-User-Id is anonymous', None, None, {'X-User-Id': '2abc'}, (None, False)),
+    ('no secret: no headers is anonymous', None, None, {}, (None, False)),
+    ('secret: bare X-User-Id is anonymous', SECRET, None, {'X-User-Id': '2', 'X-Is-Admin': 'true'}, (None, False)),
+    ('secret: ALLOW_HEADER_AUTH keeps X-User-Id, drops X-Is-Admin', SECRET, '1', {'X-User-Id': '2', 'X-Is-Admin': 'true'}, ('2', False)),
+    ('secret: issued token wins over headers', SECRET, None, None, ('7', True)),
+    ('secret: forged token is anonymous', SECRET, '1', {'X-Session-Token': 'e30.forged', 'X-User-Id': '2'}, (None, False)),
+]
+
+
+def resolve(secret: Optional[str], allow_header: Optional[str], headers: Optional[Dict[str, str]]) -> Tuple[Optional[str], bool]:
+    saved = {name: os.environ.get(name) for name in ENV_NAMES}
+    try:
+        for name, value in zip(ENV_NAMES, (secret, allow_header)):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        if headers is None:
+            headers = {'X-Session-Token': tokens.issue(7, True)[0], 'X-User-Id': '2'}
+        event: Dict[str, Any] = {'httpMethod': 'GET', 'headers': headers}
+        return http.user_context(event)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def main() -> int:
+    failed = False
+    for case, secret, allow_header, headers, expected in CASES:
+        got = resolve(secret, allow_header, headers)
+        ok = got == expected
+        failed = failed or not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {case}" + ('' if ok else f': expected {expected}, got {got}'))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
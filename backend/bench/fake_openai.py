@@ -0,0 +1,69 @@
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any
+
+
+class FakeOpenAI:
+    '''
+    Local stand-in for the chat completions API with a fixed response delay,
+    so translation misses cost roughly what they cost upstream without
+    spending tokens. Counts the calls it receives; with error_rate, that share
+    of calls is answered 503 to exercise retries.
+    '''
+
+    def __init__(self, latency: float = 0.3, port: int = 0, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                with fake._lock:
+                    fake.calls += 1
+                time.sleep(fake.latency)
+                if fake.error_rate and random.random() < fake.error_rate:
+                    with fake._lock:
+                        fake.errors += 1
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                prompt = payload.get('messages', [{}])[-1].get('content', '')
+                word = prompt.split(':', 1)[-1].strip()
+                content = json.dumps({
+                    'english': f'{word} (en)',
+                    'russianExample': f'{word} в предложении',
+                    'englishExample': 'Example sentence'
+                }, ensure_ascii=False)
+                body = json.dumps({'choices': [{'message': {'content': content}}]}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_address[1]}/v1'
+
+    def start(self) -> 'FakeOpenAI':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,102 @@
+'''
+Cold-start import budget for the backend functions.
+
+    cd backend && python -m bench.imports [--budget-ms 80] [--functions cards,api]
+
+Imports each function's index.py in a fresh interpreter with -X importtime,
+run from the function folder alone as the platform deploys it, keeps the
+best of --repeat runs and fails (exit 1) when a function's own import tree
+exceeds its budget. Interpreter start-up and site packages are not counted;
+they are the same for every function.
+
+It also fails when the copies of shared code in the function folders are
+out of date (see python -m deploy), since those are what gets imported.
+'''
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deploy
+from bench.specs import BACKEND_DIR, FUNCTIONS
+
+# Milliseconds per function; psycopg2 alone accounts for ~40 ms of each
+DEFAULT_BUDGET_MS = 80.0
+BUDGETS_MS: Dict[str, float] = {}
+TOP_IMPORTS = 5
+
+
+def _parse(stderr: str, module: str, depth: int = 0) -> Optional[Dict[str, Any]]:
+    '''Cumulative time of `module` and of its heaviest direct imports from -X importtime output'''
+    entries: List[Dict[str, Any]] = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or line.count('|') != 2 or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        entry = {'module': name.strip(), 'ms': int(cumulative_us) / 1000, 'depth': (len(name) - len(name.lstrip()) - 1) // 2}
+        if entry['module'] == module and entry['depth'] == depth:
+            # A module's imports are listed right before it, one level deeper
+            direct = []
+            for child in reversed(entries):
+                if child['depth'] <= depth:
+                    break
+                if child['depth'] == depth + 1:
+                    direct.append(child)
+            direct.sort(key=lambda c: c['ms'], reverse=True)
+            return {'ms': entry['ms'], 'top': [{'module': c['module'], 'ms': round(c['ms'], 1)} for c in direct[:TOP_IMPORTS]]}
+        entries.append(entry)
+    return None
+
+
+def measure(function: str, repeat: int) -> Dict[str, Any]:
+    '''Best-of-`repeat` import time of <function>/index.py in fresh interpreters'''
+    module = 'index'
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONPATH'}
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(repeat):
+        done = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=os.path.join(BACKEND_DIR, function), capture_output=True, text=True, env=env
+        )
+        if done.returncode != 0:
+            return {'function': function, 'error': done.stderr.strip().splitlines()[-1] if done.stderr.strip() else 'failed'}
+        parsed = _parse(done.stderr, module)
+        if parsed and (best is None or parsed['ms'] < best['ms']):
+            # index.py only re-exports the handler; list what the handler pulls in
+            handler = _parse(done.stderr, f'{function}.index', depth=1)
+            best = dict(parsed, top=handler['top']) if handler else parsed
+    if best is None:
+        return {'function': function, 'error': f'{module} not found in -X importtime output'}
+    return {'function': function, 'ms': round(best['ms'], 1), 'top': best['top']}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m bench.imports', description='Check handler import times against a budget')
+    parser.add_argument('--functions', help='comma-separated subset, e.g. cards,api')
+    parser.add_argument('--budget-ms', type=float, help=f'budget for every function (default {DEFAULT_BUDGET_MS})')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    stale = deploy.drift()
+    failed = bool(stale)
+    if stale:
+        print(f"deployed copies out of date (run python -m deploy): {', '.join(stale)}")
+    for function in args.functions.split(',') if args.functions else FUNCTIONS:
+        result = measure(function, max(args.repeat, 1))
+        budget = args.budget_ms or BUDGETS_MS.get(function, DEFAULT_BUDGET_MS)
+        if 'error' in result:
+            failed = True
+            print(f"{function:<11}error: {result['error']}")
+            continue
+        over = result['ms'] > budget
+        failed = failed or over
+        heaviest = ', '.join(f"{t['module']} {t['ms']}" for t in result['top'])
+        print(f"{function:<11}{result['ms']:>8} ms / {budget:g} ms {'OVER' if over else 'ok':<5} {heaviest}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import asyncio
+import multiprocessing
+from typing import Any, Optional
+
+
+class LatencyProxy:
+    '''
+    TCP proxy in front of Postgres that delays every chunk by half the round
+    trip in each direction, so a local database costs what one across the
+    network does. Chunks are delayed, not queued behind each other, so it adds
+    latency without capping throughput. Runs in its own process so its CPU
+    time does not count against the benchmark.
+    '''
+
+    def __init__(self, host: str, port: int, rtt: float):
+        self.host = host
+        self.port = port
+        self.rtt = rtt
+        self.listen_port = 0
+        self._process: Optional[multiprocessing.Process] = None
+
+    def start(self) -> 'LatencyProxy':
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(self.host, self.port, self.rtt / 2, child),
+                                                daemon=True)
+        self._process.start()
+        self.listen_port = parent.recv()
+        return self
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+
+
+def _serve(host: str, port: int, delay: float, ready: Any) -> None:
+    async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                loop.call_later(delay, writer.write, chunk)
+        finally:
+            loop.call_later(delay, writer.close)
+
+    async def connect() -> Any:
+        if host.startswith('/'):
+            return await asyncio.open_unix_connection(f'{host}/.s.PGSQL.{port}')
+        return await asyncio.open_connection(host, port)
+
+    async def accept(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        server_reader, server_writer = await connect()
+        await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer),
+                             return_exceptions=True)
+
+    async def main() -> None:
+        server = await asyncio.start_server(accept, '127.0.0.1', 0)
+        ready.send(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+import importlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from shared import instrument
+
+
+class _Context:
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+
+
+def load_handlers(functions: List[str]) -> Dict[str, Any]:
+    return {name: importlib.import_module(f'{name}.index').handler for name in functions}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    '''Nearest-rank percentile of an already sorted list'''
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def invoke(handler: Any, event: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+    '''Calls one handler and returns latency, status, payload size and its instrument trace'''
+    started = time.perf_counter()
+    try:
+        response = handler(dict(event, headers=dict(event.get('headers') or {})), _Context(request_id))
+        status = response.get('statusCode')
+        size = len((response.get('body') or '').encode('utf-8'))
+        error = None
+    except Exception as e:
+        status, size, error = None, 0, f'{type(e).__name__}: {e}'
+    trace = instrument.last()
+    return {
+        'ms': (time.perf_counter() - started) * 1000,
+        'status': status,
+        'queries': trace.queries if trace else 0,
+        'queryMs': trace.query_ms if trace else 0.0,
+        'connectMs': trace.connect_ms if trace else 0.0,
+        'serializeMs': trace.serialize_ms if trace else 0.0,
+        'compressMs': trace.compress_ms if trace else 0.0,
+        'bytes': size,
+        'error': error
+    }
+
+
+def summarize(spec: Dict[str, Any], samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = sorted(s['ms'] for s in samples)
+    count = len(samples) or 1
+    return {
+        'function': spec['function'],
+        'name': spec['name'],
+        'method': spec['method'],
+        'path': spec['path'],
+        'count': len(samples),
+        'errors': sum(1 for s in samples if s['error']),
+        'statusMismatches': sum(1 for s in samples
+                                if spec['expectedStatus'] is not None and s['status'] != spec['expectedStatus']),
+        'statuses': sorted({str(s['status']) for s in samples}),
+        'latencyMs': {
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'max': round(latencies[-1], 2) if latencies else 0.0,
+            'mean': round(sum(latencies) / count, 2)
+        },
+        'queries': {
+            'mean': round(sum(s['queries'] for s in samples) / count, 2),
+            'max': max((s['queries'] for s in samples), default=0)
+        },
+        'breakdownMs': {
+            'connect': round(sum(s['connectMs'] for s in samples) / count, 2),
+            'queries': round(sum(s['queryMs'] for s in samples) / count, 2),
+            'serialize': round(sum(s['serializeMs'] for s in samples) / count, 2),
+            'compress': round(sum(s['compressMs'] for s in samples) / count, 2)
+        },
+        'payloadBytes': {
+            'mean': round(sum(s['bytes'] for s in samples) / count),
+            'max': max((s['bytes'] for s in samples), default=0)
+        },
+        'sampleError': next((s['error'] for s in samples if s['error']), None)
+    }
+
+
+def run(specs: List[Dict[str, Any]], weights: Dict[str, float], requests: int,
+        concurrency: int, seed: int, warmup: bool = True) -> Dict[str, Any]:
+    '''
+    Replays a weighted random mix of specs with `concurrency` worker threads
+    and returns per-spec latency/query/payload summaries plus totals. Each spec
+    is called once before timing starts so module imports and cold pools are
+    not measured.
+    '''
+    handlers = load_handlers(sorted({s['function'] for s in specs}))
+    if warmup:
+        for spec in specs:
+            invoke(handlers[spec['function']], spec['event'], 'warmup')
+
+    rng = random.Random(seed)
+    spec_weights = [weights.get(s['function'], 1.0) for s in specs]
+    plan = rng.choices(range(len(specs)), weights=spec_weights, k=requests)
+    samples: Dict[int, List[Dict[str, Any]]] = {i: [] for i in range(len(specs))}
+    lock = threading.Lock()
+
+    def one(n: int) -> None:
+        index = plan[n]
+        spec = specs[index]
+        sample = invoke(handlers[spec['function']], spec['event'], f'bench-{n}')
+        with lock:
+            samples[index].append(sample)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    all_latencies = sorted(s['ms'] for group in samples.values() for s in group)
+    return {
+        'totals': {
+            'requests': requests,
+            'concurrency': concurrency,
+            'wallSeconds': round(wall, 3),
+            'throughputRps': round(requests / wall, 1) if wall else 0.0,
+            'errors': sum(1 for group in samples.values() for s in group if s['error']),
+            'latencyMs': {
+                'p50': round(percentile(all_latencies, 50), 2),
+                'p95': round(percentile(all_latencies, 95), 2),
+                'p99': round(percentile(all_latencies, 99), 2)
+            }
+        },
+        'specs': [summarize(specs[i], samples[i]) for i in range(len(specs)) if samples[i]]
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    '''One line per spec present in both runs: p50/p95 and queries before -> after'''
+    before = {(s['function'], s['name']): s for s in baseline.get('specs', [])}
+    lines = []
+    for spec in current.get('specs', []):
+        old: Optional[Dict[str, Any]] = before.get((spec['function'], spec['name']))
+        if not old:
+            continue
+        lines.append(
+            f"{spec['function']:<11}{spec['name'][:44]:<45}"
+            f"p50 {old['latencyMs']['p50']:>8} -> {spec['latencyMs']['p50']:<8} "
+            f"p95 {old['latencyMs']['p95']:>8} -> {spec['latencyMs']['p95']:<8} "
+            f"queries {old['queries']['mean']} -> {spec['queries']['mean']}"
+        )
+    return lines
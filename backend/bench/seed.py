@@ -0,0 +1,133 @@
+import glob
+import os
+import time
+from typing import Dict, Any
+
+import psycopg2
+import psycopg2.extensions
+
+from bench.specs import BACKEND_DIR
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'db_migrations')
+
+# Syllables for readable, searchable Russian/English card text
+RU_SYLLABLES = "ARRAY['кош','со','ма','ро','ле','ви','ту','пе','за','до']"
+RU_ENDINGS = "ARRAY['ка','бака','шина','за','то','ло','ра','ня','ва','ма']"
+EN_WORDS = "ARRAY['cat','dog','car','rose','summer','winter','table','river','house','book']"
+
+
+def _with_database(dsn: str, dbname: str) -> str:
+    params = psycopg2.extensions.parse_dsn(dsn)
+    params['dbname'] = dbname
+    return psycopg2.extensions.make_dsn(**params)
+
+
+def create_database(admin_dsn: str, dbname: str) -> str:
+    '''Creates an empty scratch database and returns its DSN'''
+    conn = psycopg2.connect(admin_dsn)
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute(f'CREATE DATABASE "{dbname}"')
+    cur.close()
+    conn.close()
+    return _with_database(admin_dsn, dbname)
+
+
+def drop_database(admin_dsn: str, dbname: str) -> None:
+    conn = psycopg2.connect(admin_dsn)
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute(f'DROP DATABASE IF EXISTS "{dbname}" WITH (FORCE)')
+    cur.close()
+    conn.close()
+
+
+def apply_migrations(dsn: str) -> int:
+    '''Applies db_migrations/V*.sql in version order, as the deploy pipeline does'''
+    files = sorted(glob.glob(os.path.join(MIGRATIONS_DIR, 'V*.sql')),
+                   key=lambda p: int(os.path.basename(p)[1:].split('__')[0]))
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    cur = conn.cursor()
+    for path in files:
+        with open(path, encoding='utf-8') as f:
+            cur.execute(f.read())
+    cur.close()
+    conn.close()
+    return len(files)
+
+
+def seed(dsn: str, users: int, cards: int, groups: int, progress: int, words: int) -> Dict[str, Any]:
+    '''
+    Fills the schema with deterministic synthetic data using set-based inserts.
+    Triggers are switched off while loading (session_replication_role, needs a
+    superuser, which a disposable local server has) and the derived counters
+    are rebuilt afterwards with rebuild_progress_counters().
+    User 1 is "testuser"/"testpass123" so the auth specs can log in.
+    '''
+    started = time.monotonic()
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    cur.execute("SET session_replication_role = replica")
+    cur.execute("SELECT setseed(0.42)")
+
+    cur.execute("""
+        INSERT INTO users (username, password_hash)
+        SELECT CASE WHEN g = 1 THEN 'testuser' ELSE 'student' || g END,
+               encode(sha256(convert_to(CASE WHEN g = 1 THEN 'testpass123' ELSE 'password' || g END, 'UTF8')), 'hex')
+        FROM generate_series(1, %s) g
+    """, (users,))
+    cur.execute("""
+        INSERT INTO categories (user_id, name, color)
+        SELECT u, 'Категория ' || k, '#3b82f6'
+        FROM generate_series(1, LEAST(%s, 1000)) u, generate_series(1, 3) k
+    """, (users,))
+    cur.execute(f"""
+        INSERT INTO cards (russian, english, russian_example, english_example, course, revision)
+        SELECT ({RU_SYLLABLES})[1 + g %% 10] || ({RU_ENDINGS})[1 + (g / 10) %% 10] || ' ' || g,
+               ({EN_WORDS})[1 + g %% 10] || ' ' || g,
+               'Пример ' || g, 'Example ' || g,
+               1 + g %% 3,
+               library_revision()
+        FROM generate_series(1, %s) g
+    """, (cards,))
+    cur.execute("""
+        INSERT INTO groups (name, description, color, course, revision)
+        SELECT 'Группа ' || g, '', '#3b82f6', 1 + g %% 3, library_revision()
+        FROM generate_series(1, %s) g
+    """, (groups,))
+    cur.execute("""
+        INSERT INTO card_groups (card_id, group_id, revision)
+        SELECT c.id, 1 + c.id %% %s, library_revision()
+        FROM cards c
+    """, (groups,))
+
+    per_user = max(1, min(cards, progress // max(users, 1)))
+    cur.execute("""
+        INSERT INTO user_progress (user_id, card_id, is_learned, updated_at, due_at, revision)
+        SELECT u, ((u * 7919 + k) %% %s) + 1, random() < 0.6,
+               CURRENT_TIMESTAMP - (random() * INTERVAL '90 days'),
+               CASE WHEN k %% 10 = 0 THEN CURRENT_TIMESTAMP - (random() * INTERVAL '3 days') END,
+               library_revision()
+        FROM generate_series(1, %s) u, generate_series(0, %s) k
+    """, (cards, users, per_user - 1))
+    cur.execute("""
+        INSERT INTO global_words (russian, normalized, english, russian_example, english_example, source)
+        SELECT russian, search_fold(russian), english, russian_example, english_example, 'confirmed'
+        FROM cards ORDER BY id LIMIT %s
+        ON CONFLICT DO NOTHING
+    """, (words,))
+
+    cur.execute("SET session_replication_role = origin")
+    cur.execute("SELECT rebuild_progress_counters()")
+    conn.commit()
+
+    conn.autocommit = True
+    cur.execute("ANALYZE")
+    counts = {}
+    for table in ('users', 'cards', 'groups', 'card_groups', 'user_progress', 'global_words'):
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        counts[table] = cur.fetchone()[0]
+    cur.close()
+    conn.close()
+    return {'rows': counts, 'seconds': round(time.monotonic() - started, 2)}
@@ -0,0 +1,222 @@
+'''
+Study-session throughput: per-invocation handlers against the ASGI server.
+
+    cd backend && python -m bench.server --admin-url postgresql://postgres@localhost/postgres \
+        [--concurrency 200] [--requests 5000] [--instances 8]
+
+Seeds a scratch database like `python -m bench`, then sends the same random
+mix of GET /cards?resource=session and resource=due requests (random users,
+--concurrency in flight) through three modes:
+
+    invocation    the cards handler on --instances threads, one request per
+                  thread at a time, as --instances warm function instances
+    asgi-threads  server.App with every request on its handler thread pool
+    asgi-async    server.App with study reads on the asyncpg pool
+
+Latency includes the time a request waits for a free instance or connection.
+Requests per CPU second counts the whole process, so it shows how much work
+each mode spends per answer besides the database. --rtt-ms puts a delaying
+proxy (bench.latency_proxy) between the modes and the database: with a local
+server every query is nearly free and all modes are CPU-bound, while across a
+network the round trips are what an in-flight request spends its time on.
+'''
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deploy
+
+deploy.use_source_tree()
+
+import psycopg2.extensions
+
+from bench import seed
+from bench.latency_proxy import LatencyProxy
+from bench.runner import percentile
+
+MODES = ('invocation', 'asgi-threads', 'asgi-async')
+
+
+def make_events(count: int, users: int, session_share: float, rng: random.Random) -> List[Dict[str, Any]]:
+    events = []
+    for n in range(count):
+        resource = 'session' if rng.random() < session_share else 'due'
+        events.append({
+            'httpMethod': 'GET',
+            'path': '/cards',
+            'headers': {'X-User-Id': str(rng.randint(1, users)), 'Accept-Encoding': 'gzip'},
+            'queryStringParameters': {'resource': resource, 'limit': '20'},
+            'requestContext': {'requestId': f'bench-{n}'},
+            'isBase64Encoded': False
+        })
+    return events
+
+
+def _summary(mode: str, samples: List[Dict[str, Any]], wall: float, cpu: float) -> Dict[str, Any]:
+    latencies = sorted(s['ms'] for s in samples)
+    errors = [s for s in samples if s['status'] != 200]
+    return {
+        'mode': mode,
+        'requests': len(samples),
+        'wallSeconds': round(wall, 3),
+        'throughputRps': round(len(samples) / wall, 1) if wall else 0.0,
+        'cpuSeconds': round(cpu, 3),
+        'requestsPerCpuSecond': round(len(samples) / cpu, 1) if cpu else 0.0,
+        'errors': len(errors),
+        'sampleError': next((s['error'] for s in errors), None),
+        'latencyMs': {
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'max': round(latencies[-1], 2) if latencies else 0.0
+        }
+    }
+
+
+def run_invocation(events: List[Dict[str, Any]], instances: int, concurrency: int) -> Dict[str, Any]:
+    from bench.runner import _Context
+    from cards.index import handler
+
+    handler(dict(events[0]), _Context('warmup'))
+
+    def one(event: Dict[str, Any], queued: float) -> Dict[str, Any]:
+        try:
+            status, error = handler(dict(event), _Context(event['requestContext']['requestId']))['statusCode'], None
+        except Exception as e:
+            status, error = None, f'{type(e).__name__}: {e}'
+        return {'ms': (time.perf_counter() - queued) * 1000, 'status': status, 'error': error}
+
+    # --concurrency clients, each sending its next request once the previous one is answered
+    samples: List[Dict[str, Any]] = []
+    started, cpu = time.perf_counter(), time.process_time()
+    with ThreadPoolExecutor(max_workers=instances) as executor:
+        def client(batch: List[Dict[str, Any]]) -> None:
+            for event in batch:
+                samples.append(executor.submit(one, event, time.perf_counter()).result())
+
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            list(clients.map(client, [events[n::concurrency] for n in range(concurrency)]))
+    return _summary('invocation', samples, time.perf_counter() - started, time.process_time() - cpu)
+
+
+async def _drive(call: Callable[[Dict[str, Any]], Any], events: List[Dict[str, Any]], concurrency: int,
+                 mode: str) -> Dict[str, Any]:
+    samples: List[Dict[str, Any]] = []
+
+    async def client(batch: List[Dict[str, Any]]) -> None:
+        for event in batch:
+            queued = time.perf_counter()
+            try:
+                status, error = (await call(dict(event)))['statusCode'], None
+            except Exception as e:
+                status, error = None, f'{type(e).__name__}: {e}'
+            samples.append({'ms': (time.perf_counter() - queued) * 1000, 'status': status, 'error': error})
+
+    started, cpu = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(client(events[n::concurrency]) for n in range(concurrency)))
+    return _summary(mode, samples, time.perf_counter() - started, time.process_time() - cpu)
+
+
+async def run_asgi(events: List[Dict[str, Any]], instances: int, concurrency: int, async_study: bool) -> Dict[str, Any]:
+    from server.app import App
+
+    app = App(async_study=async_study, threads=instances)
+    await app.startup()
+    try:
+        await app.call('cards', dict(events[0]))
+        return await _drive(lambda event: app.call('cards', event), events, concurrency,
+                            'asgi-async' if async_study else 'asgi-threads')
+    finally:
+        await app.shutdown()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m bench.server', description='Compare handler and ASGI study throughput')
+    parser.add_argument('--admin-url', default=os.environ.get('BENCH_ADMIN_URL', 'postgresql://postgres@localhost/postgres'),
+                        help='superuser DSN of a disposable local server (used to create/drop the scratch DB)')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--cards', type=int, default=50000)
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--progress', type=int, default=1000000)
+    parser.add_argument('--words', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=200, help='requests in flight')
+    parser.add_argument('--instances', type=int, default=8, help='handler threads and psycopg2 connections')
+    parser.add_argument('--rtt-ms', type=float, default=0.0, help='emulated database round trip')
+    parser.add_argument('--session-share', type=float, default=0.7, help='share of session (vs due) requests')
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='result file (default bench_results/server-<timestamp>.json)')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch database')
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(',') if mode]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    dbname = f'bench_server_{os.getpid()}_{int(time.time())}'
+    print(f'creating scratch database {dbname}', file=sys.stderr)
+    dsn = seed.create_database(args.admin_url, dbname)
+    results = []
+    proxy = None
+    try:
+        migrations = seed.apply_migrations(dsn)
+        print(f'applied {migrations} migrations, seeding', file=sys.stderr)
+        seeded = seed.seed(dsn, args.users, args.cards, args.groups, args.progress, args.words)
+        print(f"seeded in {seeded['seconds']}s: {seeded['rows']}", file=sys.stderr)
+
+        if args.rtt_ms > 0:
+            params = psycopg2.extensions.parse_dsn(dsn)
+            proxy = LatencyProxy(params.get('host') or 'localhost', int(params.get('port') or 5432),
+                                 args.rtt_ms / 1000).start()
+            dsn = psycopg2.extensions.make_dsn(dsn, host='127.0.0.1', port=proxy.listen_port)
+
+        os.environ['DATABASE_URL'] = dsn
+        os.environ['DB_POOL_MAX_SIZE'] = str(args.instances)
+        os.environ.setdefault('REQUEST_LOG', '0')
+
+        from shared import db
+
+        events = make_events(args.requests, args.users, args.session_share, random.Random(args.seed))
+        for mode in modes:
+            print(f'{mode}: {args.requests} requests, {args.concurrency} in flight', file=sys.stderr)
+            if mode == 'invocation':
+                results.append(run_invocation(events, args.instances, args.concurrency))
+            else:
+                results.append(asyncio.run(run_asgi(events, args.instances, args.concurrency, mode == 'asgi-async')))
+        db.get_pool().closeall()
+    finally:
+        if proxy is not None:
+            proxy.stop()
+        if not args.keep:
+            seed.drop_database(args.admin_url, dbname)
+
+    output = args.output or os.path.join('bench_results', f"server-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'startedAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'config': {k: v for k, v in vars(args).items() if k not in ('admin_url', 'output')},
+            'asyncPoolMaxSize': int(os.environ.get('ASYNC_POOL_MAX_SIZE', '20')),
+            'modes': results
+        }, f, ensure_ascii=False, indent=2)
+
+    print(f"{'mode':<14}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'req/cpu-s':>11}{'bad':>6}")
+    for row in results:
+        print(f"{row['mode']:<14}{row['throughputRps']:>9}{row['latencyMs']['p50']:>9}{row['latencyMs']['p95']:>9}"
+              f"{row['latencyMs']['p99']:>9}{row['requestsPerCpuSecond']:>11}{row['errors']:>6}")
+    print(f'results written to {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import json
+import os
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit, parse_qsl
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FUNCTIONS = ('accounts', 'api', 'auth', 'cards', 'categories', 'translate')
+
+
+def build_event(spec: Dict[str, Any]) -> Dict[str, Any]:
+    '''Turns one tests.json entry into the event the cloud runtime would pass to handler()'''
+    parts = urlsplit(spec.get('path') or '/')
+    event: Dict[str, Any] = {
+        'httpMethod': spec.get('method', 'GET'),
+        'headers': dict(spec.get('headers') or {}),
+        'queryStringParameters': dict(parse_qsl(parts.query)),
+        'path': parts.path or '/'
+    }
+    body = spec.get('body')
+    if body is not None:
+        event['body'] = body if isinstance(body, str) else json.dumps(body, ensure_ascii=False)
+    return event
+
+
+def load_specs(functions: Optional[List[str]] = None, read_only: bool = False) -> List[Dict[str, Any]]:
+    '''Reads every backend/<function>/tests.json into a flat list of replayable requests'''
+    specs = []
+    for function in functions or FUNCTIONS:
+        path = os.path.join(BACKEND_DIR, function, 'tests.json')
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            tests = json.load(f).get('tests', [])
+        for test in tests:
+            if read_only and test.get('method', 'GET') != 'GET':
+                continue
+            specs.append({
+                'function': function,
+                'name': test['name'],
+                'method': test.get('method', 'GET'),
+                'path': test.get('path') or '/',
+                'expectedStatus': test.get('expectedStatus'),
+                'event': build_event(test)
+            })
+    return specs
+
+
+def parse_mix(mix: Optional[str]) -> Dict[str, float]:
+    '''"cards=4,accounts=1" -> per-function weights; functions not listed get weight 1'''
+    weights: Dict[str, float] = {}
+    for item in (mix or '').split(','):
+        if '=' in item:
+            name, weight = item.split('=', 1)
+            weights[name.strip()] = float(weight)
+    return weights
@@ -0,0 +1,48 @@
+from typing import Any, Optional
+
+import psycopg2
+
+from shared.text import fold
+
+# Sources ranked by dictionary_source_rank() in V0019: model < confirmed < admin
+CONFIRMED = 'confirmed'
+ADMIN = 'admin'
+
+
+def remember(cur: Any, russian: str, english: str, russian_example: str, english_example: str,
+             source: str) -> Optional[int]:
+    '''
+    Writes a card's translation back into global_words and returns the entry id
+    for cards.word_id. An entry is only overwritten by a source of equal or
+    higher rank, so a card saved from a model suggestion never replaces an
+    admin edit. Runs inside a savepoint: a dictionary conflict (e.g. a legacy
+    row without a normalized key) leaves the card write untouched and returns None.
+    '''
+    key = fold(russian or '')
+    if not key or not (english or '').strip():
+        return None
+
+    cur.execute("SAVEPOINT dictionary_write")
+    try:
+        cur.execute(
+            """INSERT INTO global_words (russian, normalized, english, russian_example, english_example, source)
+               VALUES (%s, %s, %s, %s, %s, %s)
+               ON CONFLICT (normalized) DO UPDATE SET
+                   english = EXCLUDED.english,
+                   russian_example = EXCLUDED.russian_example,
+                   english_example = EXCLUDED.english_example,
+                   source = EXCLUDED.source,
+                   updated_at = CURRENT_TIMESTAMP
+               WHERE dictionary_source_rank(EXCLUDED.source) >= dictionary_source_rank(global_words.source)
+               RETURNING id""",
+            (russian.strip(), key, english.strip(), russian_example or '', english_example or '', source)
+        )
+        row = cur.fetchone()
+        if row is None:
+            cur.execute("SELECT id FROM global_words WHERE normalized = %s", (key,))
+            row = cur.fetchone()
+    except psycopg2.Error:
+        cur.execute("ROLLBACK TO SAVEPOINT dictionary_write")
+        return None
+    cur.execute("RELEASE SAVEPOINT dictionary_write")
+    return row[0] if row else None
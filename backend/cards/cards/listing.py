@@ -0,0 +1,155 @@
+import base64
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: Any, card_id: int) -> str:
+    '''
+    Opaque keyset cursor for the (created_at, id) position of the last card on
+    a page. cards.created_at is NOT NULL (V0025), so every position decodes.
+    '''
+    raw = f"{created_at.isoformat()}|{card_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    created_at, card_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+    return datetime.fromisoformat(created_at), int(card_id)
+
+
+def to_columns(cards: List[Dict[str, Any]]) -> Dict[str, Any]:
+    '''
+    Compact card list for ?format=columns: one array per field instead of one
+    object per card, with category name/color sent once in a side table.
+    '''
+    categories: Dict[Any, Dict[str, Any]] = {}
+    columns: Dict[str, List[Any]] = {name: [] for name in (
+        'id', 'russian', 'russianExample', 'english', 'englishExample',
+        'learned', 'categoryId', 'course', 'groupId', 'enrichment'
+    )}
+    for card in cards:
+        if card['categoryId'] is not None and card['categoryId'] not in categories:
+            categories[card['categoryId']] = {
+                'id': card['categoryId'],
+                'name': card['categoryName'],
+                'color': card['categoryColor']
+            }
+        for name, values in columns.items():
+            value = card.get(name)
+            values.append(int(value) if name == 'learned' else value)
+    return {'format': 'columns', 'count': len(cards), 'categories': list(categories.values()), 'columns': columns}
+
+
+def fetch_cards(cur: Any, user_id: Any, query_params: Dict[str, Any], limit: Optional[int] = None,
+                after: Optional[Tuple[datetime, int]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    '''
+    Cards with the user's learned flag and enrichment job status (None when
+    the card never needed one), newest first, filtered by groupId, course,
+    categoryId and learned. With a limit, returns at most that many
+    cards after the `after` keyset position plus the cursor of the next page.
+    '''
+    group_id = query_params.get('groupId')
+    conditions = []
+    join_params: list = []
+    params: list = []
+
+    if group_id:
+        # Joined membership row supplies groupId directly
+        group_select = 'cg.group_id'
+        group_join = 'INNER JOIN card_groups cg ON c.id = cg.card_id AND cg.group_id = %s'
+        join_params.append(group_id)
+    else:
+        # Scalar subquery is evaluated only for the rows that end up in the page
+        group_select = '(SELECT cg.group_id FROM card_groups cg WHERE cg.card_id = c.id LIMIT 1)'
+        group_join = ''
+
+    if query_params.get('course'):
+        conditions.append('c.course = %s')
+        params.append(query_params['course'])
+    if query_params.get('categoryId'):
+        conditions.append('c.category_id = %s')
+        params.append(query_params['categoryId'])
+    if query_params.get('learned') in ('true', 'false'):
+        conditions.append('up.is_learned IS TRUE' if query_params['learned'] == 'true' else 'up.is_learned IS NOT TRUE')
+    if after:
+        conditions.append('(c.created_at, c.id) < (%s, %s)')
+        params.extend(after)
+
+    where = ('WHERE ' + ' AND '.join(conditions)) if conditions else ''
+    page_limit = ''
+    if limit is not None:
+        page_limit = 'LIMIT %s'
+        params.append(limit + 1)
+
+    cur.execute(f"""
+        SELECT c.id, c.russian, c.russian_example, c.english, c.english_example,
+               COALESCE(up.is_learned, FALSE) as is_learned,
+               cat.id, cat.name, cat.color, c.course,
+               {group_select} as group_id,
+               c.created_at, ej.status
+        FROM cards c
+        {group_join}
+        LEFT JOIN categories cat ON c.category_id = cat.id
+        LEFT JOIN user_progress up ON c.id = up.card_id AND up.user_id = %s
+        LEFT JOIN enrichment_jobs ej ON ej.card_id = c.id
+        {where}
+        ORDER BY c.created_at DESC, c.id DESC
+        {page_limit}
+    """, join_params + [user_id] + params)
+    rows = cur.fetchall()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][11], rows[-1][0])
+
+    cards = []
+    for row in rows:
+        cards.append({
+            'id': row[0],
+            'russian': row[1] or '',
+            'russianExample': row[2] or '',
+            'english': row[3] or '',
+            'englishExample': row[4] or '',
+            'learned': row[5],
+            'categoryId': row[6] if row[6] else None,
+            'categoryName': row[7] if row[7] else None,
+            'categoryColor': row[8] if row[8] else None,
+            'course': row[9] if row[9] else 1,
+            'groupId': row[10] if row[10] else None,
+            'enrichment': row[12]
+        })
+    return cards, next_cursor
+
+
+def fetch_groups(cur: Any, user_id: Any = None) -> List[Dict[str, Any]]:
+    '''
+    All groups, newest first. Card counts are kept on the group row by the
+    card_groups triggers (V0020) and the user's learned counts come from the
+    user_group_progress rollup, so this reads one row per group.
+    '''
+    cur.execute("""
+        SELECT g.id, g.name, g.description, g.color, g.created_at,
+               g.card_count, g.course, COALESCE(ugp.cards_learned, 0)
+        FROM groups g
+        LEFT JOIN user_group_progress ugp ON ugp.group_id = g.id AND ugp.user_id = %s
+        ORDER BY g.created_at DESC
+    """, (user_id,))
+
+    groups = []
+    for row in cur.fetchall():
+        groups.append({
+            'id': row[0],
+            'name': row[1],
+            'description': row[2] or '',
+            'color': row[3],
+            'createdAt': row[4].isoformat() if row[4] else None,
+            'cardCount': row[5],
+            'course': row[6] if row[6] else 1,
+            'learnedCount': row[7]
+        })
+    return groups
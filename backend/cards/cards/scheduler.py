@@ -0,0 +1,149 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from shared import db
+
+DEFAULT_BATCH_SIZE = 20
+MAX_BATCH_SIZE = 100
+MIN_EASE = 1.3
+
+
+def sm2(grade: int, ease: float, interval_days: float, repetitions: int) -> Tuple[float, float, int, bool]:
+    '''
+    One SM-2 step. grade is 0-5 (below 3 is a lapse).
+    Returns (ease, interval_days, repetitions, lapsed).
+    '''
+    lapsed = grade < 3
+    if lapsed:
+        repetitions = 0
+        interval_days = 1.0
+    else:
+        if repetitions == 0:
+            interval_days = 1.0
+        elif repetitions == 1:
+            interval_days = 6.0
+        else:
+            interval_days = round(interval_days * ease, 2)
+        repetitions += 1
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    return round(ease, 3), interval_days, repetitions, lapsed
+
+
+def review(conn: Any, user_id: Any, card_id: int, grade: int) -> Optional[Dict[str, Any]]:
+    '''Applies a review to the (user, card) schedule; returns None when the card does not exist'''
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM cards WHERE id = %s", (card_id,))
+    if not cur.fetchone():
+        cur.close()
+        return None
+
+    cur.execute(
+        """SELECT ease, interval_days, repetitions FROM user_progress
+           WHERE user_id = %s AND card_id = %s FOR UPDATE""",
+        (user_id, card_id)
+    )
+    row = cur.fetchone()
+    ease, interval_days, repetitions = (row[0], row[1], row[2]) if row else (2.5, 0.0, 0)
+    ease, interval_days, repetitions, lapsed = sm2(grade, ease, interval_days, repetitions)
+
+    cur.execute(
+        """INSERT INTO user_progress (user_id, card_id, ease, interval_days, repetitions, lapses,
+                                      due_at, last_reviewed_at, updated_at)
+           VALUES (%s, %s, %s, %s, %s, %s,
+                   CURRENT_TIMESTAMP + make_interval(secs => %s * 86400), CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+           ON CONFLICT (user_id, card_id) DO UPDATE SET
+               ease = EXCLUDED.ease,
+               interval_days = EXCLUDED.interval_days,
+               repetitions = EXCLUDED.repetitions,
+               lapses = user_progress.lapses + EXCLUDED.lapses,
+               due_at = EXCLUDED.due_at,
+               last_reviewed_at = EXCLUDED.last_reviewed_at,
+               updated_at = EXCLUDED.updated_at
+           RETURNING due_at, lapses""",
+        (user_id, card_id, ease, interval_days, repetitions, 1 if lapsed else 0, interval_days)
+    )
+    due_at, lapses = cur.fetchone()
+    conn.commit()
+    cur.close()
+
+    return {
+        'cardId': card_id,
+        'ease': ease,
+        'intervalDays': interval_days,
+        'repetitions': repetitions,
+        'lapses': lapses,
+        'dueAt': due_at.isoformat() if due_at else None
+    }
+
+
+def due_plan(user_id: Any, limit: int, course: Optional[str] = None,
+             group_id: Optional[str] = None, category_id: Optional[str] = None) -> db.Plan:
+    '''
+    Next `limit` cards to study: overdue reviews first (idx_user_progress_due),
+    then cards the user has never scheduled or marked learned, in library order.
+    Both halves are LIMITed, so cost does not grow with the library size.
+    '''
+    filters = []
+    filter_params: List[Any] = []
+    if course:
+        filters.append('c.course = %s')
+        filter_params.append(course)
+    if category_id:
+        filters.append('c.category_id = %s')
+        filter_params.append(category_id)
+    if group_id:
+        filters.append('EXISTS (SELECT 1 FROM card_groups cg WHERE cg.card_id = c.id AND cg.group_id = %s)')
+        filter_params.append(group_id)
+    extra = ''.join(f' AND {f}' for f in filters)
+
+    found = yield f"""
+        (
+            SELECT c.id, c.russian, c.russian_example, c.english, c.english_example,
+                   up.is_learned, cat.id, cat.name, cat.color, c.course,
+                   up.due_at, up.ease, up.interval_days, up.repetitions, 0 AS bucket
+            FROM user_progress up
+            JOIN cards c ON c.id = up.card_id
+            LEFT JOIN categories cat ON c.category_id = cat.id
+            WHERE up.user_id = %s AND up.due_at IS NOT NULL AND up.due_at <= CURRENT_TIMESTAMP{extra}
+            ORDER BY up.due_at
+            LIMIT %s
+        )
+        UNION ALL
+        (
+            SELECT c.id, c.russian, c.russian_example, c.english, c.english_example,
+                   FALSE, cat.id, cat.name, cat.color, c.course,
+                   NULL, NULL, NULL, 0, 1 AS bucket
+            FROM cards c
+            LEFT JOIN categories cat ON c.category_id = cat.id
+            WHERE NOT EXISTS (
+                SELECT 1 FROM user_progress up
+                WHERE up.user_id = %s AND up.card_id = c.id AND (up.due_at IS NOT NULL OR up.is_learned)
+            ){extra}
+            ORDER BY c.id
+            LIMIT %s
+        )
+    """, [user_id] + filter_params + [limit, user_id] + filter_params + [limit]
+
+    rows = sorted(found, key=lambda r: r[14])[:limit]
+    return [{
+        'id': row[0],
+        'russian': row[1] or '',
+        'russianExample': row[2] or '',
+        'english': row[3] or '',
+        'englishExample': row[4] or '',
+        'learned': bool(row[5]),
+        'categoryId': row[6] if row[6] else None,
+        'categoryName': row[7] if row[7] else None,
+        'categoryColor': row[8] if row[8] else None,
+        'course': row[9] if row[9] else 1,
+        'dueAt': row[10].isoformat() if row[10] else None,
+        'ease': row[11],
+        'intervalDays': row[12],
+        'repetitions': row[13],
+        'isNew': row[14] == 1
+    } for row in rows]
+
+
+def due_cards(cur: Any, user_id: Any, limit: int, course: Optional[str] = None,
+              group_id: Optional[str] = None, category_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    '''due_plan on a psycopg2 cursor'''
+    return db.run_plan(cur, due_plan(user_id, limit, course, group_id, category_id))
@@ -0,0 +1,106 @@
+from typing import Dict, Any, List, Optional
+
+from shared.text import fold
+
+DEFAULT_SEARCH_SIZE = 20
+MAX_SEARCH_SIZE = 100
+MAX_QUERY_LENGTH = 100
+# Shorter queries have no trigrams, so they only match by prefix
+MIN_FUZZY_LENGTH = 3
+# pg_trgm word similarity needed for a typo match (the extension default is 0.6)
+WORD_SIMILARITY_THRESHOLD = 0.4
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _match(table: str, fuzzy: bool) -> str:
+    columns = [f'search_fold({table}.russian)', f'search_fold({table}.english)']
+    conditions = [f'{col} LIKE %(prefix)s' for col in columns]
+    if fuzzy:
+        conditions += [f'{col} LIKE %(pattern)s' for col in columns]
+        conditions += [f'%(term)s <%% {col}' for col in columns]
+    return ' OR '.join(conditions)
+
+
+def _score(table: str) -> str:
+    parts = []
+    for col in (f'search_fold({table}.russian)', f'search_fold({table}.english)'):
+        parts.append(f"""(CASE WHEN {col} = %(term)s THEN 3
+                              WHEN {col} LIKE %(prefix)s THEN 2
+                              WHEN {col} LIKE %(pattern)s THEN 1
+                              ELSE 0 END + word_similarity(%(term)s, {col}))""")
+    return f"GREATEST({', '.join(parts)})"
+
+
+def search(cur: Any, query: str, scope: str, limit: int, offset: int,
+           course: Optional[str] = None) -> Dict[str, Any]:
+    '''
+    Ranked search over cards and/or the global dictionary (scope: all, cards,
+    dictionary). Exact matches rank first, then prefix, substring and typo
+    matches ordered by trigram word similarity. Every predicate is served by
+    the search_fold() expression indexes from V0018, so latency depends on
+    the number of matches rather than on the table size.
+    '''
+    term = fold(query)[:MAX_QUERY_LENGTH]
+    if not term:
+        return {'results': [], 'nextOffset': None}
+
+    fuzzy = len(term) >= MIN_FUZZY_LENGTH
+    escaped = _escape_like(term)
+    params: Dict[str, Any] = {
+        'term': term,
+        'prefix': escaped + '%',
+        'pattern': '%' + escaped + '%',
+        'window': offset + limit + 1,
+        'limit': limit + 1,
+        'offset': offset,
+        'course': course
+    }
+    cur.execute("SET LOCAL pg_trgm.word_similarity_threshold = %s", (WORD_SIMILARITY_THRESHOLD,))
+
+    branches = []
+    if scope in ('all', 'cards'):
+        course_filter = ' AND c.course = %(course)s' if course else ''
+        branches.append(f"""
+            (SELECT 'card' AS kind, c.id, c.russian, c.english, c.russian_example, c.english_example,
+                    c.course, {_score('c')} AS score
+             FROM cards c
+             WHERE ({_match('c', fuzzy)}){course_filter}
+             ORDER BY score DESC, c.id
+             LIMIT %(window)s)""")
+    if scope in ('all', 'dictionary'):
+        branches.append(f"""
+            (SELECT 'word' AS kind, w.id, w.russian, w.english, w.russian_example, w.english_example,
+                    NULL::integer AS course, {_score('w')} AS score
+             FROM global_words w
+             WHERE {_match('w', fuzzy)}
+             ORDER BY score DESC, w.id
+             LIMIT %(window)s)""")
+
+    cur.execute(f"""
+        SELECT * FROM ({' UNION ALL '.join(branches)}) found
+        ORDER BY score DESC, kind, id
+        LIMIT %(limit)s OFFSET %(offset)s
+    """, params)
+    rows = cur.fetchall()
+
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+
+    return {
+        'results': [{
+            'type': row[0],
+            'id': row[1],
+            'russian': row[2] or '',
+            'english': row[3] or '',
+            'russianExample': row[4] or '',
+            'englishExample': row[5] or '',
+            'course': (row[6] or 1) if row[0] == 'card' else None,
+            'score': round(float(row[7]), 3)
+        } for row in rows],
+        'nextOffset': next_offset
+    }
@@ -0,0 +1,84 @@
+import random
+import secrets
+from typing import Dict, Any, List, Optional
+
+from shared import db
+
+DEFAULT_SESSION_SIZE = 20
+MAX_SESSION_SIZE = 100
+
+
+def new_seed() -> str:
+    return secrets.token_hex(4)
+
+
+def _filters(user_id: Any, course: Optional[str], group_id: Optional[str],
+             category_id: Optional[str], unlearned: bool) -> Any:
+    conditions = []
+    params: List[Any] = []
+    if course:
+        conditions.append('c.course = %s')
+        params.append(course)
+    if category_id:
+        conditions.append('c.category_id = %s')
+        params.append(category_id)
+    if group_id:
+        conditions.append('EXISTS (SELECT 1 FROM card_groups cg WHERE cg.card_id = c.id AND cg.group_id = %s)')
+        params.append(group_id)
+    if unlearned:
+        conditions.append('NOT EXISTS (SELECT 1 FROM user_progress up WHERE up.user_id = %s AND up.card_id = c.id AND up.is_learned)')
+        params.append(user_id)
+    return ''.join(f' AND {c}' for c in conditions), params
+
+
+def sample_plan(user_id: Any, size: int, seed: str, course: Optional[str] = None,
+                group_id: Optional[str] = None, category_id: Optional[str] = None,
+                unlearned: bool = False) -> db.Plan:
+    '''
+    Picks `size` random cards matching the filters without ORDER BY random().
+    Reads only the ids of the matching cards, in id order, and draws the
+    session from them with a generator seeded with `seed`, so every matching
+    card is equally likely and only the picked cards' rows are fetched. The same seed over the same library always yields the same
+    session.
+    '''
+    extra, params = _filters(user_id, course, group_id, category_id, unlearned)
+    matching = yield f"""
+        SELECT c.id FROM cards c
+        WHERE TRUE{extra}
+        ORDER BY c.id
+    """, params
+    ids = [row[0] for row in matching]
+    chosen = random.Random(seed).sample(ids, min(size, len(ids)))
+
+    if not chosen:
+        return []
+
+    picked = yield """
+        SELECT c.id, c.russian, c.russian_example, c.english, c.english_example,
+               COALESCE(up.is_learned, FALSE), cat.id, cat.name, cat.color, c.course
+        FROM cards c
+        LEFT JOIN categories cat ON c.category_id = cat.id
+        LEFT JOIN user_progress up ON c.id = up.card_id AND up.user_id = %s
+        WHERE c.id = ANY(%s)
+    """, [user_id, chosen]
+    by_id = {row[0]: row for row in picked}
+
+    return [{
+        'id': row[0],
+        'russian': row[1] or '',
+        'russianExample': row[2] or '',
+        'english': row[3] or '',
+        'englishExample': row[4] or '',
+        'learned': row[5],
+        'categoryId': row[6] if row[6] else None,
+        'categoryName': row[7] if row[7] else None,
+        'categoryColor': row[8] if row[8] else None,
+        'course': row[9] if row[9] else 1
+    } for row in (by_id[card_id] for card_id in chosen if card_id in by_id)]
+
+
+def sample_cards(cur: Any, user_id: Any, size: int, seed: str, course: Optional[str] = None,
+                 group_id: Optional[str] = None, category_id: Optional[str] = None,
+                 unlearned: bool = False) -> List[Dict[str, Any]]:
+    '''sample_plan on a psycopg2 cursor'''
+    return db.run_plan(cur, sample_plan(user_id, size, seed, course, group_id, category_id, unlearned))
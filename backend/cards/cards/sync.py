@@ -0,0 +1,108 @@
+from typing import Dict, Any, List
+
+
+def fetch_changes(cur: Any, user_id: Any, since: int) -> Dict[str, Any]:
+    '''
+    Everything that changed for this user after revision `since`: upserted
+    cards, groups, memberships and progress rows plus tombstones for deleted
+    ones. A revision is derived from the writing transaction's id (V0023) and
+    the returned `revision` stops below the oldest transaction still in
+    flight, so a slow writer can't commit a revision the client has already
+    passed. A client resumes by sending back the returned `revision`; since=0
+    yields a full snapshot.
+    '''
+    cur.execute("SELECT library_revision_bound()")
+    revision = max(cur.fetchone()[0] or 0, since)
+
+    cur.execute("""
+        SELECT c.id, c.russian, c.russian_example, c.english, c.english_example,
+               COALESCE(up.is_learned, FALSE) as is_learned,
+               cat.id, cat.name, cat.color, c.course,
+               (SELECT cg.group_id FROM card_groups cg WHERE cg.card_id = c.id LIMIT 1) as group_id
+        FROM cards c
+        LEFT JOIN categories cat ON c.category_id = cat.id
+        LEFT JOIN user_progress up ON c.id = up.card_id AND up.user_id = %s
+        WHERE c.revision > %s AND c.revision <= %s
+        ORDER BY c.revision
+    """, (user_id, since, revision))
+    cards: List[Dict[str, Any]] = []
+    for row in cur.fetchall():
+        cards.append({
+            'id': row[0],
+            'russian': row[1] or '',
+            'russianExample': row[2] or '',
+            'english': row[3] or '',
+            'englishExample': row[4] or '',
+            'learned': row[5],
+            'categoryId': row[6] if row[6] else None,
+            'categoryName': row[7] if row[7] else None,
+            'categoryColor': row[8] if row[8] else None,
+            'course': row[9] if row[9] else 1,
+            'groupId': row[10] if row[10] else None
+        })
+
+    cur.execute("""
+        SELECT id, name, description, color, created_at, course
+        FROM groups
+        WHERE revision > %s AND revision <= %s
+        ORDER BY revision
+    """, (since, revision))
+    groups = [{
+        'id': row[0],
+        'name': row[1],
+        'description': row[2] or '',
+        'color': row[3],
+        'createdAt': row[4].isoformat() if row[4] else None,
+        'course': row[5] if row[5] else 1
+    } for row in cur.fetchall()]
+
+    cur.execute("""
+        SELECT card_id, group_id FROM card_groups
+        WHERE revision > %s AND revision <= %s
+        ORDER BY revision
+    """, (since, revision))
+    memberships = [{'cardId': row[0], 'groupId': row[1]} for row in cur.fetchall()]
+
+    cur.execute("""
+        SELECT card_id, is_learned, updated_at FROM user_progress
+        WHERE user_id = %s AND revision > %s AND revision <= %s
+        ORDER BY revision
+    """, (user_id, since, revision))
+    progress = [{
+        'cardId': row[0],
+        'learned': bool(row[1]),
+        'updatedAt': row[2].isoformat() if row[2] else None
+    } for row in cur.fetchall()]
+
+    deleted: Dict[str, List[Any]] = {'cards': [], 'groups': [], 'memberships': [], 'progress': []}
+    if since > 0:
+        # Memberships and progress rows that were re-created later are live again
+        cur.execute("""
+            SELECT t.entity, t.entity_id, t.group_id
+            FROM sync_tombstones t
+            WHERE t.revision > %s AND t.revision <= %s
+              AND (t.user_id IS NULL OR t.user_id = %s)
+              AND NOT (t.entity = 'membership' AND EXISTS (
+                  SELECT 1 FROM card_groups cg WHERE cg.card_id = t.entity_id AND cg.group_id = t.group_id))
+              AND NOT (t.entity = 'progress' AND EXISTS (
+                  SELECT 1 FROM user_progress up WHERE up.card_id = t.entity_id AND up.user_id = t.user_id))
+            ORDER BY t.revision
+        """, (since, revision, user_id))
+        for entity, entity_id, group_id in cur.fetchall():
+            if entity == 'card':
+                deleted['cards'].append(entity_id)
+            elif entity == 'group':
+                deleted['groups'].append(entity_id)
+            elif entity == 'membership':
+                deleted['memberships'].append({'cardId': entity_id, 'groupId': group_id})
+            elif entity == 'progress':
+                deleted['progress'].append(entity_id)
+
+    return {
+        'revision': revision,
+        'cards': cards,
+        'groups': groups,
+        'memberships': memberships,
+        'progress': progress,
+        'deleted': deleted
+    }
@@ -0,0 +1,75 @@
+import json
+from typing import Dict, Any
+
+from shared import db, encoding, http, instrument, versions
+from categories import listing
+
+@instrument.traced('categories')
+@encoding.compressed
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: API for managing user categories (get and create)
+    Args: event - dict with httpMethod, body, headers with X-Session-Token or X-User-Id
+          context - object with request_id
+    Returns: HTTP response with categories data
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return http.preflight('GET, POST, OPTIONS', 'Content-Type, X-Session-Token, X-User-Id, X-Is-Admin, If-None-Match')
+    
+    headers = event.get('headers', {})
+    user_id, is_admin = http.user_context(event)
+    
+    if not user_id:
+        return http.json_response(401, {'error': 'User ID required'})
+    
+    with db.connection() as conn:
+        cur = conn.cursor()
+        
+        if method == 'GET':
+            etag = versions.build_etag('categories', versions.fetch_versions(cur, [('categories', user_id)]))
+            
+            if versions.etag_matches(headers, etag):
+                cur.close()
+                return versions.not_modified(etag)
+            
+            categories = listing.fetch_categories(cur, user_id)
+            cur.close()
+            
+            return http.json_response(200, {'categories': categories}, versions.cache_headers(etag))
+        
+        elif method == 'POST':
+            if not is_admin:
+                cur.close()
+                return http.json_response(403, {'error': 'Admin access required'})
+            
+            body_data = json.loads(event.get('body', '{}'))
+            name = body_data.get('name', '').strip()
+            color = body_data.get('color', 'bg-gradient-to-br from-gray-500 to-gray-600')
+            
+            if not name:
+                cur.close()
+                return http.json_response(400, {'error': 'Category name required'})
+            
+            cur.execute(
+                "SELECT id FROM categories WHERE user_id = %s AND name = %s",
+                (user_id, name)
+            )
+            
+            if cur.fetchone():
+                cur.close()
+                return http.json_response(400, {'error': 'Category already exists'})
+            
+            cur.execute(
+                "INSERT INTO categories (user_id, name, color) VALUES (%s, %s, %s) RETURNING id",
+                (user_id, name, color)
+            )
+            
+            category_id = cur.fetchone()[0]
+            conn.commit()
+            cur.close()
+            
+            return http.json_response(200, {'categoryId': category_id})
+        
+        return http.json_response(405, {'error': 'Method not allowed'})
\ No newline at end of file
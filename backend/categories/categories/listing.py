@@ -0,0 +1,18 @@
+from typing import Dict, Any, List
+
+
+def fetch_categories(cur: Any, user_id: Any) -> List[Dict[str, Any]]:
+    '''The user's categories in creation order'''
+    cur.execute(
+        "SELECT id, name, color FROM categories WHERE user_id = %s ORDER BY created_at ASC",
+        (user_id,)
+    )
+
+    categories = []
+    for row in cur.fetchall():
+        categories.append({
+            'id': row[0],
+            'name': row[1],
+            'color': row[2]
+        })
+    return categories
@@ -0,0 +1,69 @@
+import hashlib
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+LIBRARY = ('library', 0)
+
+
+def fetch_versions(cur: Any, keys: List[Tuple[str, int]]) -> List[int]:
+    '''
+    Reads change counters maintained by triggers (see V0011) in one indexed query.
+    The library counter is striped over one row per writer slot (V0028) and
+    reads as their sum. Missing counters read as 0.
+    '''
+    cur.execute(
+        """
+        SELECT scope, CASE WHEN scope = %s THEN 0 ELSE owner_id END, SUM(version)::bigint
+        FROM data_versions
+        WHERE (scope, owner_id) IN %s OR (%s AND scope = %s)
+        GROUP BY 1, 2
+        """,
+        (LIBRARY[0], tuple((scope, int(owner)) for scope, owner in keys), LIBRARY in keys, LIBRARY[0])
+    )
+    found = {(row[0], row[1]): row[2] for row in cur.fetchall()}
+    return [found.get((scope, int(owner)), 0) for scope, owner in keys]
+
+
+def build_etag(resource: str, versions: List[int], query_params: Optional[Dict[str, Any]] = None) -> str:
+    '''Weak ETag from resource name, counter values and the request query string'''
+    query = json.dumps(query_params or {}, sort_keys=True)
+    digest = hashlib.sha1(query.encode()).hexdigest()[:8]
+    return 'W/"%s-%s-%s"' % (resource, '.'.join(str(v) for v in versions), digest)
+
+
+def etag_matches(headers: Dict[str, Any], etag: str) -> bool:
+    '''True when the client's If-None-Match already lists this ETag'''
+    header = headers.get('If-None-Match') or headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    wanted = etag[2:] if etag.startswith('W/') else etag
+    for tag in header.split(','):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith('W/') else tag) == wanted:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Dict[str, Any]:
+    return {
+        'statusCode': 304,
+        'headers': {
+            'ETag': etag,
+            'Cache-Control': 'private, no-cache',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Expose-Headers': 'ETag'
+        },
+        'body': '',
+        'isBase64Encoded': False
+    }
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    '''Headers to merge into a 200 response so browsers revalidate with If-None-Match'''
+    return {
+        'ETag': etag,
+        'Cache-Control': 'private, no-cache',
+        'Access-Control-Expose-Headers': 'ETag'
+    }
@@ -0,0 +1,121 @@
+'''
+What each backend function is deployed with.
+
+The platform deploys every function folder on its own, so nothing a handler
+imports may live outside it. backend/<function>/ holds index.py, the entry
+point the platform loads, the <function> package with the handler and its
+helpers, and shared/, a copy of backend/shared. The api router runs its
+routes in-process and also carries a copy of each route's package.
+
+backend/shared and backend/<function>/<function> are the sources; the copies
+are generated and committed. `python -m deploy` rewrites them and
+`python -m deploy --check` fails when one has drifted.
+
+Local tools (bench, server, enrichment) run against the sources from the
+backend root; use_source_tree() puts the folders they need on sys.path.
+'''
+import os
+import sys
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FUNCTIONS = ('accounts', 'api', 'auth', 'cards', 'categories', 'translate')
+ROUTER = 'api'
+SHARED = 'shared'
+# Command-line entry points are run from the backend root, never deployed
+SKIPPED_FILES = ('__main__.py',)
+
+
+def _sources(package: str) -> List[str]:
+    '''Files of a source package, relative to the package folder'''
+    files = []
+    for root, dirs, names in os.walk(os.path.join(BACKEND_DIR, package)):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(names):
+            if name.endswith('.py') and name not in SKIPPED_FILES:
+                files.append(os.path.relpath(os.path.join(root, name), os.path.join(BACKEND_DIR, package)))
+    return files
+
+
+def _read(path: str) -> bytes:
+    with open(os.path.join(BACKEND_DIR, path), 'rb') as f:
+        return f.read()
+
+
+def _requirements(functions: List[str]) -> bytes:
+    '''Union of the functions' requirements.txt, sorted'''
+    lines = set()
+    for function in functions:
+        lines.update(line.strip() for line in _read(os.path.join(function, 'requirements.txt')).decode().splitlines())
+    return ''.join(f'{line}\n' for line in sorted(lines - {''})).encode()
+
+
+def copies() -> Dict[str, bytes]:
+    '''Every generated file, path relative to the backend root -> contents'''
+    routes = [f for f in FUNCTIONS if f != ROUTER]
+    files: Dict[str, bytes] = {}
+    for rel in _sources(SHARED):
+        content = _read(os.path.join(SHARED, rel))
+        for function in FUNCTIONS:
+            files[os.path.join(function, SHARED, rel)] = content
+    for route in routes:
+        for rel in _sources(os.path.join(route, route)):
+            files[os.path.join(ROUTER, route, rel)] = _read(os.path.join(route, route, rel))
+    files[os.path.join(ROUTER, 'requirements.txt')] = _requirements(routes)
+    return files
+
+
+def _copy_roots() -> List[str]:
+    '''Folders that hold nothing but generated files'''
+    roots = [os.path.join(function, SHARED) for function in FUNCTIONS]
+    return roots + [os.path.join(ROUTER, f) for f in FUNCTIONS if f != ROUTER]
+
+
+def _stale(files: Dict[str, bytes]) -> List[str]:
+    '''Files under the copy folders that no source produces any more'''
+    stale = []
+    for root in _copy_roots():
+        for path in _sources(root):
+            if os.path.join(root, path) not in files:
+                stale.append(os.path.join(root, path))
+    return stale
+
+
+def drift() -> List[str]:
+    '''Copies that are missing, differ from their source or have no source'''
+    files = copies()
+    changed = []
+    for path, content in files.items():
+        if not os.path.exists(os.path.join(BACKEND_DIR, path)) or _read(path) != content:
+            changed.append(path)
+    return sorted(changed + _stale(files))
+
+
+def sync() -> List[str]:
+    '''Rewrites the copies from their sources and returns the paths it touched'''
+    files = copies()
+    changed = drift()
+    for path in changed:
+        full = os.path.join(BACKEND_DIR, path)
+        if path not in files:
+            os.remove(full)
+            continue
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'wb') as f:
+            f.write(files[path])
+    return changed
+
+
+def source_path() -> List[str]:
+    '''
+    sys.path entries that resolve every package to its source: the backend
+    root first, so backend/shared wins over the copies, then each function
+    folder, with the router last so its route copies never shadow a source.
+    '''
+    folders = [f for f in FUNCTIONS if f != ROUTER] + [ROUTER]
+    return [BACKEND_DIR] + [os.path.join(BACKEND_DIR, f) for f in folders]
+
+
+def use_source_tree() -> None:
+    entries = source_path()
+    sys.path[:] = entries + [p for p in sys.path if p not in entries]
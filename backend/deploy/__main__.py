@@ -0,0 +1,34 @@
+'''
+Regenerates the shared/ and route copies every function folder is deployed with.
+
+    cd backend && python -m deploy            # rewrite the copies
+    cd backend && python -m deploy --check    # exit 1 if any copy is out of date
+
+Run it after changing backend/shared or a function package; see the deploy
+package docstring for the layout.
+'''
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deploy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m deploy', description='Sync the per-function copies of shared code')
+    parser.add_argument('--check', action='store_true', help='only report copies that are out of date')
+    args = parser.parse_args()
+
+    paths = deploy.drift() if args.check else deploy.sync()
+    for path in paths:
+        print(path)
+    if args.check and paths:
+        print(f'{len(paths)} deployed copies are out of date; run python -m deploy', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
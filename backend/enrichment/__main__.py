@@ -0,0 +1,113 @@
+'''
+Background enrichment of cards saved without a translation or examples.
+
+    cd backend && python -m enrichment run [--concurrency 2] [--batch-size 20] [--drain]
+    cd backend && python -m enrichment run --fake-model 0.2 --drain
+    cd backend && python -m enrichment backfill [--retry-failed]
+    cd backend && python -m enrichment status
+
+Jobs live in enrichment_jobs (V0021); inserting an incomplete card queues
+one. `run` claims batches with FOR UPDATE SKIP LOCKED, so several worker
+processes can share the queue, and fills the missing fields through the
+translate function's cache and rate limiter. Failures are retried with
+exponential backoff and end as failed after --max-attempts. --fake-model
+starts the benchmark's local model stand-in instead of calling OpenAI.
+All commands take --dsn or DATABASE_URL.
+'''
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deploy
+
+deploy.use_source_tree()
+
+from shared import enrichment as jobs
+from enrichment.worker import DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY, POLL_INTERVAL, Worker
+
+
+def run(args: argparse.Namespace) -> int:
+    fake = None
+    if args.fake_model is not None:
+        from bench.fake_openai import FakeOpenAI
+
+        fake = FakeOpenAI(latency=args.fake_model, error_rate=args.fake_error_rate).start()
+        os.environ['OPENAI_BASE_URL'] = fake.base_url
+        os.environ.setdefault('OPENAI_API_KEY', 'fake')
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        print('OPENAI_API_KEY is not set (use --fake-model to run against a local stand-in)', file=sys.stderr)
+        return 2
+    # Claim and write-back take one connection each, cache lookups another
+    os.environ.setdefault('DB_POOL_MAX_SIZE', str(args.concurrency * 2))
+
+    from translate.index import translate_batch
+
+    worker = Worker(
+        lambda words: translate_batch(words, api_key),
+        concurrency=args.concurrency, batch_size=args.batch_size, poll_interval=args.poll,
+        max_attempts=args.max_attempts, backoff_base=args.retry_base,
+        log=lambda line: print(line, file=sys.stderr)
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        report = worker.run(stop, drain=args.drain)
+        if fake is not None:
+            report.update({'modelCalls': fake.calls, 'modelErrors': fake.errors})
+    finally:
+        if fake is not None:
+            fake.stop()
+    print(json.dumps(report))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m enrichment', description='Fill in missing card translations')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'), help='database URL (default DATABASE_URL)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_args = commands.add_parser('run', help='process queued jobs')
+    run_args.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='claiming threads')
+    run_args.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='jobs per claim')
+    run_args.add_argument('--poll', type=float, default=POLL_INTERVAL, help='seconds to wait when the queue is empty')
+    run_args.add_argument('--drain', action='store_true', help='exit once no job is runnable')
+    run_args.add_argument('--max-attempts', type=int, default=jobs.MAX_ATTEMPTS)
+    run_args.add_argument('--retry-base', type=float, default=jobs.BACKOFF_BASE, help='first retry delay in seconds')
+    run_args.add_argument('--fake-model', type=float, metavar='LATENCY', help='serve the model locally with this delay')
+    run_args.add_argument('--fake-error-rate', type=float, default=0.0, help='share of fake model calls that fail')
+
+    backfill_args = commands.add_parser('backfill', help='queue existing incomplete cards')
+    backfill_args.add_argument('--retry-failed', action='store_true', help='also restart jobs that ran out of attempts')
+
+    commands.add_parser('status', help='print job counts')
+
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error('--dsn or DATABASE_URL is required')
+    os.environ['DATABASE_URL'] = args.dsn
+
+    if args.command == 'run':
+        args.concurrency = max(args.concurrency, 1)
+        args.batch_size = max(args.batch_size, 1)
+        return run(args)
+
+    from shared import db
+
+    with db.connection() as conn:
+        if args.command == 'backfill':
+            print(json.dumps({'queued': jobs.enqueue_missing(conn, retry_failed=args.retry_failed)}))
+        else:
+            cur = conn.cursor()
+            print(json.dumps(jobs.stats(cur)))
+            cur.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import threading
+from typing import Dict, Any, Callable, List, Optional
+
+from shared import db
+from shared import enrichment as jobs
+
+DEFAULT_CONCURRENCY = 2
+DEFAULT_BATCH_SIZE = 20
+POLL_INTERVAL = 2.0
+
+
+def missing_fields(card: Dict[str, Any]) -> List[str]:
+    return [column for column, _ in jobs.FIELDS if not card[column].strip()]
+
+
+class Worker:
+    '''
+    Enrichment loop run by `concurrency` threads. Each thread claims a batch,
+    translates the words of the cards that still miss something and writes
+    the results back; failed cards return to the queue with backoff. The
+    translate callable is translate_batch, so cache hits, single-flight, the
+    upstream rate limit and per-call 429/5xx retries are shared by all threads.
+    No connection is held while the model is called.
+    '''
+
+    def __init__(self, translate: Callable[[List[str]], List[Dict[str, Any]]],
+                 concurrency: int = DEFAULT_CONCURRENCY, batch_size: int = DEFAULT_BATCH_SIZE,
+                 poll_interval: float = POLL_INTERVAL, max_attempts: int = jobs.MAX_ATTEMPTS,
+                 backoff_base: float = jobs.BACKOFF_BASE, log: Callable[[str], None] = print):
+        self.translate = translate
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.log = log
+        self._lock = threading.Lock()
+        self.counters = {'batches': 0, 'claimed': 0, 'done': 0, 'retried': 0, 'failed': 0, 'errors': 0}
+
+    def run_once(self) -> int:
+        '''Claims and processes one batch; returns how many jobs it claimed'''
+        with db.connection() as conn:
+            claimed = jobs.claim(conn, self.batch_size)
+        if not claimed:
+            return 0
+
+        filled = [(card['id'], {}) for card in claimed if not missing_fields(card)]
+        todo = [card for card in claimed if missing_fields(card)]
+        failures = []
+        if todo:
+            results = self.translate([card['russian'] for card in todo])
+            for card, result in zip(todo, results):
+                if 'error' in result or not result.get('english'):
+                    failures.append((card['id'], card['attempts'], result.get('error') or 'Empty translation'))
+                else:
+                    filled.append((card['id'], result))
+
+        with db.connection() as conn:
+            done = jobs.complete(conn, filled)
+            outcome = jobs.retry(conn, failures, self.max_attempts, self.backoff_base)
+
+        with self._lock:
+            self.counters['batches'] += 1
+            self.counters['claimed'] += len(claimed)
+            self.counters['done'] += done
+            self.counters['retried'] += outcome['retried']
+            self.counters['failed'] += outcome['failed']
+        return len(claimed)
+
+    def _loop(self, stop: threading.Event, drain: bool) -> None:
+        while not stop.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                # Claimed jobs stay running until their lease expires, then any worker picks them up
+                with self._lock:
+                    self.counters['errors'] += 1
+                self.log(f'enrichment batch failed: {e}')
+                if drain:
+                    return
+                claimed = 0
+            if not claimed:
+                if drain:
+                    return
+                stop.wait(self.poll_interval)
+
+    def run(self, stop: Optional[threading.Event] = None, drain: bool = False) -> Dict[str, int]:
+        '''
+        Runs until stop is set, or with drain until no job is runnable right
+        now (jobs waiting out a backoff are left for the next run).
+        '''
+        stop = stop or threading.Event()
+        threads = [
+            threading.Thread(target=self._loop, args=(stop, drain), name=f'enrichment-{n}', daemon=True)
+            for n in range(max(self.concurrency, 1))
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return self.stats()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
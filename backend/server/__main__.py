@@ -0,0 +1,43 @@
+'''
+Every function behind one ASGI server, for deployments that keep a process
+running instead of invoking handlers per request.
+
+    cd backend && pip install -r server/requirements.txt
+    cd backend && python -m server [--host 0.0.0.0] [--port 8000] [--sync-only]
+
+GET /cards?resource=session and /cards?resource=due run on the event loop
+over an asyncpg pool (ASYNC_POOL_MIN_SIZE, ASYNC_POOL_MAX_SIZE); every other
+request goes to the unchanged handler on a thread pool of DB_POOL_MAX_SIZE
+threads. --sync-only sends those two through the handler as well. Paths are
+/<function>, e.g. /cards, /accounts; / is the api router. Needs DATABASE_URL.
+'''
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m server', description='Serve the backend functions over ASGI')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--sync-only', action='store_true', help='run study reads on the thread pool too')
+    args = parser.parse_args()
+    if not os.environ.get('DATABASE_URL'):
+        parser.error('DATABASE_URL is required')
+
+    try:
+        import uvicorn
+    except ImportError:
+        print('uvicorn is not installed: pip install -r server/requirements.txt', file=sys.stderr)
+        return 2
+
+    from server.app import App
+
+    uvicorn.run(App(async_study=not args.sync_only), host=args.host, port=args.port, lifespan='on')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
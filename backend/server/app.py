@@ -0,0 +1,176 @@
+import asyncio
+import base64
+import importlib
+import json
+import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deploy
+
+deploy.use_source_tree()
+
+FUNCTIONS = ('accounts', 'api', 'auth', 'cards', 'categories', 'translate')
+DEFAULT_FUNCTION = 'api'
+
+
+class Context:
+    '''The slice of the cloud runtime's context object the handlers read'''
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+
+
+def route(path: str) -> Optional[str]:
+    '''/cards -> cards, / -> api; unknown names route to None'''
+    name = path.strip('/').split('/', 1)[0]
+    if not name:
+        return DEFAULT_FUNCTION
+    return name if name in FUNCTIONS else None
+
+
+def to_event(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    '''
+    ASGI HTTP scope as the event the handlers already take: Title-Case header
+    names, a flat query string dict (last value wins, as on the gateway), the
+    body as text, or base64 with isBase64Encoded when it is not UTF-8.
+    '''
+    headers: Dict[str, str] = {}
+    for name, value in scope.get('headers') or []:
+        headers['-'.join(part.capitalize() for part in name.decode('latin-1').split('-'))] = value.decode('latin-1')
+    query = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True))
+
+    event: Dict[str, Any] = {
+        'httpMethod': scope.get('method', 'GET'),
+        'path': scope.get('path', '/'),
+        'headers': headers,
+        'queryStringParameters': query,
+        'requestContext': {'requestId': str(uuid.uuid4()), 'identity': {'sourceIp': (scope.get('client') or [''])[0]}},
+        'isBase64Encoded': False
+    }
+    if body:
+        try:
+            event['body'] = body.decode('utf-8')
+        except UnicodeDecodeError:
+            event['body'] = base64.b64encode(body).decode('ascii')
+            event['isBase64Encoded'] = True
+    return event
+
+
+def _response_parts(response: Dict[str, Any]) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    body = response.get('body') or ''
+    payload = base64.b64decode(body) if response.get('isBase64Encoded') else body.encode('utf-8')
+    headers = [(str(k).lower().encode('latin-1'), str(v).encode('latin-1'))
+               for k, v in (response.get('headers') or {}).items() if str(k).lower() != 'content-length']
+    headers.append((b'content-length', str(len(payload)).encode('latin-1')))
+    return int(response.get('statusCode') or 200), headers, payload
+
+
+class App:
+    '''
+    ASGI application serving every function from one process.
+
+    Requests are mapped to handler(event, context) and the handlers run
+    unchanged on a thread pool (sized like the psycopg2 pool, DB_POOL_MAX_SIZE),
+    so behaviour matches the per-invocation deployment. With async_study the
+    cards session and due reads skip the thread pool and run on the event loop
+    over an asyncpg pool (server.study), which is what lets one process keep
+    hundreds of study-session requests in flight.
+    '''
+
+    def __init__(self, async_study: bool = True, threads: Optional[int] = None):
+        self.async_study = async_study
+        self.threads = threads or int(os.environ.get('DB_POOL_MAX_SIZE', '4'))
+        self.handlers: Dict[str, Callable[..., Dict[str, Any]]] = {}
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.pool: Any = None
+        self._lock = asyncio.Lock()
+
+    async def startup(self) -> None:
+        async with self._lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='handler')
+            if self.async_study and self.pool is None:
+                from server import pg
+
+                self.pool = await pg.create_pool()
+
+    async def shutdown(self) -> None:
+        async with self._lock:
+            if self.pool is not None:
+                await self.pool.close()
+                self.pool = None
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+
+    def handler(self, name: str) -> Callable[..., Dict[str, Any]]:
+        '''Imported on first use, so a process only loads the functions it serves'''
+        if name not in self.handlers:
+            self.handlers[name] = importlib.import_module(f'{name}.index').handler
+        return self.handlers[name]
+
+    async def call(self, name: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        '''Answers one event; the entry point for in-process callers such as the benchmark'''
+        if self.executor is None:
+            await self.startup()
+        context = Context(event['requestContext']['requestId'])
+        if self.async_study:
+            from server import study
+
+            if study.handles(name, event):
+                return await study.handle(self.pool, event, context)
+        handler = self.handler(name)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, handler, event, context)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        name = route(scope.get('path', '/'))
+        if name is None:
+            response = {
+                'statusCode': 404,
+                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                'body': json.dumps({'error': 'Unknown function'}),
+                'isBase64Encoded': False
+            }
+        else:
+            response = await self.call(name, to_event(scope, body))
+
+        status, headers, payload = _response_parts(response)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _lifespan(self, receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = App(async_study=os.environ.get('ASYNC_STUDY', '1') not in ('0', 'false', 'no'))
@@ -0,0 +1,90 @@
+import asyncio
+import functools
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Optional
+from contextlib import asynccontextmanager
+
+from shared import db, instrument
+
+_PLACEHOLDER = re.compile(r'%%|%s')
+
+
+@functools.lru_cache(maxsize=256)
+def to_dollar(sql: str) -> str:
+    '''psycopg2 %s placeholders as asyncpg's $1, $2, ...; %% becomes a literal %'''
+    count = 0
+
+    def number(match: Any) -> str:
+        nonlocal count
+        if match.group() == '%%':
+            return '%'
+        count += 1
+        return f'${count}'
+
+    return _PLACEHOLDER.sub(number, sql)
+
+
+class Pool:
+    '''
+    asyncpg pool that hands out connections in arrival order. asyncpg gives a
+    released connection to whichever coroutine asks next, and a woken waiter
+    that loses that race goes to the back of the line, so under a burst a few
+    requests wait for many turns (p99 several times p50). The semaphore queues
+    requests first-come first-served in front of it.
+    '''
+
+    def __init__(self, pool: Any, size: int):
+        self.pool = pool
+        self.size = size
+        self._turns = asyncio.Semaphore(size)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        async with self._turns:
+            async with self.pool.acquire() as conn:
+                yield conn
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+async def create_pool(dsn: Optional[str] = None) -> Pool:
+    '''
+    Connection pool for the server's async routes, sized by ASYNC_POOL_MIN_SIZE
+    and ASYNC_POOL_MAX_SIZE. One process multiplexes every in-flight request
+    over these connections, so it stays far smaller than the request count.
+    '''
+    import asyncpg
+    import psycopg2.extensions
+
+    # Both URL and key=value DSNs, as psycopg2 accepts them
+    params = psycopg2.extensions.parse_dsn(dsn or os.environ.get('DATABASE_URL', ''))
+    size = int(os.environ.get('ASYNC_POOL_MAX_SIZE', '20'))
+    pool = await asyncpg.create_pool(
+        host=params.get('host'), port=params.get('port'), user=params.get('user'),
+        password=params.get('password'), database=params.get('dbname'),
+        min_size=min(int(os.environ.get('ASYNC_POOL_MIN_SIZE', '2')), size),
+        max_size=size,
+        command_timeout=float(os.environ.get('ASYNC_COMMAND_TIMEOUT', '30'))
+    )
+    return Pool(pool, size)
+
+
+async def run_plan(conn: Any, plan: db.Plan, trace: Optional[instrument.Trace] = None) -> Any:
+    '''
+    Drives a query plan (see shared.db.Plan) on an asyncpg connection. asyncpg
+    prepares and caches each statement per connection; parameters are sent
+    typed, so ids must already be ints.
+    '''
+    rows: Any = None
+    while True:
+        try:
+            sql, params = plan.send(rows)
+        except StopIteration as done:
+            return done.value
+        started = time.perf_counter()
+        rows = await conn.fetch(to_dollar(sql), *params)
+        if trace is not None:
+            trace.add_query(sql, (time.perf_counter() - started) * 1000, len(rows))
@@ -0,0 +1,83 @@
+import time
+from typing import Dict, Any, Optional
+
+from cards import scheduler, session
+from shared import encoding, http, instrument
+from server import pg
+
+# cards GET resources served natively on the event loop
+RESOURCES = ('session', 'due')
+
+
+def handles(function: str, event: Dict[str, Any]) -> bool:
+    query = event.get('queryStringParameters') or {}
+    return function == 'cards' and event.get('httpMethod') == 'GET' and query.get('resource') in RESOURCES
+
+
+def _ids(query: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    '''Filter ids as ints (asyncpg does not coerce strings); raises ValueError'''
+    return {
+        name: int(query[key]) if query.get(key) else None
+        for name, key in (('course', 'course'), ('group_id', 'groupId'), ('category_id', 'categoryId'))
+    }
+
+
+def _size(value: Optional[str], default: int, maximum: int) -> int:
+    try:
+        return max(min(int(value or default), maximum), 1)
+    except ValueError:
+        return default
+
+
+async def handle(pool: Any, event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Async twin of the cards handler's session and due branches: same plans
+    (session.sample_plan, scheduler.due_plan), same response shape, but the
+    queries go through the asyncpg pool so a slow database holds a coroutine
+    rather than a thread.
+    '''
+    query = event.get('queryStringParameters') or {}
+    resource = query.get('resource')
+    trace = instrument.Trace('cards', getattr(context, 'request_id', None), 'GET', resource)
+
+    response = await _respond(pool, event, query, resource, trace)
+    response = encoding.compress_response(response, http.header(event, 'Accept-Encoding'))
+    trace.status = response['statusCode']
+    trace.response_bytes = len(response.get('body') or '')
+    trace.total_ms = (time.perf_counter() - trace.started) * 1000
+    instrument.log_request(trace)
+    return response
+
+
+async def _respond(pool: Any, event: Dict[str, Any], query: Dict[str, Any], resource: str,
+                   trace: instrument.Trace) -> Dict[str, Any]:
+    user_id, _ = http.user_context(event)
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return http.json_response(401, {'error': 'User ID required'})
+    try:
+        filters = _ids(query)
+    except ValueError:
+        return http.json_response(400, {'error': 'course, groupId and categoryId must be integers'})
+
+    payload: Dict[str, Any] = {}
+    if resource == 'session':
+        seed = query.get('seed') or session.new_seed()
+        size = _size(query.get('limit'), session.DEFAULT_SESSION_SIZE, session.MAX_SESSION_SIZE)
+        plan = session.sample_plan(user_id, size, seed, unlearned=query.get('learned') == 'false', **filters)
+        payload['seed'] = seed
+    else:
+        size = _size(query.get('limit'), scheduler.DEFAULT_BATCH_SIZE, scheduler.MAX_BATCH_SIZE)
+        plan = scheduler.due_plan(user_id, size, **filters)
+
+    started = time.perf_counter()
+    async with pool.acquire() as conn:
+        trace.connect_ms += (time.perf_counter() - started) * 1000
+        trace.connects += 1
+        payload['cards'] = await pg.run_plan(conn, plan, trace)
+
+    started = time.perf_counter()
+    response = http.json_response(200, payload, {'Cache-Control': 'no-store'})
+    trace.serialize_ms += (time.perf_counter() - started) * 1000
+    return response
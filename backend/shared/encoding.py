@@ -0,0 +1,98 @@
+import base64
+import functools
+import gzip
+import time
+from typing import Dict, Any, Callable, Optional
+
+from shared import instrument
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies below this size are sent as-is: compression would not pay for the base64 overhead
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    '''
+    Picks br or gzip from an Accept-Encoding header, honouring q-values;
+    brotli wins ties and is only offered when the module is installed.
+    '''
+    supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best: Optional[str] = None
+    best_q = 0.0
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        candidates = supported if token == '*' else [token]
+        for candidate in candidates:
+            if candidate not in supported or q <= 0:
+                continue
+            if q > best_q or (q == best_q and best is not None
+                              and supported.index(candidate) < supported.index(best)):
+                best, best_q = candidate, q
+    return best
+
+
+def _vary(response: Dict[str, Any]) -> Dict[str, Any]:
+    '''Adds Accept-Encoding to the response's Vary header'''
+    headers = dict(response.get('headers') or {})
+    vary = [v.strip() for v in (headers.get('Vary') or '').split(',') if v.strip()]
+    if 'accept-encoding' not in (v.lower() for v in vary):
+        headers['Vary'] = ', '.join(vary + ['Accept-Encoding'])
+    return dict(response, headers=headers)
+
+
+def compress_response(response: Dict[str, Any], accept_encoding: Optional[str]) -> Dict[str, Any]:
+    '''
+    Returns the response with a compressed, base64-encoded body when the client
+    accepts one. Every response whose body could have been compressed carries
+    Vary: Accept-Encoding, including the ones sent as-is (small, empty or 304),
+    so a shared cache never hands a stored encoding to a client that did not
+    ask for it.
+    '''
+    if response.get('isBase64Encoded'):
+        return response
+    response = _vary(response)
+    body = response.get('body')
+    if not body or len(body) < MIN_COMPRESS_BYTES:
+        return response
+    chosen = negotiate(accept_encoding)
+    if chosen is None:
+        return response
+
+    started = time.perf_counter()
+    raw = body.encode('utf-8')
+    if chosen == 'br':
+        data = brotli.compress(raw, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(raw, compresslevel=GZIP_LEVEL)
+    trace = instrument.current()
+    if trace is not None:
+        trace.compress_ms += (time.perf_counter() - started) * 1000
+    if len(data) >= len(raw):
+        return response
+
+    headers = dict(response['headers'])
+    headers['Content-Encoding'] = chosen
+    return dict(response, headers=headers, body=base64.b64encode(data).decode('ascii'), isBase64Encoded=True)
+
+
+def compressed(handler: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    '''Handler decorator: negotiates Content-Encoding from the request's Accept-Encoding header'''
+    @functools.wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        response = handler(event, context)
+        headers = event.get('headers') or {}
+        return compress_response(response, headers.get('Accept-Encoding') or headers.get('accept-encoding'))
+    return wrapper
@@ -0,0 +1,192 @@
+import random
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+STATUSES = ('pending', 'running', 'done', 'failed')
+MAX_ATTEMPTS = 5
+LEASE_SECONDS = 120
+BACKOFF_BASE = 30.0
+BACKOFF_CAP = 3600.0
+
+# Fields the worker fills, as (cards column, translation key)
+FIELDS = (('english', 'english'), ('russian_example', 'russianExample'), ('english_example', 'englishExample'))
+
+
+def backoff(attempts: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    '''Seconds before retry number `attempts`: exponential, capped, with jitter in its upper half'''
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return random.uniform(delay / 2, delay)
+
+
+def claim(conn: Any, batch_size: int, lease: int = LEASE_SECONDS) -> List[Dict[str, Any]]:
+    '''
+    Takes up to batch_size runnable jobs (pending and due, or running with an
+    expired lease) and commits them as running before any model call, so no
+    row lock is held while the worker waits on the network. SKIP LOCKED lets
+    any number of workers claim side by side without blocking each other.
+    Returns the claimed cards with their current text and attempt number.
+    '''
+    cur = conn.cursor()
+    cur.execute(
+        """WITH picked AS (
+               SELECT card_id FROM enrichment_jobs
+               WHERE (status = 'pending' AND run_after <= CURRENT_TIMESTAMP)
+                  OR (status = 'running' AND locked_until < CURRENT_TIMESTAMP)
+               ORDER BY run_after, card_id
+               LIMIT %s
+               FOR UPDATE SKIP LOCKED
+           ), claimed AS (
+               UPDATE enrichment_jobs j
+               SET status = 'running', attempts = j.attempts + 1,
+                   locked_until = CURRENT_TIMESTAMP + make_interval(secs => %s),
+                   updated_at = CURRENT_TIMESTAMP
+               FROM picked
+               WHERE j.card_id = picked.card_id
+               RETURNING j.card_id, j.attempts
+           )
+           SELECT c.id, c.russian, c.english, c.russian_example, c.english_example, claimed.attempts
+           FROM claimed
+           JOIN cards c ON c.id = claimed.card_id
+           ORDER BY c.id""",
+        (batch_size, lease)
+    )
+    rows = cur.fetchall()
+    conn.commit()
+    cur.close()
+    return [
+        {
+            'id': row[0],
+            'russian': row[1] or '',
+            'english': row[2] or '',
+            'russian_example': row[3] or '',
+            'english_example': row[4] or '',
+            'attempts': row[5]
+        }
+        for row in rows
+    ]
+
+
+def complete(conn: Any, filled: Sequence[Tuple[int, Dict[str, Any]]]) -> int:
+    '''
+    Writes model output into the cards' empty fields and marks the jobs done
+    in one transaction. Fields someone filled in since the claim are kept, and
+    cards without a dictionary link are linked to the entry the cache wrote.
+    '''
+    if not filled:
+        return 0
+    ids = [card_id for card_id, _ in filled]
+    cur = conn.cursor()
+    cur.execute(
+        """UPDATE cards c SET
+               english = CASE WHEN COALESCE(TRIM(c.english), '') = '' THEN v.english ELSE c.english END,
+               russian_example = CASE WHEN COALESCE(TRIM(c.russian_example), '') = '' THEN v.russian_example ELSE c.russian_example END,
+               english_example = CASE WHEN COALESCE(TRIM(c.english_example), '') = '' THEN v.english_example ELSE c.english_example END,
+               word_id = COALESCE(c.word_id, (SELECT w.id FROM global_words w WHERE w.normalized = search_fold(c.russian)))
+           FROM unnest(%s::int[], %s::text[], %s::text[], %s::text[]) AS v(id, english, russian_example, english_example)
+           WHERE c.id = v.id""",
+        [ids] + [[values.get(key) or '' for _, values in filled] for _, key in FIELDS]
+    )
+    cur.execute(
+        """UPDATE enrichment_jobs
+           SET status = 'done', locked_until = NULL, last_error = NULL, updated_at = CURRENT_TIMESTAMP
+           WHERE card_id = ANY(%s) AND status = 'running'""",
+        (ids,)
+    )
+    done = cur.rowcount
+    conn.commit()
+    cur.close()
+    return done
+
+
+def retry(conn: Any, failures: Sequence[Tuple[int, int, str]], max_attempts: int = MAX_ATTEMPTS,
+          backoff_base: float = BACKOFF_BASE) -> Dict[str, int]:
+    '''
+    Puts failed jobs, given as (card_id, attempts, error), back in the queue
+    after backoff(attempts) seconds; jobs out of attempts end as failed.
+    '''
+    if not failures:
+        return {'retried': 0, 'failed': 0}
+    cur = conn.cursor()
+    cur.execute(
+        """UPDATE enrichment_jobs j SET
+               status = CASE WHEN v.attempts >= %s THEN 'failed' ELSE 'pending' END,
+               run_after = CURRENT_TIMESTAMP + make_interval(secs => v.delay),
+               locked_until = NULL, last_error = v.error, updated_at = CURRENT_TIMESTAMP
+           FROM unnest(%s::int[], %s::int[], %s::float8[], %s::text[]) AS v(card_id, attempts, delay, error)
+           WHERE j.card_id = v.card_id AND j.status = 'running'
+           RETURNING j.status""",
+        (
+            max_attempts,
+            [card_id for card_id, _, _ in failures],
+            [attempts for _, attempts, _ in failures],
+            [backoff(attempts, backoff_base) for _, attempts, _ in failures],
+            [error[:500] for _, _, error in failures]
+        )
+    )
+    outcome = [row[0] for row in cur.fetchall()]
+    conn.commit()
+    cur.close()
+    return {'retried': outcome.count('pending'), 'failed': outcome.count('failed')}
+
+
+def enqueue_missing(conn: Any, retry_failed: bool = False) -> int:
+    '''
+    Queues existing cards that lack a translation or an example (new cards
+    are queued by the V0021 trigger). Cards whose job is done but which are
+    incomplete again are queued anew; with retry_failed, so are jobs that
+    ran out of attempts.
+    '''
+    requeue = ('done', 'failed') if retry_failed else ('done',)
+    cur = conn.cursor()
+    cur.execute(
+        """INSERT INTO enrichment_jobs (card_id)
+           SELECT c.id FROM cards c
+           WHERE COALESCE(TRIM(c.russian), '') <> ''
+             AND (COALESCE(TRIM(c.english), '') = ''
+                  OR COALESCE(TRIM(c.russian_example), '') = ''
+                  OR COALESCE(TRIM(c.english_example), '') = '')
+           ON CONFLICT (card_id) DO UPDATE SET
+               status = 'pending', attempts = 0, run_after = CURRENT_TIMESTAMP,
+               last_error = NULL, updated_at = CURRENT_TIMESTAMP
+           WHERE enrichment_jobs.status = ANY(%s)""",
+        (list(requeue),)
+    )
+    queued = cur.rowcount
+    conn.commit()
+    cur.close()
+    return queued
+
+
+def stats(cur: Any) -> Dict[str, Any]:
+    '''Jobs per status and the age of the oldest runnable one'''
+    cur.execute(
+        """SELECT status, COUNT(*),
+                  EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - MIN(run_after) FILTER (WHERE run_after <= CURRENT_TIMESTAMP)))
+           FROM enrichment_jobs GROUP BY status"""
+    )
+    result: Dict[str, Any] = {status: 0 for status in STATUSES}
+    oldest: Optional[float] = None
+    for status, count, age in cur.fetchall():
+        result[status] = count
+        if status == 'pending' and age is not None:
+            oldest = round(float(age), 1)
+    result['oldestPendingSeconds'] = oldest
+    return result
+
+
+def statuses(cur: Any, card_ids: List[int]) -> List[Dict[str, Any]]:
+    '''Job state of the given cards; cards that never needed enrichment are left out'''
+    cur.execute(
+        """SELECT card_id, status, attempts, run_after, last_error
+           FROM enrichment_jobs WHERE card_id = ANY(%s) ORDER BY card_id""",
+        (card_ids,)
+    )
+    return [
+        {
+            'cardId': row[0],
+            'status': row[1],
+            'attempts': row[2],
+            'runAfter': row[3].isoformat() if row[3] else None,
+            'lastError': row[4]
+        }
+        for row in cur.fetchall()
+    ]
@@ -0,0 +1,97 @@
+'''
+Backup and move the card library and student progress between databases.
+
+    cd backend && python -m shared.transfer export --out dump/ [--format ndjson|csv] [--tables cards,groups]
+    cd backend && python -m shared.transfer import --from dump/ [--restart]
+
+Export reads every table in one repeatable-read snapshot through server-side
+cursors, so memory use does not grow with table size, and writes one file
+per table plus manifest.json. Import applies the files parents first in
+committed batches and records its position in import-state.json, so an
+interrupted import picks up where it stopped. Both take --dsn or DATABASE_URL.
+'''
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import psycopg2
+import psycopg2.extensions
+
+from shared.transfer import exporter, loader
+from shared.transfer.tables import FORMATS, TABLES
+
+
+def export(dsn: str, directory: str, fmt: str, tables: list, batch_size: int) -> int:
+    os.makedirs(directory, exist_ok=True)
+    extension = FORMATS[fmt][0]
+    conn = psycopg2.connect(dsn)
+    conn.set_session(isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+    manifest = {'format': fmt, 'exportedAt': time.strftime('%Y-%m-%dT%H:%M:%S'), 'tables': {}}
+    try:
+        for name in tables:
+            path = os.path.join(directory, f'{name}.{extension}')
+            started = time.monotonic()
+            with open(path + '.part', 'w', encoding='utf-8', newline='') as out:
+                result = exporter.write_table(conn, name, out, fmt, batch_size=batch_size)
+            os.replace(path + '.part', path)
+            manifest['tables'][name] = {
+                'file': os.path.basename(path),
+                'rows': result['rows'],
+                'columns': list(TABLES[name].columns)
+            }
+            print(f"{name}: {result['rows']} rows in {time.monotonic() - started:.1f}s", file=sys.stderr)
+        conn.rollback()
+    finally:
+        conn.close()
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m shared.transfer', description='Export or import the card library')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'), help='database URL (default DATABASE_URL)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_args = commands.add_parser('export', help='write tables to a directory')
+    export_args.add_argument('--out', required=True, help='target directory')
+    export_args.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+    export_args.add_argument('--tables', help=f"comma-separated subset of {','.join(TABLES)}")
+    export_args.add_argument('--batch-size', type=int, default=exporter.BATCH_SIZE, help='rows per cursor fetch')
+
+    import_args = commands.add_parser('import', help='load an export directory')
+    import_args.add_argument('--from', dest='source', required=True, help='directory written by export')
+    import_args.add_argument('--state', help='progress file (default <dir>/import-state.json)')
+    import_args.add_argument('--restart', action='store_true', help='ignore saved progress and start over')
+    import_args.add_argument('--batch-size', type=int, default=loader.BATCH_SIZE, help='rows per committed batch')
+
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error('--dsn or DATABASE_URL is required')
+
+    if args.command == 'export':
+        tables = args.tables.split(',') if args.tables else list(TABLES)
+        unknown = [name for name in tables if name not in TABLES]
+        if unknown:
+            parser.error(f"unknown table(s): {', '.join(unknown)}")
+        return export(args.dsn, args.out, args.format, tables, max(args.batch_size, 1))
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        report = loader.load_dump(
+            conn, args.source, args.state or os.path.join(args.source, 'import-state.json'),
+            restart=args.restart, batch_size=max(args.batch_size, 1),
+            log=lambda line: print(line, file=sys.stderr)
+        )
+    finally:
+        conn.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import json
+from datetime import date, datetime
+from typing import Dict, Any, Iterable, Iterator, Optional, TextIO, Tuple
+
+from shared.transfer.tables import TABLES, Table
+
+BATCH_SIZE = 2000
+
+
+def _plain(value: Any) -> Any:
+    '''Values as they go into a file: timestamps in ISO 8601, everything else unchanged'''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(conn: Any, table: Table, after: Optional[Tuple[int, ...]] = None, limit: Optional[int] = None,
+                batch_size: int = BATCH_SIZE) -> Iterator[Tuple[Tuple[int, ...], Tuple[Any, ...]]]:
+    '''
+    Yields (key, values) in key order from a server-side cursor, so at most
+    batch_size rows are held in memory whatever the table size. Needs an
+    open transaction on conn, which psycopg2 starts implicitly.
+    '''
+    cur = conn.cursor(name=f'export_{table.name}')
+    cur.itersize = batch_size
+    key = ', '.join(table.key)
+    where = f'WHERE ({key}) > ({", ".join(["%s"] * len(table.key))})' if after else ''
+    page = 'LIMIT %s' if limit is not None else ''
+    cur.execute(
+        f"SELECT {key}, {', '.join(table.columns)} FROM {table.name} {where} ORDER BY {key} {page}",
+        list(after or ()) + ([limit] if limit is not None else [])
+    )
+    width = len(table.key)
+    try:
+        for row in cur:
+            yield tuple(row[:width]), row[width:]
+    finally:
+        cur.close()
+
+
+class NdjsonWriter:
+    '''One JSON object per row'''
+
+    def __init__(self, out: TextIO, table: Table):
+        self.out = out
+        self.columns = table.columns
+
+    def header(self) -> None:
+        pass
+
+    def row(self, values: Tuple[Any, ...]) -> None:
+        record = {name: _plain(value) for name, value in zip(self.columns, values)}
+        self.out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def csv_line(values: Iterable[Any]) -> str:
+    '''
+    One CSV record the way COPY ... (FORMAT csv) reads it back: text always
+    quoted, NULL as an empty unquoted field (the csv module cannot tell
+    the two apart).
+    '''
+    fields = []
+    for value in values:
+        value = _plain(value)
+        if value is None:
+            fields.append('')
+        elif isinstance(value, (bool, int, float)):
+            fields.append(str(value))
+        else:
+            fields.append('"' + str(value).replace('"', '""') + '"')
+    return ','.join(fields) + '\n'
+
+
+class CsvWriter:
+    '''Header line plus one csv_line() record per row'''
+
+    def __init__(self, out: TextIO, table: Table):
+        self.out = out
+        self.columns = table.columns
+
+    def header(self) -> None:
+        self.out.write(csv_line(self.columns))
+
+    def row(self, values: Tuple[Any, ...]) -> None:
+        self.out.write(csv_line(values))
+
+
+WRITERS = {'ndjson': NdjsonWriter, 'csv': CsvWriter}
+
+
+def write_table(conn: Any, table_name: str, out: TextIO, fmt: str, after: Optional[Tuple[int, ...]] = None,
+                limit: Optional[int] = None, header: bool = True, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    '''
+    Streams one table (or one keyset page of it) into out. Returns the row
+    count and, when a limit cut the page short, the key to continue after.
+    '''
+    table = TABLES[table_name]
+    writer = WRITERS[fmt](out, table)
+    if header:
+        writer.header()
+
+    rows = 0
+    last: Optional[Tuple[int, ...]] = None
+    # One extra row tells whether another page follows
+    fetch = limit + 1 if limit is not None else None
+    stream = stream_rows(conn, table, after, fetch, batch_size)
+    try:
+        for key, values in stream:
+            if limit is not None and rows == limit:
+                return {'rows': rows, 'nextAfter': last}
+            writer.row(values)
+            rows += 1
+            last = key
+    finally:
+        stream.close()
+    return {'rows': rows, 'nextAfter': None}
+
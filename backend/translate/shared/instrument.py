@@ -0,0 +1,204 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+import psycopg2.extensions
+
+# Per-request counters live on the handler's thread; work on helper threads is not attributed
+_local = threading.local()
+
+MAX_LOGGED_QUERIES = 5
+MAX_LOGGED_SQL = 2000
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.environ.get(name, default).lower() not in ('0', 'false', 'no', 'off', '')
+
+
+def slow_query_ms() -> Optional[float]:
+    '''Opt-in threshold from SLOW_QUERY_MS; unset or 0 disables slow-query logs'''
+    value = float(os.environ.get('SLOW_QUERY_MS') or 0)
+    return value if value > 0 else None
+
+
+def emit(record: Dict[str, Any]) -> None:
+    '''One JSON object per line on stdout, which the function runtime ships to the log store'''
+    sys.stdout.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+    sys.stdout.flush()
+
+
+class Trace:
+    '''Timings collected for one handler invocation'''
+
+    def __init__(self, function: str, request_id: Optional[str], method: Optional[str], resource: Optional[str],
+                 log_sql: bool = True):
+        self.function = function
+        self.log_sql = log_sql
+        self.request_id = request_id
+        self.method = method
+        self.resource = resource
+        self.started = time.perf_counter()
+        self.connect_ms = 0.0
+        self.connects = 0
+        self.query_ms = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.serialize_ms = 0.0
+        self.compress_ms = 0.0
+        self.slow_queries = 0
+        self.top: List[Dict[str, Any]] = []
+        self.total_ms = 0.0
+        self.status: Optional[int] = None
+        self.response_bytes = 0
+
+    def add_query(self, sql: str, ms: float, rows: int) -> None:
+        self.queries += 1
+        self.query_ms += ms
+        self.rows += rows
+        entry: Dict[str, Any] = {'ms': round(ms, 2), 'rows': rows}
+        if self.log_sql:
+            entry['sql'] = ' '.join(sql.split())[:120]
+        self.top.append(entry)
+        self.top.sort(key=lambda q: q['ms'], reverse=True)
+        del self.top[MAX_LOGGED_QUERIES:]
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            'type': 'request',
+            'requestId': self.request_id,
+            'function': self.function,
+            'method': self.method,
+            'resource': self.resource,
+            'status': self.status,
+            'totalMs': round(self.total_ms, 2),
+            'connectMs': round(self.connect_ms, 2),
+            'connects': self.connects,
+            'queries': self.queries,
+            'queryMs': round(self.query_ms, 2),
+            'rows': self.rows,
+            'serializeMs': round(self.serialize_ms, 2),
+            'compressMs': round(self.compress_ms, 2),
+            'responseBytes': self.response_bytes,
+            'slowQueries': self.slow_queries,
+            'topQueries': self.top
+        }
+
+
+def current() -> Optional[Trace]:
+    return getattr(_local, 'trace', None)
+
+
+def last() -> Optional[Trace]:
+    '''The most recently finished trace on this thread (used by the benchmark)'''
+    return getattr(_local, 'last', None)
+
+
+def record_checkout(ms: float) -> None:
+    '''Time spent obtaining a pooled connection (waiting and connecting included)'''
+    trace = current()
+    if trace is not None:
+        trace.connect_ms += ms
+        trace.connects += 1
+
+
+def log_request(trace: Trace) -> None:
+    '''Emits a finished trace as the per-request log line unless REQUEST_LOG=0'''
+    if _flag('REQUEST_LOG', '1'):
+        emit(trace.record())
+
+
+def dumps(obj: Any, **kwargs: Any) -> str:
+    '''json.dumps that adds its time to the current request's serialization counter'''
+    started = time.perf_counter()
+    result = json.dumps(obj, **kwargs)
+    trace = current()
+    if trace is not None:
+        trace.serialize_ms += (time.perf_counter() - started) * 1000
+    return result
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    '''Times every statement and counts its rows into the current trace'''
+
+    def _timed(self, sql: Any, params: Any, call: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return call()
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            rows = max(self.rowcount, 0)
+            trace = current()
+            text = sql.decode('utf-8', 'replace') if isinstance(sql, bytes) else str(sql)
+            if trace is not None:
+                trace.add_query(text, ms, rows)
+            threshold = slow_query_ms()
+            if threshold is not None and ms >= threshold:
+                record: Dict[str, Any] = {
+                    'type': 'slow_query',
+                    'requestId': trace.request_id if trace else None,
+                    'function': trace.function if trace else None,
+                    'ms': round(ms, 2),
+                    'rows': rows
+                }
+                if trace is None or trace.log_sql:
+                    record['sql'] = text[:MAX_LOGGED_SQL]
+                    record['params'] = repr(params)[:MAX_LOGGED_SQL] if params is not None else None
+                if trace is not None:
+                    trace.slow_queries += 1
+                emit(record)
+
+    def execute(self, query: Any, vars: Any = None) -> Any:
+        return self._timed(query, vars, lambda: super(InstrumentedCursor, self).execute(query, vars))
+
+    def executemany(self, query: Any, vars_list: Any) -> Any:
+        return self._timed(query, None, lambda: super(InstrumentedCursor, self).executemany(query, vars_list))
+
+    def copy_expert(self, sql: Any, file: Any, size: int = 8192) -> Any:
+        return self._timed(sql, None, lambda: super(InstrumentedCursor, self).copy_expert(sql, file, size))
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    def cursor(self, *args: Any, **kwargs: Any) -> Any:
+        kwargs.setdefault('cursor_factory', InstrumentedCursor)
+        return super().cursor(*args, **kwargs)
+
+
+def traced(function: str, log_sql: bool = True) -> Callable[[Callable[..., Dict[str, Any]]], Callable[..., Dict[str, Any]]]:
+    '''
+    Wraps a cloud function handler: collects a Trace for the invocation and
+    emits it as one JSON log line tagged with context.request_id. REQUEST_LOG=0
+    turns the per-request line off; the trace is still kept for last().
+    log_sql=False keeps SQL text and parameters out of the logs for handlers
+    whose statements carry credentials. A handler called from another traced
+    handler (the api router) adds to the caller's trace instead of starting one.
+    '''
+    def decorate(handler: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        @functools.wraps(handler)
+        def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+            outer = current()
+            if outer is not None:
+                outer.log_sql = outer.log_sql and log_sql
+                return handler(event, context)
+            query = event.get('queryStringParameters') or {}
+            trace = Trace(function, getattr(context, 'request_id', None),
+                          event.get('httpMethod'), query.get('resource'), log_sql=log_sql)
+            _local.trace = trace
+            try:
+                response = handler(event, context)
+                trace.status = response.get('statusCode')
+                trace.response_bytes = len((response.get('body') or '').encode('utf-8'))
+                return response
+            except Exception:
+                trace.status = 500
+                raise
+            finally:
+                trace.total_ms = (time.perf_counter() - trace.started) * 1000
+                _local.trace = None
+                _local.last = trace
+                log_request(trace)
+        return wrapper
+    return decorate
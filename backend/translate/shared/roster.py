@@ -0,0 +1,179 @@
+import csv
+import hashlib
+import io
+import json
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+MAX_ROSTER_ROWS = 5000
+MAX_USERNAME_LENGTH = 255
+ROSTER_COLUMNS = ['username', 'password']
+
+# Categories every new account starts with, as (name, color)
+DEFAULT_CATEGORIES = (
+    ('Животные', 'bg-gradient-to-br from-purple-500 to-purple-600'),
+    ('Еда', 'bg-gradient-to-br from-pink-500 to-pink-600'),
+    ('Путешествия', 'bg-gradient-to-br from-orange-500 to-orange-600'),
+    ('Работа', 'bg-gradient-to-br from-blue-500 to-blue-600'),
+)
+
+
+def hash_password(password: str) -> str:
+    '''Stored form of a password; login compares against the same digest'''
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def add_default_categories(cur: Any, user_ids: Sequence[int]) -> int:
+    '''Gives each user the default categories in one INSERT ... SELECT'''
+    if not user_ids:
+        return 0
+    cur.execute(
+        """INSERT INTO categories (user_id, name, color)
+           SELECT u.id, d.name, d.color
+           FROM unnest(%s::int[]) AS u(id)
+           CROSS JOIN unnest(%s::text[], %s::text[]) AS d(name, color)
+           ON CONFLICT (user_id, name) DO NOTHING""",
+        (list(user_ids), [name for name, _ in DEFAULT_CATEGORIES], [color for _, color in DEFAULT_CATEGORIES])
+    )
+    return cur.rowcount
+
+
+def detect_format(text: str, content_type: Optional[str], requested: Optional[str]) -> str:
+    if requested in ('csv', 'ndjson', 'json'):
+        return requested
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        return 'json'
+    if stripped.startswith('{') or (content_type and ('ndjson' in content_type or 'jsonl' in content_type)):
+        return 'ndjson'
+    return 'csv'
+
+
+def _read_records(text: str, fmt: str) -> List[Tuple[int, Any]]:
+    '''
+    (line or item number, raw record) pairs. A JSON array is numbered by
+    position; malformed NDJSON lines come back as exceptions.
+    '''
+    if fmt == 'json':
+        try:
+            items = json.loads(text)
+        except ValueError as e:
+            return [(1, e)]
+        if not isinstance(items, list):
+            return [(1, ValueError('Expected a JSON array'))]
+        return list(enumerate(items, start=1))
+
+    records: List[Tuple[int, Any]] = []
+    if fmt == 'ndjson':
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append((line_no, json.loads(line)))
+            except ValueError as e:
+                records.append((line_no, e))
+        return records
+
+    reader = csv.reader(io.StringIO(text))
+    header: Optional[List[str]] = None
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if header is None:
+            if 'username' in [cell.strip() for cell in row]:
+                header = [cell.strip() for cell in row]
+                continue
+            header = ROSTER_COLUMNS
+        records.append((reader.line_num, dict(zip(header, row))))
+    return records
+
+
+def parse_rows(text: str, fmt: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    '''
+    Validates roster records and hashes their passwords. Returns (rows,
+    errors); a username repeated in the file keeps its first row and the
+    repeats are reported as conflicts.
+    '''
+    rows: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    seen: Dict[str, int] = {}
+
+    for line_no, record in _read_records(text, fmt):
+        if isinstance(record, Exception) or not isinstance(record, dict):
+            errors.append({'line': line_no, 'error': 'Malformed row'})
+            continue
+
+        username = str(record.get('username') or '').strip()
+        password = str(record.get('password') or '')
+        if not username or not password:
+            errors.append({'line': line_no, 'username': username or None, 'error': 'Username and password required'})
+            continue
+        if len(username) > MAX_USERNAME_LENGTH:
+            errors.append({'line': line_no, 'error': f'Username longer than {MAX_USERNAME_LENGTH} characters'})
+            continue
+        if username in seen:
+            errors.append({'line': line_no, 'username': username, 'conflict': True,
+                           'error': f'Duplicate of line {seen[username]}'})
+            continue
+        seen[username] = line_no
+
+        rows.append({'line': line_no, 'username': username, 'password_hash': hash_password(password)})
+
+    return rows, errors
+
+
+def provision(conn: Any, rows: List[Dict[str, Any]], errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    '''
+    Creates the roster's users and their default categories in one
+    transaction with three set-based statements: COPY into a temp table,
+    one INSERT ... ON CONFLICT DO NOTHING RETURNING for the users and one
+    INSERT ... SELECT for the categories. Usernames that already exist, as a
+    user or an admin, are reported per row and the rest of the batch goes in.
+    '''
+    cur = conn.cursor()
+    created: List[Dict[str, Any]] = []
+
+    if rows:
+        cur.execute("""
+            CREATE TEMP TABLE roster_rows (
+                line INTEGER NOT NULL,
+                username VARCHAR(255) NOT NULL,
+                password_hash VARCHAR(255) NOT NULL
+            ) ON COMMIT DROP
+        """)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row['line'], row['username'], row['password_hash']])
+        buffer.seek(0)
+        cur.copy_expert("COPY roster_rows FROM STDIN WITH (FORMAT csv)", buffer)
+
+        # Login lets an admin shadow a user of the same name, so those names are taken too
+        cur.execute("""
+            INSERT INTO users (username, password_hash)
+            SELECT r.username, r.password_hash
+            FROM roster_rows r
+            WHERE NOT EXISTS (SELECT 1 FROM admins a WHERE a.username = r.username)
+            ORDER BY r.line
+            ON CONFLICT (username) DO NOTHING
+            RETURNING id, username
+        """)
+        user_ids = {username: user_id for user_id, username in cur.fetchall()}
+        add_default_categories(cur, list(user_ids.values()))
+
+        for row in rows:
+            if row['username'] in user_ids:
+                created.append({'line': row['line'], 'username': row['username'], 'userId': user_ids[row['username']]})
+            else:
+                errors.append({'line': row['line'], 'username': row['username'], 'conflict': True,
+                               'error': 'Username already exists'})
+
+    conn.commit()
+    cur.close()
+
+    return {
+        'created': len(created),
+        'conflicts': sum(1 for e in errors if e.get('conflict')),
+        'failed': sum(1 for e in errors if not e.get('conflict')),
+        'users': created,
+        'errors': sorted(errors, key=lambda e: e['line'])
+    }
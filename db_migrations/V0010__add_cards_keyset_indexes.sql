@@ -0,0 +1,4 @@
+-- Индексы для постраничной выдачи карточек по (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_cards_created_at_id ON cards(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_cards_course_created_at_id ON cards(course, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_cards_category_created_at_id ON cards(category_id, created_at DESC, id DESC);
@@ -0,0 +1,62 @@
+-- Счетчики изменений для ETag: общий для библиотеки и по пользователю для прогресса и категорий
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope VARCHAR(50) NOT NULL,
+    owner_id INTEGER NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, owner_id)
+);
+
+INSERT INTO data_versions (scope, owner_id, version) VALUES ('library', 0, 1) ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_library_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO data_versions (scope, owner_id, version) VALUES ('library', 0, 1)
+    ON CONFLICT (scope, owner_id) DO UPDATE SET version = data_versions.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_user_version() RETURNS trigger AS $$
+DECLARE
+    owner INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        owner := OLD.user_id;
+    ELSE
+        owner := NEW.user_id;
+    END IF;
+    INSERT INTO data_versions (scope, owner_id, version) VALUES (TG_ARGV[0], COALESCE(owner, 0), 1)
+    ON CONFLICT (scope, owner_id) DO UPDATE SET version = data_versions.version + 1;
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS DISTINCT FROM NEW.user_id THEN
+        INSERT INTO data_versions (scope, owner_id, version) VALUES (TG_ARGV[0], COALESCE(OLD.user_id, 0), 1)
+        ON CONFLICT (scope, owner_id) DO UPDATE SET version = data_versions.version + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Любое изменение карточек, групп и связей меняет версию библиотеки
+DROP TRIGGER IF EXISTS trg_cards_library_version ON cards;
+CREATE TRIGGER trg_cards_library_version AFTER INSERT OR UPDATE OR DELETE ON cards
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_library_version();
+
+DROP TRIGGER IF EXISTS trg_groups_library_version ON groups;
+CREATE TRIGGER trg_groups_library_version AFTER INSERT OR UPDATE OR DELETE ON groups
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_library_version();
+
+DROP TRIGGER IF EXISTS trg_card_groups_library_version ON card_groups;
+CREATE TRIGGER trg_card_groups_library_version AFTER INSERT OR UPDATE OR DELETE ON card_groups
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_library_version();
+
+-- Название и цвет категории входят в выдачу карточек
+DROP TRIGGER IF EXISTS trg_categories_library_version ON categories;
+CREATE TRIGGER trg_categories_library_version AFTER UPDATE OR DELETE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_library_version();
+
+DROP TRIGGER IF EXISTS trg_categories_user_version ON categories;
+CREATE TRIGGER trg_categories_user_version AFTER INSERT OR UPDATE OR DELETE ON categories
+    FOR EACH ROW EXECUTE FUNCTION bump_user_version('categories');
+
+DROP TRIGGER IF EXISTS trg_user_progress_user_version ON user_progress;
+CREATE TRIGGER trg_user_progress_user_version AFTER INSERT OR UPDATE OR DELETE ON user_progress
+    FOR EACH ROW EXECUTE FUNCTION bump_user_version('progress');
@@ -0,0 +1,18 @@
+-- Нормализованный ключ слова, источник перевода и время обновления для кэша переводов
+ALTER TABLE global_words ADD COLUMN IF NOT EXISTS normalized VARCHAR(255);
+ALTER TABLE global_words ADD COLUMN IF NOT EXISTS source VARCHAR(20) DEFAULT 'model';
+ALTER TABLE global_words ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+-- Заполняем ключ для существующих слов; при совпадениях ключ получает самая ранняя запись
+UPDATE global_words g
+SET normalized = n.key
+FROM (
+    SELECT id, key, ROW_NUMBER() OVER (PARTITION BY key ORDER BY id) AS rn
+    FROM (
+        SELECT id, regexp_replace(btrim(lower(replace(replace(russian, 'ё', 'е'), 'Ё', 'Е'))), '\s+', ' ', 'g') AS key
+        FROM global_words
+    ) k
+) n
+WHERE g.id = n.id AND n.rn = 1 AND g.normalized IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_global_words_normalized ON global_words(normalized);
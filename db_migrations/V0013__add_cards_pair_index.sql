@@ -0,0 +1,2 @@
+-- Индекс для поиска дубликатов карточек при массовом импорте
+CREATE INDEX IF NOT EXISTS idx_cards_russian_english_lower ON cards(lower(russian), lower(english));
@@ -0,0 +1,77 @@
+-- Сквозная ревизия библиотеки для инкрементальной синхронизации
+CREATE SEQUENCE IF NOT EXISTS library_revision_seq;
+
+ALTER TABLE cards ADD COLUMN IF NOT EXISTS revision BIGINT;
+ALTER TABLE groups ADD COLUMN IF NOT EXISTS revision BIGINT;
+ALTER TABLE card_groups ADD COLUMN IF NOT EXISTS revision BIGINT;
+ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS revision BIGINT;
+
+UPDATE cards SET revision = nextval('library_revision_seq') WHERE revision IS NULL;
+UPDATE groups SET revision = nextval('library_revision_seq') WHERE revision IS NULL;
+UPDATE card_groups SET revision = nextval('library_revision_seq') WHERE revision IS NULL;
+UPDATE user_progress SET revision = nextval('library_revision_seq') WHERE revision IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_cards_revision ON cards(revision);
+CREATE INDEX IF NOT EXISTS idx_groups_revision ON groups(revision);
+CREATE INDEX IF NOT EXISTS idx_card_groups_revision ON card_groups(revision);
+CREATE INDEX IF NOT EXISTS idx_user_progress_user_revision ON user_progress(user_id, revision);
+
+-- Надгробия удаленных записей: клиенты узнают об удалениях
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    revision BIGINT PRIMARY KEY DEFAULT nextval('library_revision_seq'),
+    entity VARCHAR(20) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    group_id INTEGER,
+    user_id INTEGER,
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_user_revision ON sync_tombstones(user_id, revision);
+
+CREATE OR REPLACE FUNCTION set_library_revision() RETURNS trigger AS $$
+BEGIN
+    NEW.revision := nextval('library_revision_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_tombstone() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'cards' THEN
+        INSERT INTO sync_tombstones (entity, entity_id) VALUES ('card', OLD.id);
+    ELSIF TG_TABLE_NAME = 'groups' THEN
+        INSERT INTO sync_tombstones (entity, entity_id) VALUES ('group', OLD.id);
+    ELSIF TG_TABLE_NAME = 'card_groups' THEN
+        INSERT INTO sync_tombstones (entity, entity_id, group_id) VALUES ('membership', OLD.card_id, OLD.group_id);
+    ELSIF TG_TABLE_NAME = 'user_progress' THEN
+        INSERT INTO sync_tombstones (entity, entity_id, user_id) VALUES ('progress', OLD.card_id, OLD.user_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_cards_revision ON cards;
+CREATE TRIGGER trg_cards_revision BEFORE INSERT OR UPDATE ON cards
+    FOR EACH ROW EXECUTE FUNCTION set_library_revision();
+DROP TRIGGER IF EXISTS trg_groups_revision ON groups;
+CREATE TRIGGER trg_groups_revision BEFORE INSERT OR UPDATE ON groups
+    FOR EACH ROW EXECUTE FUNCTION set_library_revision();
+DROP TRIGGER IF EXISTS trg_card_groups_revision ON card_groups;
+CREATE TRIGGER trg_card_groups_revision BEFORE INSERT OR UPDATE ON card_groups
+    FOR EACH ROW EXECUTE FUNCTION set_library_revision();
+DROP TRIGGER IF EXISTS trg_user_progress_revision ON user_progress;
+CREATE TRIGGER trg_user_progress_revision BEFORE INSERT OR UPDATE ON user_progress
+    FOR EACH ROW EXECUTE FUNCTION set_library_revision();
+
+DROP TRIGGER IF EXISTS trg_cards_tombstone ON cards;
+CREATE TRIGGER trg_cards_tombstone AFTER DELETE ON cards
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+DROP TRIGGER IF EXISTS trg_groups_tombstone ON groups;
+CREATE TRIGGER trg_groups_tombstone AFTER DELETE ON groups
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+DROP TRIGGER IF EXISTS trg_card_groups_tombstone ON card_groups;
+CREATE TRIGGER trg_card_groups_tombstone AFTER DELETE ON card_groups
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+DROP TRIGGER IF EXISTS trg_user_progress_tombstone ON user_progress;
+CREATE TRIGGER trg_user_progress_tombstone AFTER DELETE ON user_progress
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
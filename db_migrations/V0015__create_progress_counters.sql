@@ -0,0 +1,92 @@
+-- Предрассчитанные счетчики прогресса для панели администратора
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+    cards_learned INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_stats_learned ON user_stats(cards_learned DESC, user_id DESC);
+CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS library_counters (
+    name VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
+-- Пересчет всех счетчиков с нуля (также вызывается командой rebuild)
+CREATE OR REPLACE FUNCTION rebuild_progress_counters() RETURNS void AS $$
+BEGIN
+    INSERT INTO user_stats (user_id, cards_learned)
+    SELECT u.id, 0 FROM users u
+    ON CONFLICT (user_id) DO NOTHING;
+
+    UPDATE user_stats s
+    SET cards_learned = COALESCE(p.learned, 0), updated_at = CURRENT_TIMESTAMP
+    FROM (
+        SELECT u.id AS user_id, COUNT(up.card_id) FILTER (WHERE up.is_learned) AS learned
+        FROM users u
+        LEFT JOIN user_progress up ON up.user_id = u.id
+        GROUP BY u.id
+    ) p
+    WHERE s.user_id = p.user_id AND s.cards_learned <> COALESCE(p.learned, 0);
+
+    INSERT INTO library_counters (name, value) VALUES ('cards', (SELECT COUNT(*) FROM cards))
+    ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_progress_counters();
+
+CREATE OR REPLACE FUNCTION track_user_learned() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_learned THEN
+        UPDATE user_stats SET cards_learned = cards_learned - 1, updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_learned THEN
+        INSERT INTO user_stats (user_id, cards_learned) VALUES (NEW.user_id, 1)
+        ON CONFLICT (user_id) DO UPDATE SET cards_learned = user_stats.cards_learned + 1, updated_at = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION create_user_stats() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO user_stats (user_id) VALUES (NEW.id) ON CONFLICT (user_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_cards_inserted() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO library_counters (name, value) VALUES ('cards', (SELECT COUNT(*) FROM new_cards))
+    ON CONFLICT (name) DO UPDATE SET value = library_counters.value + EXCLUDED.value;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_cards_deleted() RETURNS trigger AS $$
+BEGIN
+    UPDATE library_counters SET value = value - (SELECT COUNT(*) FROM old_cards) WHERE name = 'cards';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_progress_learned ON user_progress;
+CREATE TRIGGER trg_user_progress_learned AFTER INSERT OR UPDATE OF is_learned OR DELETE ON user_progress
+    FOR EACH ROW EXECUTE FUNCTION track_user_learned();
+
+DROP TRIGGER IF EXISTS trg_users_stats ON users;
+CREATE TRIGGER trg_users_stats AFTER INSERT ON users
+    FOR EACH ROW EXECUTE FUNCTION create_user_stats();
+
+DROP TRIGGER IF EXISTS trg_cards_count_insert ON cards;
+CREATE TRIGGER trg_cards_count_insert AFTER INSERT ON cards
+    REFERENCING NEW TABLE AS new_cards
+    FOR EACH STATEMENT EXECUTE FUNCTION track_cards_inserted();
+
+DROP TRIGGER IF EXISTS trg_cards_count_delete ON cards;
+CREATE TRIGGER trg_cards_count_delete AFTER DELETE ON cards
+    REFERENCING OLD TABLE AS old_cards
+    FOR EACH STATEMENT EXECUTE FUNCTION track_cards_deleted();
@@ -0,0 +1,201 @@
+-- Свертки прогресса по (пользователь, группа) и (пользователь, курс)
+CREATE TABLE IF NOT EXISTS user_group_progress (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    group_id INTEGER NOT NULL,
+    cards_learned INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, group_id)
+);
+
+CREATE TABLE IF NOT EXISTS user_course_progress (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    course INTEGER NOT NULL,
+    cards_learned INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, course)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_group_progress_group ON user_group_progress(group_id, cards_learned DESC, user_id);
+CREATE INDEX IF NOT EXISTS idx_user_course_progress_course ON user_course_progress(course, cards_learned DESC, user_id);
+CREATE INDEX IF NOT EXISTS idx_user_progress_card_learned ON user_progress(card_id, user_id) WHERE is_learned;
+
+-- Пересчет с нуля теперь включает свертки и число карточек по курсам
+CREATE OR REPLACE FUNCTION rebuild_progress_counters() RETURNS void AS $$
+BEGIN
+    INSERT INTO user_stats (user_id, cards_learned)
+    SELECT u.id, 0 FROM users u
+    ON CONFLICT (user_id) DO NOTHING;
+
+    UPDATE user_stats s
+    SET cards_learned = COALESCE(p.learned, 0), updated_at = CURRENT_TIMESTAMP
+    FROM (
+        SELECT u.id AS user_id, COUNT(up.card_id) FILTER (WHERE up.is_learned) AS learned
+        FROM users u
+        LEFT JOIN user_progress up ON up.user_id = u.id
+        GROUP BY u.id
+    ) p
+    WHERE s.user_id = p.user_id AND s.cards_learned <> COALESCE(p.learned, 0);
+
+    INSERT INTO library_counters (name, value) VALUES ('cards', (SELECT COUNT(*) FROM cards))
+    ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value;
+
+    DELETE FROM library_counters WHERE name LIKE 'course:%';
+    INSERT INTO library_counters (name, value)
+    SELECT 'course:' || COALESCE(course, 1), COUNT(*) FROM cards GROUP BY COALESCE(course, 1);
+
+    DELETE FROM user_group_progress;
+    INSERT INTO user_group_progress (user_id, group_id, cards_learned)
+    SELECT up.user_id, cg.group_id, COUNT(*)
+    FROM user_progress up
+    JOIN card_groups cg ON cg.card_id = up.card_id
+    WHERE up.is_learned
+    GROUP BY up.user_id, cg.group_id;
+
+    DELETE FROM user_course_progress;
+    INSERT INTO user_course_progress (user_id, course, cards_learned)
+    SELECT up.user_id, COALESCE(c.course, 1), COUNT(*)
+    FROM user_progress up
+    JOIN cards c ON c.id = up.card_id
+    WHERE up.is_learned
+    GROUP BY up.user_id, COALESCE(c.course, 1);
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_progress_counters();
+
+CREATE OR REPLACE FUNCTION track_progress_rollups() RETURNS trigger AS $$
+DECLARE
+    delta INTEGER;
+    uid INTEGER;
+    cid INTEGER;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        delta := CASE WHEN NEW.is_learned THEN 1 ELSE 0 END;
+        uid := NEW.user_id;
+        cid := NEW.card_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        delta := CASE WHEN OLD.is_learned THEN -1 ELSE 0 END;
+        uid := OLD.user_id;
+        cid := OLD.card_id;
+    ELSE
+        delta := (CASE WHEN NEW.is_learned THEN 1 ELSE 0 END) - (CASE WHEN OLD.is_learned THEN 1 ELSE 0 END);
+        uid := NEW.user_id;
+        cid := NEW.card_id;
+    END IF;
+
+    IF delta = 0 THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO user_group_progress (user_id, group_id, cards_learned)
+    SELECT uid, cg.group_id, delta FROM card_groups cg WHERE cg.card_id = cid
+    ON CONFLICT (user_id, group_id) DO UPDATE SET cards_learned = user_group_progress.cards_learned + EXCLUDED.cards_learned;
+
+    INSERT INTO user_course_progress (user_id, course, cards_learned)
+    SELECT uid, COALESCE(c.course, 1), delta FROM cards c WHERE c.id = cid
+    ON CONFLICT (user_id, course) DO UPDATE SET cards_learned = user_course_progress.cards_learned + EXCLUDED.cards_learned;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_memberships_inserted() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO user_group_progress (user_id, group_id, cards_learned)
+    SELECT up.user_id, n.group_id, COUNT(*)
+    FROM new_memberships n
+    JOIN user_progress up ON up.card_id = n.card_id AND up.is_learned
+    GROUP BY up.user_id, n.group_id
+    ON CONFLICT (user_id, group_id) DO UPDATE SET cards_learned = user_group_progress.cards_learned + EXCLUDED.cards_learned;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_memberships_deleted() RETURNS trigger AS $$
+BEGIN
+    UPDATE user_group_progress ugp
+    SET cards_learned = ugp.cards_learned - d.learned
+    FROM (
+        SELECT up.user_id, o.group_id, COUNT(*) AS learned
+        FROM old_memberships o
+        JOIN user_progress up ON up.card_id = o.card_id AND up.is_learned
+        GROUP BY up.user_id, o.group_id
+    ) d
+    WHERE ugp.user_id = d.user_id AND ugp.group_id = d.group_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION drop_group_rollups() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM user_group_progress WHERE group_id = OLD.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_card_course_changed() RETURNS trigger AS $$
+BEGIN
+    UPDATE user_course_progress ucp
+    SET cards_learned = ucp.cards_learned - 1
+    FROM user_progress up
+    WHERE up.card_id = NEW.id AND up.is_learned
+      AND ucp.user_id = up.user_id AND ucp.course = COALESCE(OLD.course, 1);
+
+    INSERT INTO user_course_progress (user_id, course, cards_learned)
+    SELECT up.user_id, COALESCE(NEW.course, 1), 1
+    FROM user_progress up
+    WHERE up.card_id = NEW.id AND up.is_learned
+    ON CONFLICT (user_id, course) DO UPDATE SET cards_learned = user_course_progress.cards_learned + 1;
+
+    UPDATE library_counters SET value = value - 1 WHERE name = 'course:' || COALESCE(OLD.course, 1);
+    INSERT INTO library_counters (name, value) VALUES ('course:' || COALESCE(NEW.course, 1), 1)
+    ON CONFLICT (name) DO UPDATE SET value = library_counters.value + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Счетчики карточек по курсам ведутся вместе с общим счетчиком
+CREATE OR REPLACE FUNCTION track_cards_inserted() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO library_counters (name, value) VALUES ('cards', (SELECT COUNT(*) FROM new_cards))
+    ON CONFLICT (name) DO UPDATE SET value = library_counters.value + EXCLUDED.value;
+    INSERT INTO library_counters (name, value)
+    SELECT 'course:' || COALESCE(course, 1), COUNT(*) FROM new_cards GROUP BY COALESCE(course, 1)
+    ON CONFLICT (name) DO UPDATE SET value = library_counters.value + EXCLUDED.value;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_cards_deleted() RETURNS trigger AS $$
+BEGIN
+    UPDATE library_counters SET value = value - (SELECT COUNT(*) FROM old_cards) WHERE name = 'cards';
+    UPDATE library_counters lc SET value = lc.value - d.removed
+    FROM (
+        SELECT 'course:' || COALESCE(course, 1) AS name, COUNT(*) AS removed
+        FROM old_cards GROUP BY COALESCE(course, 1)
+    ) d
+    WHERE lc.name = d.name;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_progress_rollups ON user_progress;
+CREATE TRIGGER trg_user_progress_rollups AFTER INSERT OR UPDATE OF is_learned OR DELETE ON user_progress
+    FOR EACH ROW EXECUTE FUNCTION track_progress_rollups();
+
+DROP TRIGGER IF EXISTS trg_card_groups_rollups_insert ON card_groups;
+CREATE TRIGGER trg_card_groups_rollups_insert AFTER INSERT ON card_groups
+    REFERENCING NEW TABLE AS new_memberships
+    FOR EACH STATEMENT EXECUTE FUNCTION track_memberships_inserted();
+
+DROP TRIGGER IF EXISTS trg_card_groups_rollups_delete ON card_groups;
+CREATE TRIGGER trg_card_groups_rollups_delete AFTER DELETE ON card_groups
+    REFERENCING OLD TABLE AS old_memberships
+    FOR EACH STATEMENT EXECUTE FUNCTION track_memberships_deleted();
+
+DROP TRIGGER IF EXISTS trg_groups_rollups_delete ON groups;
+CREATE TRIGGER trg_groups_rollups_delete AFTER DELETE ON groups
+    FOR EACH ROW EXECUTE FUNCTION drop_group_rollups();
+
+DROP TRIGGER IF EXISTS trg_cards_course_changed ON cards;
+CREATE TRIGGER trg_cards_course_changed AFTER UPDATE OF course ON cards
+    FOR EACH ROW WHEN (OLD.course IS DISTINCT FROM NEW.course)
+    EXECUTE FUNCTION track_card_course_changed();
@@ -0,0 +1,10 @@
+-- Интервальные повторения (SM-2): параметры расписания для пары (пользователь, карточка)
+ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS ease REAL NOT NULL DEFAULT 2.5;
+ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS interval_days REAL NOT NULL DEFAULT 0;
+ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS repetitions INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS lapses INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS due_at TIMESTAMP;
+ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS last_reviewed_at TIMESTAMP;
+
+-- Очередь повторений: ближайшие по сроку карточки пользователя
+CREATE INDEX IF NOT EXISTS idx_user_progress_due ON user_progress(user_id, due_at) WHERE due_at IS NOT NULL;
@@ -0,0 +1,26 @@
+-- Нечёткий поиск по карточкам и общему словарю: триграммы по нормализованному тексту
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Нормализация для поиска: нижний регистр (кириллица явно, без зависимости от локали), ё -> е, схлопывание пробелов
+CREATE OR REPLACE FUNCTION search_fold(value TEXT) RETURNS TEXT AS $$
+    SELECT regexp_replace(
+        btrim(lower(translate(
+            COALESCE(value, ''),
+            'АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯё',
+            'абвгдеежзийклмнопрстуфхцчшщъыьэюяе'
+        ))),
+        '\s+', ' ', 'g'
+    )
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Подстрока и опечатки (LIKE '%...%', <%)
+CREATE INDEX IF NOT EXISTS idx_cards_russian_trgm ON cards USING gin (search_fold(russian) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_cards_english_trgm ON cards USING gin (search_fold(english) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_global_words_russian_trgm ON global_words USING gin (search_fold(russian) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_global_words_english_trgm ON global_words USING gin (search_fold(english) gin_trgm_ops);
+
+-- Префикс для коротких запросов (меньше трёх символов триграмм не даёт)
+CREATE INDEX IF NOT EXISTS idx_cards_russian_prefix ON cards (search_fold(russian) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_cards_english_prefix ON cards (search_fold(english) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_global_words_russian_prefix ON global_words (search_fold(russian) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_global_words_english_prefix ON global_words (search_fold(english) text_pattern_ops);
@@ -0,0 +1,13 @@
+-- Приоритет источника перевода в общем словаре: модель < подтверждённый пользователем < админ
+CREATE OR REPLACE FUNCTION dictionary_source_rank(source TEXT) RETURNS INTEGER AS $$
+    SELECT CASE source WHEN 'admin' THEN 2 WHEN 'confirmed' THEN 1 ELSE 0 END
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Наполняем словарь переводами из существующих карточек (самая ранняя карточка на слово)
+INSERT INTO global_words (russian, normalized, english, russian_example, english_example, source)
+SELECT DISTINCT ON (search_fold(russian))
+       btrim(russian), search_fold(russian), english, russian_example, english_example, 'confirmed'
+FROM cards
+WHERE search_fold(russian) <> '' AND COALESCE(btrim(english), '') <> ''
+ORDER BY search_fold(russian), id
+ON CONFLICT DO NOTHING;
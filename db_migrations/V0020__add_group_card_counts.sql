@@ -0,0 +1,173 @@
+-- Число карточек хранится в самой группе; список групп больше не считает card_groups
+ALTER TABLE groups ADD COLUMN IF NOT EXISTS card_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE groups g
+SET card_count = COALESCE(m.cards, 0)
+FROM groups g2
+LEFT JOIN (SELECT group_id, COUNT(*) AS cards FROM card_groups GROUP BY group_id) m ON m.group_id = g2.id
+WHERE g.id = g2.id AND g.card_count <> COALESCE(m.cards, 0);
+
+-- Изменение только счетчика не меняет ревизию группы для синхронизации
+DROP TRIGGER IF EXISTS trg_groups_revision ON groups;
+CREATE TRIGGER trg_groups_revision BEFORE INSERT OR UPDATE OF name, description, color, course, created_at ON groups
+    FOR EACH ROW EXECUTE FUNCTION set_library_revision();
+
+-- Один UPDATE на группу за оператор, сколько бы связей он ни менял.
+-- Связи, как и в V0016, только добавляются и удаляются, но не изменяются
+CREATE OR REPLACE FUNCTION track_group_sizes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE groups g SET card_count = g.card_count + n.added
+        FROM (SELECT group_id, COUNT(*) AS added FROM new_memberships GROUP BY group_id) n
+        WHERE g.id = n.group_id;
+    ELSE
+        UPDATE groups g SET card_count = g.card_count - o.removed
+        FROM (SELECT group_id, COUNT(*) AS removed FROM old_memberships GROUP BY group_id) o
+        WHERE g.id = o.group_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_card_groups_size_insert ON card_groups;
+CREATE TRIGGER trg_card_groups_size_insert AFTER INSERT ON card_groups
+    REFERENCING NEW TABLE AS new_memberships
+    FOR EACH STATEMENT EXECUTE FUNCTION track_group_sizes();
+
+DROP TRIGGER IF EXISTS trg_card_groups_size_delete ON card_groups;
+CREATE TRIGGER trg_card_groups_size_delete AFTER DELETE ON card_groups
+    REFERENCING OLD TABLE AS old_memberships
+    FOR EACH STATEMENT EXECUTE FUNCTION track_group_sizes();
+
+-- Версии прогресса, user_stats и свертки по группам и курсам считаются одним
+-- проходом на оператор. Построчные триггеры (V0011, V0015, V0016) обновляли одну
+-- и ту же строку счетчика на каждую запись, и большие пакеты замедлялись квадратично
+CREATE OR REPLACE FUNCTION track_progress_changes() RETURNS trigger AS $$
+DECLARE
+    user_ids INTEGER[];
+    card_ids INTEGER[];
+    deltas INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(user_id), array_agg(card_id), array_agg(CASE WHEN is_learned THEN 1 ELSE 0 END)
+        INTO user_ids, card_ids, deltas
+        FROM new_progress;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(user_id), array_agg(card_id), array_agg(CASE WHEN is_learned THEN -1 ELSE 0 END)
+        INTO user_ids, card_ids, deltas
+        FROM old_progress;
+    ELSE
+        SELECT array_agg(user_id), array_agg(card_id), array_agg(delta)
+        INTO user_ids, card_ids, deltas
+        FROM (
+            SELECT user_id, card_id, CASE WHEN is_learned THEN 1 ELSE 0 END AS delta FROM new_progress
+            UNION ALL
+            SELECT user_id, card_id, CASE WHEN is_learned THEN -1 ELSE 0 END FROM old_progress
+        ) c;
+    END IF;
+
+    IF user_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO data_versions (scope, owner_id, version)
+    SELECT DISTINCT 'progress', u, 1 FROM unnest(user_ids) u
+    ON CONFLICT (scope, owner_id) DO UPDATE SET version = data_versions.version + 1;
+
+    WITH changed AS (
+        SELECT c.user_id, c.card_id, SUM(c.delta) AS delta
+        FROM unnest(user_ids, card_ids, deltas) AS c(user_id, card_id, delta)
+        GROUP BY c.user_id, c.card_id
+        HAVING SUM(c.delta) <> 0
+    ), per_user AS (
+        INSERT INTO user_stats (user_id, cards_learned)
+        SELECT user_id, SUM(delta) FROM changed GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET cards_learned = user_stats.cards_learned + EXCLUDED.cards_learned, updated_at = CURRENT_TIMESTAMP
+    ), per_group AS (
+        INSERT INTO user_group_progress (user_id, group_id, cards_learned)
+        SELECT ch.user_id, cg.group_id, SUM(ch.delta)
+        FROM changed ch
+        JOIN card_groups cg ON cg.card_id = ch.card_id
+        GROUP BY ch.user_id, cg.group_id
+        ON CONFLICT (user_id, group_id) DO UPDATE
+        SET cards_learned = user_group_progress.cards_learned + EXCLUDED.cards_learned
+    )
+    INSERT INTO user_course_progress (user_id, course, cards_learned)
+    SELECT ch.user_id, COALESCE(c.course, 1), SUM(ch.delta)
+    FROM changed ch
+    JOIN cards c ON c.id = ch.card_id
+    GROUP BY ch.user_id, COALESCE(c.course, 1)
+    ON CONFLICT (user_id, course) DO UPDATE
+    SET cards_learned = user_course_progress.cards_learned + EXCLUDED.cards_learned;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_progress_user_version ON user_progress;
+DROP TRIGGER IF EXISTS trg_user_progress_learned ON user_progress;
+DROP TRIGGER IF EXISTS trg_user_progress_rollups ON user_progress;
+
+DROP TRIGGER IF EXISTS trg_user_progress_changes_insert ON user_progress;
+CREATE TRIGGER trg_user_progress_changes_insert AFTER INSERT ON user_progress
+    REFERENCING NEW TABLE AS new_progress
+    FOR EACH STATEMENT EXECUTE FUNCTION track_progress_changes();
+
+DROP TRIGGER IF EXISTS trg_user_progress_changes_update ON user_progress;
+CREATE TRIGGER trg_user_progress_changes_update AFTER UPDATE ON user_progress
+    REFERENCING OLD TABLE AS old_progress NEW TABLE AS new_progress
+    FOR EACH STATEMENT EXECUTE FUNCTION track_progress_changes();
+
+DROP TRIGGER IF EXISTS trg_user_progress_changes_delete ON user_progress;
+CREATE TRIGGER trg_user_progress_changes_delete AFTER DELETE ON user_progress
+    REFERENCING OLD TABLE AS old_progress
+    FOR EACH STATEMENT EXECUTE FUNCTION track_progress_changes();
+
+-- Пересчет с нуля теперь включает число карточек в группах
+CREATE OR REPLACE FUNCTION rebuild_progress_counters() RETURNS void AS $$
+BEGIN
+    INSERT INTO user_stats (user_id, cards_learned)
+    SELECT u.id, 0 FROM users u
+    ON CONFLICT (user_id) DO NOTHING;
+
+    UPDATE user_stats s
+    SET cards_learned = COALESCE(p.learned, 0), updated_at = CURRENT_TIMESTAMP
+    FROM (
+        SELECT u.id AS user_id, COUNT(up.card_id) FILTER (WHERE up.is_learned) AS learned
+        FROM users u
+        LEFT JOIN user_progress up ON up.user_id = u.id
+        GROUP BY u.id
+    ) p
+    WHERE s.user_id = p.user_id AND s.cards_learned <> COALESCE(p.learned, 0);
+
+    INSERT INTO library_counters (name, value) VALUES ('cards', (SELECT COUNT(*) FROM cards))
+    ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value;
+
+    DELETE FROM library_counters WHERE name LIKE 'course:%';
+    INSERT INTO library_counters (name, value)
+    SELECT 'course:' || COALESCE(course, 1), COUNT(*) FROM cards GROUP BY COALESCE(course, 1);
+
+    UPDATE groups g
+    SET card_count = COALESCE(m.cards, 0)
+    FROM groups g2
+    LEFT JOIN (SELECT group_id, COUNT(*) AS cards FROM card_groups GROUP BY group_id) m ON m.group_id = g2.id
+    WHERE g.id = g2.id AND g.card_count <> COALESCE(m.cards, 0);
+
+    DELETE FROM user_group_progress;
+    INSERT INTO user_group_progress (user_id, group_id, cards_learned)
+    SELECT up.user_id, cg.group_id, COUNT(*)
+    FROM user_progress up
+    JOIN card_groups cg ON cg.card_id = up.card_id
+    WHERE up.is_learned
+    GROUP BY up.user_id, cg.group_id;
+
+    DELETE FROM user_course_progress;
+    INSERT INTO user_course_progress (user_id, course, cards_learned)
+    SELECT up.user_id, COALESCE(c.course, 1), COUNT(*)
+    FROM user_progress up
+    JOIN cards c ON c.id = up.card_id
+    WHERE up.is_learned
+    GROUP BY up.user_id, COALESCE(c.course, 1);
+END;
+$$ LANGUAGE plpgsql;
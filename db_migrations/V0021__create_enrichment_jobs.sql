@@ -0,0 +1,42 @@
+-- Очередь фонового дополнения карточек: перевод и примеры заполняет воркер
+-- (python -m enrichment), а не запрос на создание. Одна строка на карточку,
+-- она же хранит статус для API: pending, running, done или failed
+CREATE TABLE IF NOT EXISTS enrichment_jobs (
+    card_id INTEGER PRIMARY KEY REFERENCES cards(id),
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_until TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Готовые к запуску задачи и задачи с истекшей арендой (упавший воркер)
+CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_ready ON enrichment_jobs (run_after) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_lease ON enrichment_jobs (locked_until) WHERE status = 'running';
+
+-- Любая вставка карточек (форма, импорт, перенос) ставит в очередь неполные карточки
+CREATE OR REPLACE FUNCTION enqueue_card_enrichment() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO enrichment_jobs (card_id)
+    SELECT n.id
+    FROM new_cards n
+    WHERE COALESCE(TRIM(n.russian), '') <> ''
+      AND (COALESCE(TRIM(n.english), '') = ''
+           OR COALESCE(TRIM(n.russian_example), '') = ''
+           OR COALESCE(TRIM(n.english_example), '') = '')
+    ON CONFLICT (card_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_cards_enrichment ON cards;
+CREATE TRIGGER trg_cards_enrichment AFTER INSERT ON cards
+    REFERENCING NEW TABLE AS new_cards
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_card_enrichment();
+
+-- Статус дополнения входит в список карточек, поэтому его смена сбрасывает ETag библиотеки
+DROP TRIGGER IF EXISTS trg_enrichment_jobs_library_version ON enrichment_jobs;
+CREATE TRIGGER trg_enrichment_jobs_library_version AFTER UPDATE OF status ON enrichment_jobs
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_library_version();
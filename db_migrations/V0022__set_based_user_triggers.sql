@@ -0,0 +1,55 @@
+-- Массовое создание пользователей (список класса) вставляет тысячи строк в users
+-- и categories одним оператором. Построчные триггеры V0011 и V0015 делали по
+-- отдельной записи в data_versions и user_stats на каждую строку; теперь один
+-- проход на оператор по таблицам переходов
+CREATE OR REPLACE FUNCTION bump_user_versions() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO data_versions (scope, owner_id, version)
+        SELECT DISTINCT TG_ARGV[0], COALESCE(user_id, 0), 1 FROM new_rows
+        ON CONFLICT (scope, owner_id) DO UPDATE SET version = data_versions.version + 1;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO data_versions (scope, owner_id, version)
+        SELECT DISTINCT TG_ARGV[0], COALESCE(user_id, 0), 1 FROM old_rows
+        ON CONFLICT (scope, owner_id) DO UPDATE SET version = data_versions.version + 1;
+    ELSE
+        -- Перенос строки к другому владельцу меняет версии обоих
+        INSERT INTO data_versions (scope, owner_id, version)
+        SELECT TG_ARGV[0], owner, 1
+        FROM (SELECT COALESCE(user_id, 0) AS owner FROM new_rows
+              UNION
+              SELECT COALESCE(user_id, 0) FROM old_rows) o
+        ON CONFLICT (scope, owner_id) DO UPDATE SET version = data_versions.version + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_categories_user_version ON categories;
+
+DROP TRIGGER IF EXISTS trg_categories_user_version_insert ON categories;
+CREATE TRIGGER trg_categories_user_version_insert AFTER INSERT ON categories
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_versions('categories');
+
+DROP TRIGGER IF EXISTS trg_categories_user_version_update ON categories;
+CREATE TRIGGER trg_categories_user_version_update AFTER UPDATE ON categories
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_versions('categories');
+
+DROP TRIGGER IF EXISTS trg_categories_user_version_delete ON categories;
+CREATE TRIGGER trg_categories_user_version_delete AFTER DELETE ON categories
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_versions('categories');
+
+CREATE OR REPLACE FUNCTION create_users_stats() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO user_stats (user_id) SELECT id FROM new_users ON CONFLICT (user_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_stats ON users;
+CREATE TRIGGER trg_users_stats AFTER INSERT ON users
+    REFERENCING NEW TABLE AS new_users
+    FOR EACH STATEMENT EXECUTE FUNCTION create_users_stats();
@@ -0,0 +1,48 @@
+-- Ревизии из последовательности становятся видны в момент коммита, а не в
+-- порядке выдачи: медленная транзакция с меньшей ревизией могла закоммититься
+-- после того, как клиент уже получил большую, и ее изменения терялись.
+-- Теперь ревизия строится из номера транзакции (xid8), а синхронизация отдает
+-- только ревизии ниже xmin текущего снимка: все транзакции с меньшим xid уже
+-- завершены, и ни одна из них не допишет ревизию ниже курсора клиента
+
+-- Смещение, с которым ревизии по xid продолжают уже выданные последовательностью
+CREATE TABLE IF NOT EXISTS library_revision_base (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    base BIGINT NOT NULL
+);
+
+INSERT INTO library_revision_base (base)
+SELECT last_value + 1 - pg_current_xact_id()::text::bigint FROM library_revision_seq
+ON CONFLICT (id) DO NOTHING;
+
+-- Ревизия изменений текущей транзакции: одна на все ее строки
+CREATE OR REPLACE FUNCTION library_revision() RETURNS BIGINT AS $$
+    SELECT pg_current_xact_id()::text::bigint + base FROM library_revision_base
+$$ LANGUAGE sql VOLATILE;
+
+-- Наибольшая ревизия, которую уже не может получить ни одна незавершенная транзакция
+CREATE OR REPLACE FUNCTION library_revision_bound() RETURNS BIGINT AS $$
+    SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint + base - 1 FROM library_revision_base
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION set_library_revision() RETURNS trigger AS $$
+BEGIN
+    NEW.revision := library_revision();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Одна транзакция может удалить несколько записей, так что ревизия надгробия
+-- больше не уникальна
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'sync_tombstones' AND column_name = 'id') THEN
+        ALTER TABLE sync_tombstones DROP CONSTRAINT sync_tombstones_pkey;
+        ALTER TABLE sync_tombstones ADD COLUMN id BIGSERIAL PRIMARY KEY;
+    END IF;
+END $$;
+
+ALTER TABLE sync_tombstones ALTER COLUMN revision SET DEFAULT library_revision();
+ALTER TABLE sync_tombstones ALTER COLUMN revision SET NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_revision ON sync_tombstones(revision);
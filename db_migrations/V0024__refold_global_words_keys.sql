@@ -0,0 +1,20 @@
+-- V0012 строил ключ через lower(), результат которого для кириллицы зависит от
+-- локали базы. Пересчитываем ключ через search_fold() (V0018), который, как и
+-- код приложения, сворачивает регистр и ё явной таблицей
+
+-- Сначала освобождаем неверные ключи, чтобы они не заняли чужой
+UPDATE global_words
+SET normalized = NULL
+WHERE normalized IS NOT NULL AND normalized <> search_fold(russian);
+
+-- При совпадениях ключ получает уже владеющая им или самая ранняя запись
+UPDATE global_words g
+SET normalized = n.key
+FROM (
+    SELECT id, search_fold(russian) AS key,
+           ROW_NUMBER() OVER (PARTITION BY search_fold(russian) ORDER BY id) AS rn
+    FROM global_words
+    WHERE normalized IS NULL
+) n
+WHERE g.id = n.id AND n.rn = 1 AND n.key <> ''
+  AND NOT EXISTS (SELECT 1 FROM global_words o WHERE o.normalized = n.key);
@@ -0,0 +1,9 @@
+-- Курсор страниц карточек строится по (created_at, id), и карточка без даты
+-- давала курсор, который нельзя разобрать. Старым карточкам без даты ставим
+-- самую раннюю известную дату, дальше дата обязательна
+UPDATE cards
+SET created_at = COALESCE((SELECT MIN(created_at) FROM cards), CURRENT_TIMESTAMP)
+WHERE created_at IS NULL;
+
+ALTER TABLE cards ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE cards ALTER COLUMN created_at SET NOT NULL;
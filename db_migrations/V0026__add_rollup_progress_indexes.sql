@@ -0,0 +1,4 @@
+-- Свертки листаются курсором: по (пользователь, группа/курс) идет первичный
+-- ключ, по прогрессу без фильтра по группе или курсу — эти индексы
+CREATE INDEX IF NOT EXISTS idx_user_group_progress_learned ON user_group_progress(cards_learned DESC, user_id, group_id);
+CREATE INDEX IF NOT EXISTS idx_user_course_progress_learned ON user_course_progress(cards_learned DESC, user_id, course);
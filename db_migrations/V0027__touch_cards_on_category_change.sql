@@ -0,0 +1,21 @@
+-- Лента изменений отдает карточки вместе с названием и цветом категории, но
+-- переименование или смена цвета категории не меняли ревизию карточек, и
+-- синхронизированные клиенты оставались со старыми значениями. Теперь такое
+-- изменение в той же транзакции выдает новую ревизию всем карточкам категории
+CREATE OR REPLACE FUNCTION touch_category_cards() RETURNS trigger AS $$
+BEGIN
+    UPDATE cards c SET revision = library_revision()
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE c.category_id = n.id
+      AND (n.name, n.color) IS DISTINCT FROM (o.name, o.color);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Таблицы переходов несовместимы со списком столбцов (UPDATE OF), поэтому
+-- изменившиеся строки отбираются в самой функции
+DROP TRIGGER IF EXISTS trg_categories_touch_cards ON categories;
+CREATE TRIGGER trg_categories_touch_cards AFTER UPDATE ON categories
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION touch_category_cards();
@@ -0,0 +1,16 @@
+-- Каждый оператор над карточками, группами и связями увеличивал одну строку
+-- ('library', 0), и параллельные транзакции ждали ее блокировку до коммита.
+-- Теперь версия библиотеки разложена на 16 строк: сеанс увеличивает строку
+-- своего номера процесса, а ETag строится из их суммы, которая растет при
+-- любом изменении независимо от порядка коммитов
+INSERT INTO data_versions (scope, owner_id, version)
+SELECT 'library', slot, 0 FROM generate_series(0, 15) slot
+ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_library_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO data_versions (scope, owner_id, version) VALUES ('library', pg_backend_pid() % 16, 1)
+    ON CONFLICT (scope, owner_id) DO UPDATE SET version = data_versions.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
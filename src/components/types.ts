@@ -6,6 +6,7 @@ export type WordCard = {
   englishExample: string;
   learned: boolean;
   course?: number;
+  enrichment?: 'pending' | 'running' | 'done' | 'failed' | null;
 };
 
 
@@ -17,6 +18,7 @@ export type Group = {
   color: string;
   createdAt: string;
   cardCount: number;
+  learnedCount?: number;
   course?: number;
 };
 
@@ -12,8 +12,10 @@ import ProgressTab from '@/components/ProgressTab';
 import GroupsTab from '@/components/GroupsTab';
 import EditCardDialog from '@/components/EditCardDialog';
 
+const sessionHeaders = (token?: string): Record<string, string> => (token ? { 'X-Session-Token': token } : {});
+
 export default function Index() {
-  const [user, setUser] = useState<{ id: number; username: string; isAdmin: boolean } | null>(null);
+  const [user, setUser] = useState<{ id: number; username: string; isAdmin: boolean; token?: string } | null>(null);
   const [showAuth, setShowAuth] = useState(false);
   const [authMode, setAuthMode] = useState<'login' | 'register'>('login');
   const [authForm, setAuthForm] = useState({ username: '', password: '' });
@@ -136,7 +138,7 @@ export default function Index() {
       const data = await response.json();
 
       if (response.ok) {
-        const userData = { id: data.userId, username: data.username, isAdmin: data.isAdmin || false };
+        const userData = { id: data.userId, username: data.username, isAdmin: data.isAdmin || false, token: data.token };
         setUser(userData);
         localStorage.setItem('user', JSON.stringify(userData));
         setShowAuth(false);
@@ -144,7 +146,7 @@ export default function Index() {
         if (userData.isAdmin) {
           loadAccounts();
         }
-        loadCards(data.userId, null, userData.isAdmin);
+        loadCards(data.userId, null, userData.isAdmin, userData.token);
       } else {
         toast.error(data.error || 'Ошибка авторизации');
       }
@@ -163,7 +165,7 @@ export default function Index() {
 
 
 
-  const loadCards = async (userId: number, groupIdFilter?: number | null, isAdmin?: boolean) => {
+  const loadCards = async (userId: number, groupIdFilter?: number | null, isAdmin?: boolean, token?: string) => {
     try {
       const url = groupIdFilter
         ? `${API_URLS.cards}?groupId=${groupIdFilter}`
@@ -172,9 +174,15 @@ export default function Index() {
       const response = await fetch(url, {
         headers: {
           'X-User-Id': userId.toString(),
-          'X-Is-Admin': (isAdmin ?? user?.isAdmin) ? 'true' : 'false'
+          'X-Is-Admin': (isAdmin ?? user?.isAdmin) ? 'true' : 'false',
+          ...sessionHeaders(token ?? user?.token),
         },
       });
+      if (response.status === 401 && (token ?? user?.token)) {
+        handleLogout();
+        toast.error('Сессия истекла, войдите снова');
+        return;
+      }
       const data = await response.json();
       setCards(data.cards || []);
 
@@ -192,7 +200,8 @@ export default function Index() {
     try {
       const response = await fetch(API_URLS.accounts, {
         headers: {
-          'X-Is-Admin': 'true'
+          'X-Is-Admin': 'true',
+          ...sessionHeaders(user.token),
         },
       });
       const data = await response.json();
@@ -240,8 +249,8 @@ export default function Index() {
   };
 
   const handleAddCard = async () => {
-    if (!user || !newCard.russian || !newCard.english) {
-      toast.error('Заполните русское и английское слово');
+    if (!user || !newCard.russian.trim()) {
+      toast.error('Введите русское слово');
       return;
     }
 
@@ -252,12 +261,18 @@ export default function Index() {
           'Content-Type': 'application/json',
           'X-User-Id': user.id.toString(),
           'X-Is-Admin': user.isAdmin ? 'true' : 'false',
+          ...sessionHeaders(user.token),
         },
         body: JSON.stringify(newCard),
       });
 
       if (response.ok) {
-        toast.success('Карточка добавлена!');
+        const data = await response.json();
+        toast.success(
+          data.enrichment === 'pending'
+            ? 'Карточка добавлена! Перевод и примеры появятся чуть позже'
+            : 'Карточка добавлена!'
+        );
         loadCards(user.id, selectedGroupId);
         setNewCard({
           russian: '',
@@ -315,6 +330,7 @@ export default function Index() {
           'Content-Type': 'application/json',
           'X-User-Id': user.id.toString(),
           'X-Is-Admin': user.isAdmin ? 'true' : 'false',
+          ...sessionHeaders(user.token),
         },
         body: JSON.stringify({
           cardId: editingCard.id,
@@ -345,6 +361,7 @@ export default function Index() {
           'Content-Type': 'application/json',
           'X-User-Id': user.id.toString(),
           'X-Is-Admin': user.isAdmin ? 'true' : 'false',
+          ...sessionHeaders(user.token),
         },
         body: JSON.stringify({ cardId }),
       });
@@ -373,6 +390,7 @@ export default function Index() {
           'Content-Type': 'application/json',
           'X-User-Id': user.id.toString(),
           'X-Is-Admin': user.isAdmin ? 'true' : 'false',
+          ...sessionHeaders(user.token),
         },
         body: JSON.stringify({
           id: currentCard.id,
@@ -400,7 +418,8 @@ export default function Index() {
       const response = await fetch(`${API_URLS.cards}?resource=groups`, {
         headers: {
           'X-User-Id': user.id.toString(),
-          'X-Is-Admin': user.isAdmin ? 'true' : 'false'
+          'X-Is-Admin': user.isAdmin ? 'true' : 'false',
+          ...sessionHeaders(user.token),
         },
       });
       if (response.ok) {
@@ -421,6 +440,7 @@ export default function Index() {
           'Content-Type': 'application/json',
           'X-User-Id': user.id.toString(),
           'X-Is-Admin': 'true',
+          ...sessionHeaders(user.token),
         },
         body: JSON.stringify(newGroup),
       });
@@ -443,6 +463,7 @@ export default function Index() {
           'Content-Type': 'application/json',
           'X-User-Id': user.id.toString(),
           'X-Is-Admin': 'true',
+          ...sessionHeaders(user.token),
         },
         body: JSON.stringify({
           groupId,
@@ -469,6 +490,7 @@ export default function Index() {
         headers: {
           'X-User-Id': user.id.toString(),
           'X-Is-Admin': 'true',
+          ...sessionHeaders(user.token),
         },
       });
       if (response.ok) {